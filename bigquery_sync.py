@@ -3,11 +3,23 @@ BigQuery persistence for reporter scrapers.
 
 Scrapers keep emitting logical dict keys (reporter_name, media, title_role, …).
 This module maps them to BigQuery-legal column names (snake_case, no / or #).
+
+REPORTERS_SINK_DIR replaces BigQuery with JSON files in that directory (one
+<script>.json per upsert, read back by fetch_all_reporter_rows); load tests
+use it to run the whole pipeline without touching the real table.
+
+One client is created per process and the table is checked once. After
+keep_row_snapshot(), the first fetch_all_reporter_rows() result is kept in
+memory and updated by every write, so later upserts in the same process
+(inprocess_runner) do not re-read the whole table.
 """
 
 from __future__ import annotations
 
+import glob
+import json
 import os
+import threading
 import uuid
 from typing import Any
 
@@ -15,6 +27,8 @@ from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
 from dotenv import load_dotenv
 
+import snapshots
+
 load_dotenv()
 
 MAX_PUB_ARTICLES = 10
@@ -23,6 +37,7 @@ PROJECT_ID = os.environ.get("GCP_PROJECT") or os.environ.get("GOOGLE_CLOUD_PROJE
 DATASET_ID = (os.environ.get("BIGQUERY_DATASET") or "").strip() or "reporter_scraper"
 # Default `reporters` avoids clashing with a legacy `Reporters` table that had invalid BQ identifiers.
 TABLE_ID = (os.environ.get("BIGQUERY_TABLE") or "").strip() or "reporters"
+SINK_DIR = (os.environ.get("REPORTERS_SINK_DIR") or "").strip()
 
 # --- Physical BigQuery columns (single source of truth; legal identifiers only) ---
 
@@ -70,12 +85,36 @@ BQ_DATA_FIELDS: list[str] = CORE_BQ_FIELDS + _pub_bq_field_names()
 RECORD_ID_FIELD = "record_id"
 
 
+_state_lock = threading.Lock()
+_bq_client: bigquery.Client | None = None
+_table_checked = False
+_keep_rows = False
+_row_snapshot: dict[str, dict[str, Any]] | None = None
+
+
 def _client() -> bigquery.Client:
+    global _bq_client
     if not PROJECT_ID:
         raise RuntimeError(
             "Set GCP_PROJECT or GOOGLE_CLOUD_PROJECT for BigQuery."
         )
-    return bigquery.Client(project=PROJECT_ID)
+    with _state_lock:
+        if _bq_client is None:
+            _bq_client = bigquery.Client(project=PROJECT_ID)
+        return _bq_client
+
+
+def keep_row_snapshot() -> None:
+    """Serve fetch_all_reporter_rows from memory after the first table read."""
+    global _keep_rows
+    _keep_rows = True
+
+
+def _remember_row(record_id: str, fields: dict[str, str]) -> None:
+    with _state_lock:
+        if _row_snapshot is not None:
+            row = _row_snapshot.setdefault(record_id, {RECORD_ID_FIELD: record_id})
+            row.update(fields)
 
 
 def _table_ref() -> str:
@@ -142,6 +181,9 @@ def row_for_bigquery(reporter: dict[str, Any]) -> dict[str, str]:
 
 
 def ensure_reporters_table_exists() -> None:
+    global _table_checked
+    if _table_checked:
+        return
     client = _client()
     dataset_ref = bigquery.Dataset(f"{PROJECT_ID}.{DATASET_ID}")
     try:
@@ -166,16 +208,42 @@ def ensure_reporters_table_exists() -> None:
     except NotFound:
         table = bigquery.Table(table_ref, schema=get_bigquery_schema())
         client.create_table(table)
+    _table_checked = True
+
+
+def _sink_path(source_script: str) -> str:
+    name = os.path.splitext(os.path.basename(source_script))[0]
+    return os.path.join(SINK_DIR, f"{name}.json")
+
+
+def _sink_rows() -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for path in sorted(glob.glob(os.path.join(SINK_DIR, "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding="utf-8") as f:
+            reporters = json.load(f)
+        for i, reporter in enumerate(reporters):
+            rows.append({RECORD_ID_FIELD: f"{name}:{i}", **row_for_bigquery(reporter)})
+    return rows
 
 
 def fetch_all_reporter_rows() -> list[dict[str, Any]]:
     """All rows as dicts (physical column names + record_id)."""
+    global _row_snapshot
+    if SINK_DIR:
+        return _sink_rows()
+    with _state_lock:
+        if _row_snapshot is not None:
+            return [dict(row) for row in _row_snapshot.values()]
     ensure_reporters_table_exists()
     client = _client()
     sql = f"SELECT * FROM {_table_ref()}"
     rows: list[dict[str, Any]] = []
     for r in client.query(sql).result():
         rows.append(dict(r.items()))
+    if _keep_rows:
+        with _state_lock:
+            _row_snapshot = {row[RECORD_ID_FIELD]: dict(row) for row in rows}
     return rows
 
 
@@ -206,6 +274,7 @@ def _bq_update_row(record_id: str, fields: dict[str, str]) -> None:
     client.query(
         sql, job_config=bigquery.QueryJobConfig(query_parameters=qp)
     ).result()
+    _remember_row(record_id, fields)
 
 
 def _as_str(v: Any) -> str:
@@ -230,9 +299,14 @@ def _bq_insert_row(record_id: str, fields: dict[str, str]) -> None:
     client.query(
         sql, job_config=bigquery.QueryJobConfig(query_parameters=qp)
     ).result()
+    _remember_row(record_id, fields)
 
 
 def update_reporter_twitter_only(record_id: str, twitter_url: str) -> None:
+    if SINK_DIR:
+        with open(os.path.join(SINK_DIR, "twitter_updates.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps({RECORD_ID_FIELD: record_id, COL_TWITTER_X: twitter_url}) + "\n")
+        return
     ensure_reporters_table_exists()
     client = _client()
     sql = (
@@ -246,6 +320,19 @@ def update_reporter_twitter_only(record_id: str, twitter_url: str) -> None:
         ]
     )
     client.query(sql, job_config=job_config).result()
+    _remember_row(record_id, {COL_TWITTER_X: twitter_url})
+
+
+def _write_json_output(reporters: list[dict[str, Any]], path: str, label: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(reporters, f, ensure_ascii=False, indent=2)
+    print(f"\n{label}: wrote {len(reporters)} reporters to {path} (BigQuery skipped)")
+
+
+def _write_replay_output(reporters: list[dict[str, Any]], source_script: str) -> None:
+    """Replayed runs never touch BigQuery; keep the payload for diffing instead."""
+    _write_json_output(reporters, snapshots.replay_output_path(source_script), "Replay")
 
 
 def upsert_reporters_merge(
@@ -258,7 +345,13 @@ def upsert_reporters_merge(
     """
     Upsert by nombre (and optionally email). create_only: twitter discovery inserts only.
     """
-    _ = source_script
+    if SINK_DIR:
+        _write_json_output(reporters, _sink_path(source_script), "Sink")
+        return
+    if snapshots.replaying():
+        _write_replay_output(reporters, source_script)
+        return
+
     ensure_reporters_table_exists()
     existing_rows = fetch_all_reporter_rows()
     print(f"\nLoaded {len(existing_rows)} existing reporters from BigQuery")
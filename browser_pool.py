@@ -0,0 +1,357 @@
+"""
+Shared Chromium pool for the Playwright-based scrapers.
+
+Chromium is launched once per process and driven from a dedicated event-loop
+thread, so sync scrapers, async scrapers (elvocero.py) and worker threads all
+share one browser. Callers borrow an isolated context/page from a bounded pool;
+pages are recycled after BROWSER_PAGE_MAX_USES navigations and the browser is
+relaunched transparently if it crashes. Every context aborts images, media,
+fonts and ad/analytics requests (see resource_blocking).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    TimeoutError as PlaywrightTimeoutError,
+    async_playwright,
+)
+from dotenv import load_dotenv
+
+import http_fetch
+import politeness
+import resource_blocking
+import site_profiles
+import snapshots
+
+load_dotenv()
+
+POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE") or 4)
+PAGE_MAX_USES = int(os.environ.get("BROWSER_PAGE_MAX_USES") or 25)
+HEADLESS = (os.environ.get("BROWSER_HEADLESS") or "1").strip() != "0"
+# Upper bound for readiness selectors and load-more waits.
+READY_TIMEOUT_MS = int(os.environ.get("BROWSER_READY_TIMEOUT_MS") or 15000)
+# Cloud Run has a tiny /dev/shm; Chromium crashes on large pages without this.
+LAUNCH_ARGS = ["--disable-dev-shm-usage"]
+
+T = TypeVar("T")
+PageAction = Callable[[Page], Awaitable[T]]
+
+
+# --- Event loop thread (owns every Playwright object) ---
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="browser-pool", daemon=True
+            ).start()
+            _loop = loop
+    return _loop
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+    """Schedule a coroutine on the pool's event loop (thread-safe)."""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop())
+
+
+class _Slot:
+    """One isolated browser context with a single reusable page."""
+
+    def __init__(self, context: BrowserContext, page: Page, generation: int):
+        self.context = context
+        self.page = page
+        self.generation = generation
+        self.navigations = 0
+
+        def _count(frame: Any) -> None:
+            if frame == page.main_frame:
+                self.navigations += 1
+
+        page.on("framenavigated", _count)
+
+
+class BrowserPool:
+    def __init__(self, size: int = POOL_SIZE, page_max_uses: int = PAGE_MAX_USES):
+        self.size = max(1, size)
+        self.page_max_uses = max(1, page_max_uses)
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._generation = 0
+        self._idle: list[_Slot] = []
+        self._slots = asyncio.Semaphore(self.size)
+        self._launch_lock = asyncio.Lock()
+
+    def _browser_alive(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _ensure_browser(self) -> Browser:
+        async with self._launch_lock:
+            if self._browser_alive():
+                return self._browser
+            if self._browser is not None:
+                print("  Warning: Chromium disconnected, relaunching browser")
+                self._idle.clear()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=HEADLESS, args=LAUNCH_ARGS
+            )
+            self._generation += 1
+            return self._browser
+
+    async def _new_slot(self) -> _Slot:
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        await resource_blocking.install(context)
+        page = await context.new_page()
+        return _Slot(context, page, self._generation)
+
+    async def _discard(self, slot: _Slot) -> None:
+        try:
+            await slot.context.close()
+        except Exception:
+            pass  # context already gone with a crashed browser
+
+    async def _acquire(self) -> _Slot:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                slot = self._idle.pop()
+                if (
+                    slot.generation == self._generation
+                    and self._browser_alive()
+                    and not slot.page.is_closed()
+                ):
+                    return slot
+                await self._discard(slot)
+            return await self._new_slot()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _release(self, slot: _Slot, broken: bool) -> None:
+        try:
+            if (
+                broken
+                or slot.navigations >= self.page_max_uses
+                or slot.generation != self._generation
+            ):
+                await self._discard(slot)
+            else:
+                self._idle.append(slot)
+        finally:
+            self._slots.release()
+
+    async def run(self, action: PageAction[T]) -> T:
+        """Run ``action(page)`` on a pooled page; retried once if Chromium crashed."""
+        for attempt in (1, 2):
+            slot = await self._acquire()
+            broken = False
+            try:
+                return await action(slot.page)
+            except Exception as e:
+                broken = True
+                if attempt == 1 and not self._browser_alive():
+                    print(f"  Warning: Chromium crashed ({e}), retrying on a new browser")
+                    continue
+                raise
+            finally:
+                await self._release(slot, broken)
+        raise RuntimeError("unreachable")
+
+    async def close(self) -> None:
+        for slot in self._idle:
+            await self._discard(slot)
+        self._idle.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_pool: BrowserPool | None = None
+
+
+async def _get_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+async def _run(action: PageAction[T]) -> T:
+    return await (await _get_pool()).run(action)
+
+
+def with_page(action: PageAction[T]) -> T:
+    """Run an async ``action(page)`` on a pooled page and return its result."""
+    return submit(_run(action)).result()
+
+
+async def awith_page(action: PageAction[T]) -> T:
+    """Async counterpart of with_page for callers running their own event loop."""
+    return await asyncio.wrap_future(submit(_run(action)))
+
+
+async def wait_until_ready(
+    page: Page, selectors: tuple[str, ...], timeout_ms: int = READY_TIMEOUT_MS
+) -> None:
+    """Wait until every selector is attached; raises PlaywrightTimeoutError."""
+    deadline = asyncio.get_running_loop().time() + timeout_ms / 1000
+    for selector in selectors:
+        remaining = max(1, int((deadline - asyncio.get_running_loop().time()) * 1000))
+        await page.wait_for_selector(selector, state="attached", timeout=remaining)
+
+
+async def wait_for_more(
+    page: Page, item_selector: str, previous_count: int, timeout_ms: int = READY_TIMEOUT_MS
+) -> int:
+    """
+    After a "load more" click, wait until more than previous_count elements
+    match item_selector. Returns the new count (unchanged if nothing loaded).
+    """
+    try:
+        await page.wait_for_function(
+            "([selector, count]) => document.querySelectorAll(selector).length > count",
+            arg=[item_selector, previous_count],
+            timeout=timeout_ms,
+        )
+    except PlaywrightTimeoutError:
+        pass
+    return await page.locator(item_selector).count()
+
+
+def _render(
+    url: str,
+    *,
+    wait_until: str,
+    networkidle_timeout: int | None,
+    settle_ms: int,
+    actions: PageAction[Any] | None,
+) -> PageAction[str]:
+    ready = site_profiles.ready_selectors(url)
+
+    async def render(page: Page) -> str:
+        # Try to wait for content, but continue if it times out
+        try:
+            if ready:
+                await page.goto(http_fetch.target_url(url), wait_until="domcontentloaded")
+                await wait_until_ready(page, ready)
+            else:
+                await page.goto(http_fetch.target_url(url), wait_until=wait_until)
+                if networkidle_timeout:
+                    await page.wait_for_load_state(
+                        "networkidle", timeout=networkidle_timeout
+                    )
+                if settle_ms:
+                    await page.wait_for_timeout(settle_ms)
+        except PlaywrightTimeoutError:
+            print(f"  Warning: Wait timeout, using partial content")
+
+        if actions is not None:
+            await actions(page)
+
+        # Always try to get content even if wait failed
+        return await page.content()
+
+    return render
+
+
+def fetch_html(
+    url: str,
+    *,
+    wait_until: str = "load",
+    networkidle_timeout: int | None = 10000,
+    settle_ms: int = 0,
+    actions: PageAction[Any] | None = None,
+) -> str | None:
+    """
+    Navigate a pooled page to url and return the rendered HTML (None on error).
+    Pages with a site_profiles entry are ready once its selectors are attached;
+    others wait for wait_until, networkidle_timeout and settle_ms.
+    actions, if given, runs after the page is ready (e.g. clicking "load more").
+    """
+    if snapshots.replaying():
+        return snapshots.load(url, "browser")
+    try:
+        politeness.acquire(url)
+        html_content = with_page(
+            _render(
+                url,
+                wait_until=wait_until,
+                networkidle_timeout=networkidle_timeout,
+                settle_ms=settle_ms,
+                actions=actions,
+            )
+        )
+    except Exception as e:
+        print(f"An error occurred while fetching HTML content: {e}")
+        return None
+    snapshots.save(url, "browser", html_content)
+    return html_content
+
+
+async def afetch_html(
+    url: str,
+    *,
+    wait_until: str = "load",
+    networkidle_timeout: int | None = 10000,
+    settle_ms: int = 0,
+    actions: PageAction[Any] | None = None,
+) -> str | None:
+    """Async counterpart of fetch_html."""
+    if snapshots.replaying():
+        return snapshots.load(url, "browser")
+    try:
+        await politeness.aacquire(url)
+        html_content = await awith_page(
+            _render(
+                url,
+                wait_until=wait_until,
+                networkidle_timeout=networkidle_timeout,
+                settle_ms=settle_ms,
+                actions=actions,
+            )
+        )
+    except Exception as e:
+        print(f"An error occurred while fetching HTML content: {e}")
+        return None
+    snapshots.save(url, "browser", html_content)
+    return html_content
+
+
+def shutdown() -> None:
+    """Close the shared browser; safe to call more than once."""
+    global _pool
+    if _pool is None or _loop is None:
+        return
+    pool, _pool = _pool, None
+    try:
+        submit(pool.close()).result(timeout=30)
+    except Exception as e:
+        print(f"  Warning: error while closing Chromium: {e}")
+
+
+atexit.register(shutdown)
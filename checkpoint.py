@@ -0,0 +1,221 @@
+"""
+Append-only checkpoint journal so an interrupted scraper run can resume.
+
+Each scraper module has one journal, CHECKPOINT_DIR/<module>.jsonl. Every
+completed step (a listing, an article's records, a reporter profile) is
+appended as one {"kind", "key", "value"} line as soon as it finishes. A run
+started with --resume (scraper_cli / run_all.py) loads the journal and takes
+those steps from it instead of fetching again; any other run starts a fresh
+journal. Empty results (fetch errors) are never journaled, so they are
+retried on resume.
+
+  @checkpoint.step("profile")              # first argument is the key
+  def extract_reporter_info(url): ...
+
+  infos = checkpoint.map_pages(__name__, "article", urls, fetch_many, parse)
+
+Config:
+  CHECKPOINT_DIR     journal location (default .cache/checkpoints); point it
+                     at a mounted volume for Cloud Run, whose local disk does
+                     not survive a task retry
+  CHECKPOINT_RESUME  "1" resumes; retried Cloud Run tasks
+                     (CLOUD_RUN_TASK_ATTEMPT > 0) resume automatically
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from dotenv import load_dotenv
+
+import snapshots
+
+load_dotenv()
+
+CHECKPOINT_DIR = (os.environ.get("CHECKPOINT_DIR") or "").strip() or os.path.join(
+    ".cache", "checkpoints"
+)
+
+T = TypeVar("T")
+
+_resume = (os.environ.get("CHECKPOINT_RESUME") or "").strip() == "1" or int(
+    os.environ.get("CLOUD_RUN_TASK_ATTEMPT") or 0
+) > 0
+_lock = threading.Lock()
+_journals: dict[str, dict[tuple[str, str], Any]] = {}
+
+
+def configure(*, resume: bool = False) -> None:
+    """Resume from the existing journals in this process (see scraper_cli)."""
+    global _resume
+    if resume:
+        _resume = True
+
+
+def resuming() -> bool:
+    return _resume
+
+
+def _enabled() -> bool:
+    # Replays are offline and deterministic; there is nothing to save.
+    return not snapshots.replaying()
+
+
+def _journal_name(module: str) -> str:
+    if module == "__main__":
+        return os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    return module
+
+
+def _path(name: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, f"{name}.jsonl")
+
+
+def _journal(module: str) -> dict[tuple[str, str], Any]:
+    """Entries for module's journal; opening it without resume starts it over."""
+    name = _journal_name(module)
+    with _lock:
+        entries = _journals.get(name)
+        if entries is not None:
+            return entries
+        entries = _journals[name] = {}
+        path = _path(name)
+        if _resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # a line cut short by the crash we are resuming from
+                        continue
+                    entries[(entry["kind"], entry["key"])] = entry["value"]
+            print(f"  Resuming {name}: {len(entries)} completed steps in {path}")
+        else:
+            os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+            open(path, "w", encoding="utf-8").close()
+        return entries
+
+
+def lookup(module: str, kind: str, key: str) -> tuple[bool, Any]:
+    """(True, value) if the step is in module's journal, else (False, None)."""
+    if not _enabled():
+        return False, None
+    entries = _journal(module)
+    found = (kind, key) in entries
+    return found, entries.get((kind, key))
+
+
+def record(module: str, kind: str, key: str, value: Any) -> None:
+    """Append a completed step to module's journal."""
+    if not _enabled():
+        return
+    entries = _journal(module)
+    line = json.dumps({"kind": kind, "key": key, "value": value}, ensure_ascii=False)
+    with _lock:
+        entries[(kind, key)] = value
+        try:
+            with open(_path(_journal_name(module)), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"  Warning: Could not write checkpoint for {key}: {e}")
+
+
+def step(kind: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Journal a function's non-empty results under its first argument; on
+    resume, return the journaled result without calling it. Works for
+    coroutine functions too.
+    """
+
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(key: str, *args: Any, **kwargs: Any) -> Any:
+                found, value = lookup(func.__module__, kind, key)
+                if found:
+                    return value
+                value = await func(key, *args, **kwargs)
+                if value:
+                    record(func.__module__, kind, key, value)
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(key: str, *args: Any, **kwargs: Any) -> Any:
+            found, value = lookup(func.__module__, kind, key)
+            if found:
+                return value
+            value = func(key, *args, **kwargs)
+            if value:
+                record(func.__module__, kind, key, value)
+            return value
+
+        return wrapper
+
+    return decorate
+
+
+def _split(module: str, kind: str, urls: list[str]) -> tuple[dict[str, Any], list[str]]:
+    done: dict[str, Any] = {}
+    todo: list[str] = []
+    for url in urls:
+        found, value = lookup(module, kind, url)
+        if found:
+            done[url] = value
+        else:
+            todo.append(url)
+    return done, todo
+
+
+def _parse_pages(
+    module: str,
+    kind: str,
+    urls: list[str],
+    done: dict[str, Any],
+    todo: list[str],
+    pages: Iterable[Any],
+    parse: Callable[[str, Any], T],
+) -> list[T]:
+    for url, html_content in zip(todo, pages):
+        done[url] = parse(url, html_content)
+        if html_content is not None:
+            record(module, kind, url, done[url])
+    return [done[url] for url in urls]
+
+
+def map_pages(
+    module: str,
+    kind: str,
+    urls: list[str],
+    fetch_many: Callable[[list[str]], Iterable[Any]],
+    parse: Callable[[str, Any], T],
+) -> list[T]:
+    """
+    parse(url, html) for every url, in order. Only urls missing from the
+    journal are fetched (fetch_many(urls) -> pages); results of pages that
+    were fetched are journaled.
+    """
+    done, todo = _split(module, kind, urls)
+    pages = fetch_many(todo) if todo else []
+    return _parse_pages(module, kind, urls, done, todo, pages, parse)
+
+
+async def amap_pages(
+    module: str,
+    kind: str,
+    urls: list[str],
+    fetch_many: Callable[[list[str]], Awaitable[Iterable[Any]]],
+    parse: Callable[[str, Any], T],
+) -> list[T]:
+    """map_pages with an async fetch_many (fetch_engine.afetch_many)."""
+    done, todo = _split(module, kind, urls)
+    pages = await fetch_many(todo) if todo else []
+    return _parse_pages(module, kind, urls, done, todo, pages, parse)
@@ -1,16 +1,25 @@
 import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import json
 import os
 from dotenv import load_dotenv
 import datetime
-import time
 
 load_dotenv()
 
+import checkpoint
+import extraction
+import fetch_engine
+import html_parser
+import reporter_state
+import scraper_cli
+import sharding
+import sitemaps
+import tiered_fetch
+import wp_api
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": True}
+
 
 authors = [
     {
@@ -89,40 +98,18 @@ claridad_pages = [
 ]
 
 
-def get_html_playwright(url: str):
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url)
-
-            # Try to wait for content, but continue if it times out
-            try:
-                page.wait_for_load_state("networkidle", timeout=10000)
-                page.wait_for_timeout(2000)
-            except Exception as wait_error:
-                print(f"  Warning: Wait timeout, using partial content")
-
-            # Always try to get content even if wait failed
-            html_content = page.content()
-            browser.close()
-            return html_content
-
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+def get_html(url: str):
+    return tiered_fetch.fetch_html(url)
 
 
-def get_reporters_list_from_articles(url: str) -> list[dict]:
-    """Fetch reporters list from articles on a given page URL"""
-
-    html_content = get_html_playwright(url)
+def get_reporters_list_from_articles(url: str, html_content: str | None) -> list[dict]:
+    """Extract reporters list from the articles on a fetched listing page"""
 
     if not html_content:
         print(f"  Warning: No content found for {url}")
         return []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parser.make_soup(html_content)
 
     # Find all article elements
     news_article_divs = list(
@@ -183,134 +170,95 @@ def get_reporters_list_from_articles(url: str) -> list[dict]:
             )
 
         reporters.extend(article_info)
-        time.sleep(1)
 
     print(f"Extracted {len(reporters)} reporters")
     return reporters
 
 
-def process_news_sources() -> list[dict]:
-    all_reporters = []
-    for news_url in claridad_pages:
-        print(f"\nProcessing news source: {news_url}")
-        reporters = get_reporters_list_from_articles(news_url)
-        all_reporters.extend(reporters)
-
-    return all_reporters
-
-
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "div",
-            class_="td_module_1 td_module_wrap td-animation-stack",
-        )
-    )
+def get_reporters_from_article(url: str, html_content: bytes | None) -> list[dict]:
+    """Extract reporters from a single article page (sitemap discovery)"""
 
-    print(f"  Found {len(articles_div_list)} articles")
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return []
 
-    articles = []
+    soup = html_parser.make_soup(html_content)
 
-    # maximum 4
-    for article_div in articles_div_list[:4]:
-        article_date = article_div.find("time", class_="entry-date")
-        if article_date:
-            article_date = article_date.get_text(strip=True)
-        else:
-            article_date = ""
+    article_author_div = soup.find("div", class_="td-post-author-name")
+    if not article_author_div:
+        return []
 
-        article_title = article_div.find("h3", class_="entry-title td-module-title")
-        if article_title:
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
+    article_title = soup.find("h1", class_="entry-title")
+    article_date = soup.find("time", class_="entry-date")
 
-        article_link = article_div.find("a")
-        if article_link and article_link.get("href"):
-            article_link = article_link["href"]
-        else:
-            article_link = ""
+    return [
+        {
+            "author_name": author_link.get_text(strip=True),
+            "author_url": (author_link.get("href") or "").rstrip("/"),
+            "title": article_title.get_text(strip=True) if article_title else "",
+            "date": article_date.get_text(strip=True) if article_date else "",
+            "link": url,
+        }
+        for author_link in article_author_div.find_all("a")
+    ]
 
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
 
-    return articles
+def process_news_sources() -> list[dict]:
+    # One REST API request covers all the listing pages below
+    reporters = wp_api.fetch_post_records(
+        "https://claridadpuertorico.com", category="ultimasnoticas"
+    )
+    if reporters:
+        return reporters
 
+    # Only the articles published since the last run
+    reporters = sitemaps.fetch_article_records(
+        "https://claridadpuertorico.com", get_reporters_from_article
+    )
+    if reporters is not None:
+        return reporters
 
-def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html_playwright(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
+    # render the listing pages concurrently
+    pages_html = fetch_engine.fetch_many(claridad_pages, browser="auto")
 
-        soup = BeautifulSoup(html_content, "html.parser")
+    all_reporters = []
+    for news_url, html_content in zip(claridad_pages, pages_html):
+        print(f"\nProcessing news source: {news_url}")
+        reporters = get_reporters_list_from_articles(news_url, html_content)
+        all_reporters.extend(reporters)
 
-        reporter_bio_section = soup.find("div", class_="td-ss-main-content")
-        if not reporter_bio_section:
-            print(f"  Warning: No author bio found for {url}")
-            return {}
+    return all_reporters
 
-        reporter_name = reporter_bio_section.find(
-            "h1", class_="entry-title td-page-title"
-        )
-        if reporter_name:
-            reporter_name = reporter_name.get_text(strip=True)
-        else:
-            reporter_name = ""
 
-        reporter_social_div = reporter_bio_section.find(
-            "div", class_="td-author-social"
-        )
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container="div.td-ss-main-content",
+        fields={
+            "name": extraction.Field("h1.entry-title.td-page-title"),
+        },
+        socials="div.td-author-social a[href]",
+        articles=extraction.ArticleList(
+            items="div.td_module_1.td_module_wrap.td-animation-stack",
+            fields={
+                "title": extraction.Field("h3.entry-title.td-module-title"),
+                "link": extraction.Field("a", "href", extraction.link()),
+                "date": extraction.Field("time.entry-date"),
+            },
+        ),
+        only=("div.td-ss-main-content", "div.td_module_1"),
+    )
+)
 
-        reporter_socials = []
-        if reporter_social_div:
-            reporter_socials = [
-                social["href"]
-                for social in reporter_social_div.find_all("a")
-                if social.get("href")
-            ]
-
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link.rstrip("/")
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link.rstrip("/")
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link.rstrip("/")
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link.rstrip("/")
-            elif "mailto:" in social_link:
-                reporter_email = social_link.replace("mailto:", "")
-
-        articles = get_articles(soup)
-
-        return {
-            "name": reporter_name,
-            "title": "",
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
-            "topics": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
+@checkpoint.step("profile")
+def extract_reporter_info(url: str) -> dict:
+    html_content = get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
         return {}
 
+    return PROFILE.parse(url, html_content)
+
 
 def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
     """Transform flat list to grouped structure and fetch profile info"""
@@ -359,6 +307,7 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 }
             )
 
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} unique reporters...")
 
     processed_reporters = []
@@ -373,7 +322,9 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
 
         # Get profile info if URL exists
-        reporter_info = extract_reporter_info(reporter_url)
+        reporter_info = reporter_state.profile(
+            reporter_url, extract_reporter_info, reporter.get("articles")
+        )
 
         processed_reporters.append(
             {
@@ -401,14 +352,20 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
 
 
 
-def main():
+def scrape() -> list[dict]:
     # Step 1: Get all articles and reporters
     reporters_flat = process_news_sources()
 
     reporters = process_reporters_list(reporters_flat)
 
-    upsert_reporters_merge(reporters, "claridad.py", match_emails=True)
+    return reporters
+
+
+def main():
+    upsert_reporters_merge(scrape(), "claridad.py", **SYNC_OPTIONS)
+    sitemaps.commit_watermarks()
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
@@ -1,15 +1,24 @@
 from bs4 import BeautifulSoup
 import json
-import requests
 import os
-import time
-import random
 from dotenv import load_dotenv
 
+import article_metadata
+import checkpoint
+import extraction
+import fetch_engine
+import html_parser
+import http_cache
+import http_fetch
+import reporter_state
+import scraper_cli
+import sharding
 from bigquery_sync import upsert_reporters_merge
 
 load_dotenv()
 
+SYNC_OPTIONS = {"match_emails": True}
+
 section_headings = set(
     [
         "Noticias",
@@ -24,30 +33,18 @@ section_headings = set(
 )
 
 
-def get_html(url: str):
-    try:
-        # Send GET request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
-
-        return response.content
+def extract_reporters(url: str) -> list[dict]:
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return []
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+    return http_cache.memoize(parse_reporters, url, html_content)
 
 
-def extract_reporters(url: str) -> list[dict]:
+def parse_reporters(url: str, html_content: bytes) -> list[dict]:
     try:
-        html_content = get_html(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return []
-
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content)
 
         sections = list(
             child
@@ -94,11 +91,17 @@ def extract_reporters(url: str) -> list[dict]:
         return []
 
 
-def get_article_info(url: str) -> dict:
+def get_article_info(url: str, html_content: bytes | None) -> dict:
     try:
-        html_content = get_html(url)
+        metadata = article_metadata.extract(html_content)
+        if metadata.title and metadata.date:
+            return {
+                "title": metadata.title,
+                "link": url,
+                "date": metadata.date,
+            }
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content)
 
         article_title = soup.find("h1", class_="article-headline__title")
         if article_title:
@@ -119,36 +122,59 @@ def get_article_info(url: str) -> dict:
         return {}
 
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
+def get_article_urls(soup: BeautifulSoup) -> list[str]:
     articles_div_list = list(
         soup.find_all(
             "article", class_="standard-teaser-container condensed-horizontal news"
         )
     )
 
-    articles = []
+    article_urls = []
     for article in articles_div_list[:4]:
         anchor = article.find(
             "a", class_="standard-teaser-image-container no-decoration square"
         )
         if anchor and anchor.get("href"):
             url = ("https://www.elnuevodia.com" + anchor["href"]).rstrip("/")
-            article_info = get_article_info(url)
-            articles.append(article_info)
+            article_urls.append(url)
+    return article_urls
+
 
-            time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
+def get_articles(article_urls: list[str]) -> list[dict]:
+    # fetch the article pages concurrently
+    pages = fetch_engine.fetch_many(article_urls)
+
+    articles = []
+    for url, html_content in zip(article_urls, pages):
+        articles.append(get_article_info(url, html_content))
 
     return articles
 
 
+@checkpoint.step("profile")
 def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return {}
+
+    # Only the profile page is memoized; its articles are fetched every time.
+    reporter_info = http_cache.memoize(parse_reporter_info, url, html_content)
+    if reporter_info:
+        reporter_info["articles"] = get_articles(reporter_info.pop("article_urls"))
+    return reporter_info
+
+
+PROFILE_CONTAINERS = (
+    "div.author-bio-block__container__flex-info",
+    "div.author-detail-page__container__block-container",
+    "article.standard-teaser-container",
+)
+
 
-        soup = BeautifulSoup(html_content, "html.parser")
+def parse_reporter_info(url: str, html_content: bytes) -> dict:
+    try:
+        soup = html_parser.make_soup(html_content, only=PROFILE_CONTAINERS)
 
         reporter_bio_div = soup.find(
             "div", class_="author-bio-block__container__flex-info"
@@ -181,20 +207,7 @@ def extract_reporter_info(url: str) -> dict:
                 if social.get("href")
             ]
 
-        # I want to select the one social link that has "twitter.com" or "x.com" in it
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link
+        socials = extraction.classify_socials(reporter_socials)
 
         reporter_topics = ""
         reporter_title = ""
@@ -217,18 +230,16 @@ def extract_reporter_info(url: str) -> dict:
             elif title_text == "Título oficial" and subtitle_div:
                 reporter_title = subtitle_div.get_text(strip=True)
 
-        articles = get_articles(soup)
-
         return {
             "name": reporter_name,
             "title": reporter_title,
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
+            "email": reporter_email or socials["email"],
+            "twitter": socials["twitter"],
+            "linkedin": socials["linkedin"],
+            "instagram": socials["instagram"],
+            "facebook": socials["facebook"],
             "topics": reporter_topics,
-            "articles": articles,
+            "article_urls": get_article_urls(soup),
         }
 
     except Exception as e:
@@ -237,12 +248,15 @@ def extract_reporter_info(url: str) -> dict:
 
 
 def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
+    reporters_list = sharding.mine(__name__, reporters_list, "profile_url")
     print(f"\nProcessing {len(reporters_list)} reporters...")
     reporters = []
 
     for idx, reporter in enumerate(reporters_list, 1):
         print(f"[{idx}/{len(reporters_list)}] {reporter['name']}")
-        reporter_info = extract_reporter_info(reporter["profile_url"])
+        reporter_info = reporter_state.profile(
+            reporter["profile_url"], extract_reporter_info
+        )
 
         media_name = "El Nuevo Día"
         media_type = ""
@@ -269,13 +283,11 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
             }
         )
 
-        time.sleep(random.uniform(1, 3))  # sleep for 1 to 3 seconds
-
     print(f"[OK] Completed {len(reporters)} reporters")
     return reporters
 
 
-def main():
+def scrape() -> list[dict]:
     url = "https://www.elnuevodia.com/sobre-nosotros/"
 
     reporters_list = extract_reporters(url)
@@ -283,10 +295,15 @@ def main():
     # only last reporter for testing
     reporters = process_reporters_list(reporters_list)
 
-    upsert_reporters_merge(reporters, "elnuevodia.py", match_emails=True)
+    return reporters
+
+
+def main():
+    upsert_reporters_merge(scrape(), "elnuevodia.py", **SYNC_OPTIONS)
 
     print("All done!")
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
@@ -1,16 +1,25 @@
-import requests
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
 import json
 import os
 from dotenv import load_dotenv
 import asyncio
-import random
 
+import browser_pool
+import checkpoint
+import extraction
+import fetch_engine
+import html_parser
+import http_fetch
+import pagination
+import reporter_state
+import scraper_cli
+import sharding
 from bigquery_sync import upsert_reporters_merge
 
 load_dotenv()
 
+SYNC_OPTIONS = {"match_emails": True}
+
 authors = [
     {
         "name": "Ayeza Díaz Rolón",
@@ -83,50 +92,26 @@ authors = [
 ]
 
 
-async def initialize_playwright():
-    p = await async_playwright().start()
-    browser = await p.chromium.launch(headless=True)
-    page = await browser.new_page()
-    return p, browser, page
+ARTICLE_ITEMS = "div.asset"
+LOAD_MORE_BUTTON = "#dycol-trigger-63d64ab0-910a-11ec-b48d-b7ebc0fc5bca"
 
 
-def get_html_requests(url: str):
-    try:
-        # Send GET request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
+async def get_html_playwright(url: str):
+    return await browser_pool.afetch_html(url)
 
-        return response.content
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+async def load_more_articles(page) -> None:
+    load_more_button = page.locator(LOAD_MORE_BUTTON)
 
+    count = await page.locator(ARTICLE_ITEMS).count()
+    while await load_more_button.is_visible():
+        await load_more_button.click()
 
-async def get_html_playwright(url: str):
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
-            # Try to wait for content, but continue if it times out
-            try:
-                await page.goto(url)
-                await page.wait_for_load_state("networkidle", timeout=20000)
-            except Exception as wait_error:
-                print(f"  Warning: Wait timeout, using partial content")
-
-            # Always try to get content even if wait failed
-            html_content = await page.content()
-            await browser.close()
-            return html_content
-
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+        # wait for content to load
+        new_count = await browser_pool.wait_for_more(page, ARTICLE_ITEMS, count)
+        if new_count == count:
+            break
+        count = new_count
 
 
 async def get_reporters_list(url):
@@ -134,7 +119,7 @@ async def get_reporters_list(url):
     if not html_content:
         return []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parser.make_soup(html_content)
 
     reporters_profiles = []
     reporters_divs = list(soup.find_all("div", class_="conocenos-block"))
@@ -164,18 +149,19 @@ async def get_reporters_list(url):
     return reporters_profiles
 
 
-async def get_reporter_info_from_article(article_div):
+def get_article_url(article_div) -> str:
     article_link = article_div.find("a", class_="tnt-asset-link")
     if not article_link or not article_link.has_attr("href"):
-        return None, None
+        return ""
+
+    return ("https://www.elvocero.com" + article_link["href"]).rstrip("/")
 
-    article_url = ("https://www.elvocero.com" + article_link["href"]).rstrip("/")
 
-    html_content = await get_html_playwright(article_url)
+def get_reporter_info_from_article(html_content):
     if not html_content:
         return None, None
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parser.make_soup(html_content)
 
     reporter_div = soup.find("span", class_="tnt-byline asset-byline")
     if not reporter_div:
@@ -190,62 +176,65 @@ async def get_reporter_info_from_article(article_div):
     return reporter_name, reporter_link
 
 
-async def get_reporters_list_from_articles(url):
-    p, browser, page = await initialize_playwright()
-    try:
-        # Increase timeout and use domcontentloaded for faster loading
-        try:
-            await page.goto(url)
-            await page.wait_for_load_state("networkidle", timeout=15000)
-        except Exception as goto_error:
-            print(
-                f"  Warning: Timeout on initial page load, continuing with partial content..."
-            )
+def get_article_urls(html_content) -> list[str]:
+    soup = html_parser.make_soup(html_content)
 
-        load_more_button = page.locator(
-            "#dycol-trigger-63d64ab0-910a-11ec-b48d-b7ebc0fc5bca"
-        )
+    news_article_divs = list(soup.find_all("div", class_="asset"))
+    return [
+        article_url
+        for article_url in (get_article_url(div) for div in news_article_divs)
+        if article_url
+    ]
 
-        while await load_more_button.is_visible():
-            await load_more_button.click()
 
-            await asyncio.sleep(3)  # wait for content to load
+@checkpoint.step("listing")
+async def get_reporters_list_from_articles(url):
+    listing = await pagination.afetch_listing(
+        url,
+        button=LOAD_MORE_BUTTON,
+        items=ARTICLE_ITEMS,
+        fallback=load_more_articles,
+    )
+    if not listing.html:
+        return []
 
-        html_content = await page.content()
-        soup = BeautifulSoup(html_content, "html.parser")
+    article_urls = get_article_urls(listing.html)
+    for body in listing.pages:
+        for fragment in pagination.html_fragments(body):
+            article_urls.extend(get_article_urls(fragment))
+    # pages can overlap when new stories are published mid-run
+    article_urls = list(dict.fromkeys(article_urls))
+
+    # render the article pages concurrently (bounded per host), skipping the
+    # ones a resumed run already parsed
+    bylines = await checkpoint.amap_pages(
+        __name__,
+        "article",
+        article_urls,
+        lambda urls: fetch_engine.afetch_many(urls, browser=True),
+        lambda url, html_content: get_reporter_info_from_article(html_content),
+    )
 
-        news_article_divs = list(soup.find_all("div", class_="asset"))
-        reporters = []
-        for article_div in news_article_divs:
-            reporter_name, reporter_link = await get_reporter_info_from_article(
-                article_div
+    reporters = []
+    for reporter_name, reporter_link in bylines:
+        if reporter_name and reporter_link:
+            reporters.append(
+                {
+                    "name": reporter_name,
+                    "url": reporter_link.rstrip("/"),
+                }
             )
-            if reporter_name and reporter_link:
-                reporters.append(
-                    {
-                        "name": reporter_name,
-                        "url": reporter_link.rstrip("/"),
-                    }
-                )
 
-            await asyncio.sleep(random.uniform(5, 10))  # sleep for 5 to 10 seconds
-
-        # Remove duplicates based on reporter URL
-        unique_reporters = {
-            reporter["url"]: reporter for reporter in reporters
-        }.values()
-        return list(unique_reporters)
-
-    finally:
-        await browser.close()
-        await p.stop()
+    # Remove duplicates based on reporter URL
+    unique_reporters = {
+        reporter["url"]: reporter for reporter in reporters
+    }.values()
+    return list(unique_reporters)
 
 
-async def get_article_info(url: str) -> dict:
+def get_article_info(url: str, html_content: str | None) -> dict:
     try:
-        html_content = await get_html_playwright(url)
-
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content)
 
         article_title = soup.find("h1", class_="headline")
         if article_title:
@@ -286,7 +275,7 @@ async def get_articles(soup: BeautifulSoup) -> list[dict]:
         )
     )
 
-    articles = []
+    article_links = []
 
     # maximum 4
     for article_div in articles_div_list[:4]:
@@ -298,7 +287,14 @@ async def get_articles(soup: BeautifulSoup) -> list[dict]:
         else:
             article_link = ""
 
-        article_info = await get_article_info(article_link)
+        article_links.append(article_link)
+
+    # render the article pages concurrently (bounded per host)
+    pages = await fetch_engine.afetch_many(article_links, browser=True)
+
+    articles = []
+    for article_link, html_content in zip(article_links, pages):
+        article_info = get_article_info(article_link, html_content)
 
         articles.append(
             {
@@ -308,11 +304,16 @@ async def get_articles(soup: BeautifulSoup) -> list[dict]:
             }
         )
 
-        await asyncio.sleep(random.uniform(5, 10))  # sleep for 5 to 10 seconds
-
     return articles
 
 
+PROFILE_CONTAINERS = (
+    "section#profile-main",
+    "div#posts",
+)
+
+
+@checkpoint.step("profile")
 async def extract_reporter_info(url: str) -> dict:
     try:
         html_content = await get_html_playwright(url)
@@ -320,7 +321,7 @@ async def extract_reporter_info(url: str) -> dict:
             print(f"  Warning: No content found for {url}")
             return {}
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content, only=PROFILE_CONTAINERS)
 
         reporter_bio_section = soup.find("section", id="profile-main")
         if not reporter_bio_section:
@@ -349,33 +350,18 @@ async def extract_reporter_info(url: str) -> dict:
                 if social.get("href")
             ]
 
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link
-            elif "mailto:" in social_link:
-                reporter_email = social_link.replace("mailto:", "")
+        socials = extraction.classify_socials(reporter_socials)
 
         articles = await get_articles(soup)
 
         return {
             "name": reporter_name,
             "title": reporter_title,
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
+            "email": socials["email"],
+            "twitter": socials["twitter"],
+            "linkedin": socials["linkedin"],
+            "instagram": socials["instagram"],
+            "facebook": socials["facebook"],
             "topics": "",
             "articles": articles,
         }
@@ -386,6 +372,7 @@ async def extract_reporter_info(url: str) -> dict:
 
 
 async def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} reporters...")
     reporters = []
 
@@ -396,7 +383,7 @@ async def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
         reporter_title = reporter.get("title") or ""
 
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
-        reporter_info = await extract_reporter_info(reporter_url)
+        reporter_info = await reporter_state.aprofile(reporter_url, extract_reporter_info)
 
         media_name = "El Vocero"
         media_type = ""
@@ -421,13 +408,11 @@ async def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
             }
         )
 
-        await asyncio.sleep(random.uniform(5, 10))  # sleep for 5 to 10 seconds
-
     print(f"[OK] Completed {len(reporters)} reporters")
     return reporters
 
 
-async def main():
+async def scrape() -> list[dict]:
     reporters_list = await get_reporters_list_from_articles(
         "https://www.elvocero.com/lo-mas-reciente/lo-m-s-reciente/collection_63d64ab0-910a-11ec-b48d-b7ebc0fc5bca.html"
     )
@@ -451,10 +436,15 @@ async def main():
 
     reporters = await process_reporters_list(reporters_list)
 
-    upsert_reporters_merge(reporters, "elvocero.py", match_emails=True)
+    return reporters
+
+
+async def main():
+    upsert_reporters_merge(await scrape(), "elvocero.py", **SYNC_OPTIONS)
 
     print("All done!")
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     asyncio.run(main())
@@ -0,0 +1,198 @@
+"""
+Declarative author-page extraction shared by the scrapers.
+
+Each outlet describes its author page as a ProfileSpec: the bio container,
+the fields read inside it (CSS selector, optional attribute, optional
+transform), where its social links are, and an ArticleList of teasers.
+compile_profile() compiles every selector once with soupsieve at import
+time; the resulting ProfileExtractor parses a page (only the spec's
+containers, see html_parser) and returns the reporter info dict the scrapers
+already produce:
+
+  {name, title, email, twitter, linkedin, instagram, facebook, topics, articles}
+
+parse_many() runs one extractor over a batch of documents.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+from typing import Any, Callable, Iterable, NamedTuple
+from urllib.parse import urljoin, urlsplit
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+import html_parser
+
+PROFILE_KEYS = ["name", "title", "email", "twitter", "linkedin", "instagram", "facebook", "topics"]
+
+SOCIAL_DOMAINS = {
+    "twitter": ("twitter.com", "x.com"),
+    "facebook": ("facebook.com",),
+    "linkedin": ("linkedin.com",),
+    "instagram": ("instagram.com",),
+}
+
+
+def classify_socials(links: Iterable[str]) -> dict[str, str]:
+    """Map profile links to email/twitter/facebook/linkedin/instagram (last one wins)."""
+    found = dict.fromkeys(["email", *SOCIAL_DOMAINS], "")
+    for link in links:
+        link = (link or "").strip()
+        if link.startswith("mailto:"):
+            found["email"] = link[len("mailto:") :].split("?", 1)[0]
+            continue
+        host = urlsplit(link).netloc.lower()
+        for key, domains in SOCIAL_DOMAINS.items():
+            if any(host == domain or host.endswith("." + domain) for domain in domains):
+                found[key] = link.rstrip("/")
+                break
+        else:
+            if "@" in link and "/" not in link:
+                found["email"] = link
+    return found
+
+
+def link(base: str | None = None) -> Callable[[str], str]:
+    """Transform for hrefs: resolved against base, without the trailing slash."""
+
+    def transform(href: str) -> str:
+        return (urljoin(base, href) if base else href).rstrip("/")
+
+    return transform
+
+
+def iso_date(value: str) -> str:
+    """Transform for ISO datetimes: 2025-12-12T17:50:33-04:00 -> 12/12/2025."""
+    try:
+        return datetime.datetime.fromisoformat(value).strftime("%d/%m/%Y")
+    except ValueError:
+        return ""
+
+
+class Field(NamedTuple):
+    # None reads the container (or teaser item) itself.
+    selector: str | None = None
+    # None reads the stripped text.
+    attr: str | None = None
+    transform: Callable[[str], str] | None = None
+
+
+class ArticleList(NamedTuple):
+    items: str
+    # title / link / date
+    fields: dict[str, Field]
+    limit: int = 4
+
+
+class ProfileSpec(NamedTuple):
+    # Bio container; None reads the fields from the whole page.
+    container: str | None
+    # Any of PROFILE_KEYS except the social ones.
+    fields: dict[str, Field]
+    # Social/email links inside the container, None if the page has none.
+    socials: str | None = None
+    articles: ArticleList | None = None
+    # Simple "tag.class" / "tag#id" selectors to parse (html_parser only=).
+    only: tuple[str, ...] = ()
+    # Without the container, return the articles alone instead of {}.
+    container_optional: bool = False
+
+
+def _describe(value: Any) -> str:
+    """Stable text for a spec: selectors as-is, transforms by name and closure."""
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k!r}:{_describe(v)}" for k, v in sorted(value.items())) + "}"
+    if isinstance(value, tuple):
+        return f"{type(value).__name__}(" + ",".join(_describe(v) for v in value) + ")"
+    if callable(value):
+        cells = getattr(value, "__closure__", None) or ()
+        captured = ",".join(_describe(cell.cell_contents) for cell in cells)
+        return f"{value.__module__}.{value.__qualname__}({captured})"
+    return repr(value)
+
+
+class _CompiledField:
+    def __init__(self, field: Field) -> None:
+        self.select = soupsieve.compile(field.selector) if field.selector else None
+        self.attr = field.attr
+        self.transform = field.transform
+
+    def value(self, element: Tag) -> str:
+        found = element if self.select is None else self.select.select_one(element)
+        if found is None:
+            return ""
+        if self.attr is None:
+            value = found.get_text(strip=True)
+        else:
+            value = found.get(self.attr) or ""
+            if isinstance(value, list):
+                value = " ".join(value)
+        return self.transform(value) if value and self.transform else value
+
+
+class ProfileExtractor:
+    """A ProfileSpec with every selector compiled."""
+
+    def __init__(self, spec: ProfileSpec) -> None:
+        self.spec = spec
+        # Changes with any selector or transform; see http_cache.memoize(version=).
+        self.version = hashlib.sha256(_describe(spec).encode("utf-8")).hexdigest()[:16]
+        self.container = soupsieve.compile(spec.container) if spec.container else None
+        self.fields = {key: _CompiledField(field) for key, field in spec.fields.items()}
+        self.socials = soupsieve.compile(spec.socials) if spec.socials else None
+        self.items = None
+        self.article_fields: dict[str, _CompiledField] = {}
+        if spec.articles is not None:
+            self.items = soupsieve.compile(spec.articles.items)
+            self.article_fields = {
+                key: _CompiledField(field) for key, field in spec.articles.fields.items()
+            }
+
+    def articles(self, soup: BeautifulSoup) -> list[dict]:
+        if self.items is None:
+            return []
+        articles = []
+        for item in self.items.select(soup, limit=self.spec.articles.limit):
+            article = {"title": "", "link": "", "date": ""}
+            article.update({key: f.value(item) for key, f in self.article_fields.items()})
+            articles.append(article)
+        return articles
+
+    def extract(self, url: str, soup: BeautifulSoup) -> dict:
+        """Reporter info from a parsed page ({} if the container is missing)."""
+        container: Any = soup
+        if self.container is not None:
+            container = self.container.select_one(soup)
+            if container is None:
+                print(f"  Warning: No author bio found for {url}")
+                if not self.spec.container_optional:
+                    return {}
+
+        info: dict[str, Any] = dict.fromkeys(PROFILE_KEYS, "")
+        if container is not None:
+            info.update({key: f.value(container) for key, f in self.fields.items()})
+            if self.socials is not None:
+                links = [a.get("href") or "" for a in self.socials.select(container)]
+                info.update(classify_socials(links))
+        info["articles"] = self.articles(soup)
+        return info
+
+    def parse(self, url: str, html_content: bytes | str) -> dict:
+        """Reporter info for one author page."""
+        try:
+            soup = html_parser.make_soup(html_content, only=self.spec.only)
+            return self.extract(url, soup)
+        except Exception as e:
+            print(f"Error: An error occurred while extracting reporter info: {e}")
+            return {}
+
+    def parse_many(self, pages: Iterable[tuple[str, bytes | str | None]]) -> list[dict]:
+        """parse() over (url, html_content) pairs; {} for pages without content."""
+        return [self.parse(url, html) if html else {} for url, html in pages]
+
+
+def compile_profile(spec: ProfileSpec) -> ProfileExtractor:
+    return ProfileExtractor(spec)
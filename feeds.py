@@ -0,0 +1,166 @@
+"""
+RSS/Atom feed ingestion for article discovery.
+
+A feed carries title, link, date and author for dozens of items in one small
+response, so a section's feed can replace rendering its listing and fetching
+every article. Feeds are discovered from <link rel="alternate"> tags on the
+section page, then from well-known locations (WordPress /feed/, BLOX ?f=rss,
+Arc outboundfeeds). They are parsed with a streaming XML parser into the flat
+{author_name, title, date, link} records process_reporters_list consumes.
+Sections of one site often resolve to the same site-wide feed; each feed URL
+is fetched once per run and falling back to a site-wide feed is reported.
+"""
+
+from __future__ import annotations
+
+import datetime
+import email.utils
+import io
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import SoupStrainer
+
+import html_parser
+import http_fetch
+
+FEED_TYPES = {"application/rss+xml", "application/atom+xml"}
+
+# Relative to the section URL, then to the site root.
+WELL_KNOWN_FEEDS = ["feed/", "?f=rss", "/arc/outboundfeeds/rss/?outputType=xml"]
+
+# feed URL -> records (None: missing or not a feed), for this run.
+_fetched: dict[str, list[dict] | None] = {}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def discover_feeds(page_url: str, html_content: bytes | str | None = None) -> list[str]:
+    """Feed URLs advertised by page_url, the page's own section first."""
+    if html_content is None:
+        html_content = http_fetch.get_html(page_url)
+
+    advertised = []
+    if html_content:
+        head_links = SoupStrainer("link", rel="alternate")
+        soup = html_parser.make_soup(html_content, parse_only=head_links)
+        for link in soup.find_all("link"):
+            if (link.get("type") or "").lower() in FEED_TYPES and link.get("href"):
+                advertised.append(urljoin(page_url, link["href"]))
+
+    path = urlsplit(page_url).path.rstrip("/")
+    advertised.sort(key=lambda feed: not (path and path in urlsplit(feed).path))
+    parts = urlsplit(page_url)
+    site_root = f"{parts.scheme}://{parts.netloc}/"
+    candidates = [urljoin(page_url, feed) for feed in WELL_KNOWN_FEEDS]
+    candidates += [urljoin(site_root, feed) for feed in WELL_KNOWN_FEEDS]
+    return list(dict.fromkeys(advertised + candidates))
+
+
+def _date(value: str) -> str:
+    value = value.strip()
+    if not value:
+        return ""
+    try:
+        # RSS: Tue, 12 Dec 2025 17:50:33 -0400
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            # Atom: 2025-12-12T17:50:33-04:00
+            parsed = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return ""
+    return parsed.strftime("%d/%m/%Y")
+
+
+def _rss_author(value: str) -> str:
+    # RSS <author> is "email (Name)"; dc:creator is just the name.
+    value = value.strip()
+    if value.endswith(")") and "(" in value:
+        return value[value.index("(") + 1 : -1].strip()
+    return value
+
+
+def parse_feed(body: bytes | str) -> list[dict]:
+    """One {author_name, title, date, link} record per (item, author)."""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    records = []
+    title = link = date = ""
+    authors: list[str] = []
+    for event, elem in ET.iterparse(io.BytesIO(body), events=("start", "end")):
+        name = _local(elem.tag)
+        if event == "start":
+            if name in ("item", "entry"):
+                title, link, date, authors = "", "", "", []
+            continue
+
+        text = (elem.text or "").strip()
+        if name == "title" and not title:
+            title = text
+        elif name == "link" and not link:
+            # Atom links are attributes; prefer rel="alternate" (the default).
+            if elem.get("href") and elem.get("rel", "alternate") == "alternate":
+                link = elem.get("href")
+            elif text:
+                link = text
+        elif name in ("pubDate", "published", "date") and not date:
+            date = _date(text)
+        elif name == "updated" and not date:
+            date = _date(text)
+        elif name in ("creator", "author") and elem.find("*") is None and text:
+            authors.append(_rss_author(text))
+        elif name == "name" and text:
+            # Atom <author><name>
+            authors.append(text)
+        elif name in ("item", "entry"):
+            for author in dict.fromkeys(authors):
+                records.append(
+                    {
+                        "author_name": author,
+                        "title": title,
+                        "date": date,
+                        "link": link.strip().rstrip("/"),
+                    }
+                )
+            elem.clear()
+    return records
+
+
+def _fetch_feed(feed_url: str) -> list[dict] | None:
+    body = http_fetch.get_html(feed_url)
+    if not body:
+        return None
+    try:
+        return parse_feed(body)
+    except ET.ParseError:
+        return None
+
+
+def fetch_feed(feed_url: str) -> list[dict] | None:
+    """Records from feed_url, or None if it is missing or not a feed."""
+    if feed_url not in _fetched:
+        _fetched[feed_url] = _fetch_feed(feed_url)
+    records = _fetched[feed_url]
+    return None if records is None else list(records)
+
+
+def fetch_records(page_url: str, html_content: bytes | str | None = None) -> list[dict]:
+    """Records from the first feed for page_url that yields any."""
+    path = urlsplit(page_url).path.rstrip("/")
+    for feed_url in discover_feeds(page_url, html_content):
+        records = fetch_feed(feed_url)
+        if not records:
+            continue
+        if path and path not in urlsplit(feed_url).path:
+            print(
+                f"  Warning: No section feed for {page_url}; using site-wide feed "
+                f"{feed_url} ({len(records)} author records)"
+            )
+        else:
+            print(f"  Using feed {feed_url} ({len(records)} author records)")
+        return records
+    return []
@@ -0,0 +1,91 @@
+"""
+Concurrent fetch engine shared by the scrapers.
+
+Scrapers submit batches of URLs and get results back in order (fetch_many) or
+as they complete (iter_completed). Fetches run on the browser pool's event loop:
+plain HTTP goes through http_fetch's pooled sessions in worker threads, browser
+fetches through pooled Playwright pages, and browser="auto" tries HTTP first and
+escalates to the browser only when needed (tiered_fetch). In-flight requests are bounded per
+host (FETCH_PER_HOST_LIMIT) and globally (FETCH_GLOBAL_LIMIT).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+from collections.abc import Iterable, Iterator
+from typing import Any, Literal
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+import browser_pool
+import http_fetch
+import tiered_fetch
+
+load_dotenv()
+
+GLOBAL_LIMIT = int(os.environ.get("FETCH_GLOBAL_LIMIT") or 8)
+PER_HOST_LIMIT = int(os.environ.get("FETCH_PER_HOST_LIMIT") or 2)
+
+Content = bytes | str | None
+Tier = bool | Literal["auto"]
+
+# Only touched from the browser pool's event loop thread.
+_global_slots: asyncio.Semaphore | None = None
+_host_slots: dict[str, asyncio.Semaphore] = {}
+
+
+def _slots_for(url: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+    global _global_slots
+    if _global_slots is None:
+        _global_slots = asyncio.Semaphore(max(1, GLOBAL_LIMIT))
+    host = urlsplit(url).netloc.lower()
+    if host not in _host_slots:
+        _host_slots[host] = asyncio.Semaphore(max(1, PER_HOST_LIMIT))
+    return _global_slots, _host_slots[host]
+
+
+async def _fetch(url: str, browser: Tier, browser_opts: dict[str, Any]) -> Content:
+    if not url:
+        return None
+    global_slots, host_slots = _slots_for(url)
+    async with host_slots, global_slots:
+        if browser == "auto":
+            return await tiered_fetch.afetch_html(url, **browser_opts)
+        if browser:
+            return await browser_pool.afetch_html(url, **browser_opts)
+        return await asyncio.to_thread(http_fetch.get_html, url)
+
+
+def _submit_all(
+    urls: Iterable[str], browser: Tier, browser_opts: dict[str, Any]
+) -> list[concurrent.futures.Future[Content]]:
+    return [browser_pool.submit(_fetch(url, browser, browser_opts)) for url in urls]
+
+
+def fetch_many(
+    urls: Iterable[str], *, browser: Tier = False, **browser_opts: Any
+) -> list[Content]:
+    """Fetch urls concurrently; results are in input order (None on error)."""
+    return [f.result() for f in _submit_all(urls, browser, browser_opts)]
+
+
+def iter_completed(
+    urls: Iterable[str], *, browser: Tier = False, **browser_opts: Any
+) -> Iterator[tuple[str, Content]]:
+    """Yield (url, content) pairs as each fetch completes."""
+    urls = list(urls)
+    futures = _submit_all(urls, browser, browser_opts)
+    by_future = dict(zip(futures, urls))
+    for future in concurrent.futures.as_completed(futures):
+        yield by_future[future], future.result()
+
+
+async def afetch_many(
+    urls: Iterable[str], *, browser: Tier = False, **browser_opts: Any
+) -> list[Content]:
+    """fetch_many for callers running their own event loop (e.g. elvocero.py)."""
+    futures = _submit_all(urls, browser, browser_opts)
+    return list(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
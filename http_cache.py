@@ -0,0 +1,269 @@
+"""
+Persistent HTTP response cache with conditional revalidation.
+
+Responses are stored in SQLite keyed by URL together with their ETag and
+Last-Modified validators. The next fetch of the same URL sends If-None-Match /
+If-Modified-Since and a 304 is served from disk. Parse results can be memoized
+per response body (memoize), so unchanged pages skip parsing as well.
+
+Config:
+  HTTP_CACHE              "0" disables the cache (default enabled)
+  HTTP_CACHE_DIR          directory for cache.sqlite (default .cache)
+  HTTP_CACHE_FRESH_SECONDS serve without revalidating within this age (default 0)
+  HTTP_CACHE_TTL_DAYS     drop entries not used for this many days (default 30)
+  HTTP_CACHE_MAX_MB       total body size before LRU eviction (default 512)
+  HTTP_CACHE_MAX_PARSED_MB total size of memoized parses before LRU eviction (default 64)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Callable, NamedTuple
+
+import requests
+from dotenv import load_dotenv
+
+import html_parser
+
+load_dotenv()
+
+ENABLED = (os.environ.get("HTTP_CACHE") or "1").strip() != "0"
+CACHE_DIR = (os.environ.get("HTTP_CACHE_DIR") or "").strip() or ".cache"
+FRESH_SECONDS = float(os.environ.get("HTTP_CACHE_FRESH_SECONDS") or 0)
+TTL_SECONDS = float(os.environ.get("HTTP_CACHE_TTL_DAYS") or 30) * 86400
+MAX_BYTES = int(float(os.environ.get("HTTP_CACHE_MAX_MB") or 512) * 1024 * 1024)
+MAX_PARSED_BYTES = int(float(os.environ.get("HTTP_CACHE_MAX_PARSED_MB") or 64) * 1024 * 1024)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    body_hash TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS parsed (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    accessed_at REAL NOT NULL
+);
+"""
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return FRESH_SECONDS > 0 and time.time() - self.stored_at < FRESH_SECONDS
+
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(
+            os.path.join(CACHE_DIR, "cache.sqlite"), check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        cutoff = time.time() - TTL_SECONDS
+        conn.execute("DELETE FROM responses WHERE accessed_at < ?", (cutoff,))
+        conn.execute("DELETE FROM parsed WHERE accessed_at < ?", (cutoff,))
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def lookup(url: str) -> CachedResponse | None:
+    if not ENABLED:
+        return None
+    with _lock:
+        row = _db().execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+    return CachedResponse(*row) if row else None
+
+
+def conditional_headers(entry: CachedResponse | None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def touch(url: str) -> None:
+    """Mark a revalidated (304) entry as used and fresh again."""
+    if not ENABLED:
+        return
+    now = time.time()
+    with _lock:
+        db = _db()
+        db.execute(
+            "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+            (now, now, url),
+        )
+        db.commit()
+
+
+def store(url: str, response: requests.Response) -> None:
+    """Keep a 200 response if the server gave us something to revalidate with."""
+    if not ENABLED:
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified and FRESH_SECONDS <= 0:
+        return  # could never be reused
+    body = response.content
+    now = time.time()
+    with _lock:
+        db = _db()
+        db.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(url, body, body_hash, etag, last_modified, stored_at, accessed_at, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                body,
+                hashlib.sha256(body).hexdigest(),
+                etag,
+                last_modified,
+                now,
+                now,
+                len(body),
+            ),
+        )
+        _evict(db)
+        db.commit()
+
+
+def _evict(db: sqlite3.Connection) -> None:
+    """Drop least recently used responses until the cache is under MAX_BYTES."""
+    (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+    if total <= MAX_BYTES:
+        return
+    target = int(MAX_BYTES * 0.9)
+    for url, size in db.execute(
+        "SELECT url, size FROM responses ORDER BY accessed_at"
+    ).fetchall():
+        db.execute("DELETE FROM responses WHERE url = ?", (url,))
+        total -= size
+        if total <= target:
+            break
+
+
+def _evict_parsed(db: sqlite3.Connection) -> None:
+    """Drop least recently used parses until they are under MAX_PARSED_BYTES."""
+    (total,) = db.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM parsed").fetchone()
+    if total <= MAX_PARSED_BYTES:
+        return
+    target = int(MAX_PARSED_BYTES * 0.9)
+    for key, size in db.execute(
+        "SELECT key, LENGTH(value) FROM parsed ORDER BY accessed_at"
+    ).fetchall():
+        db.execute("DELETE FROM parsed WHERE key = ?", (key,))
+        total -= size
+        if total <= target:
+            break
+
+
+@lru_cache(maxsize=None)
+def _source_hash(module_name: str) -> str:
+    """
+    Hash of a module's source and of the local modules it uses: the ones it
+    imports (extraction, html_parser, ...) and the ones defining the functions,
+    classes and objects it imports from others, so editing a parser, a selector
+    or a helper invalidates its results.
+    """
+    digest = hashlib.sha256()
+    module = sys.modules.get(module_name)
+    if module is None:
+        return digest.hexdigest()[:16]
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+    modules = {module.__name__: module}
+    for value in vars(module).values():
+        if isinstance(value, ModuleType):
+            modules.setdefault(value.__name__, value)
+            continue
+        defined_in = getattr(value, "__module__", None)
+        if isinstance(defined_in, str) and defined_in in sys.modules:
+            modules.setdefault(defined_in, sys.modules[defined_in])
+    for _, mod in sorted(modules.items()):
+        path = getattr(mod, "__file__", None)
+        if not path or os.path.dirname(os.path.abspath(path)) != local_dir:
+            continue
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def memoize(
+    parse: Callable[[str, Any], Any],
+    url: str,
+    html_content: bytes | str | None,
+    version: str = "",
+) -> Any:
+    """
+    parse(url, html_content), reusing the stored result when the same parser
+    already processed an identical body. Results must be JSON-serializable.
+    Stored results are dropped when the source of parse's module or of the
+    local modules it imports changes; pass version to also key on anything
+    else the result depends on (e.g. ProfileExtractor.version).
+    """
+    if not ENABLED or not html_content:
+        return parse(url, html_content)
+
+    body = html_content.encode() if isinstance(html_content, str) else html_content
+    key = "|".join(
+        [
+            f"{parse.__module__}.{parse.__qualname__}",
+            _source_hash(parse.__module__),
+            version,
+            html_parser.backend(),
+            url,
+            hashlib.sha256(body).hexdigest(),
+        ]
+    )
+    now = time.time()
+    with _lock:
+        db = _db()
+        row = db.execute("SELECT value FROM parsed WHERE key = ?", (key,)).fetchone()
+        if row:
+            db.execute("UPDATE parsed SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+            return json.loads(row[0])
+
+    value = parse(url, html_content)
+    if value:  # don't pin failed parses
+        with _lock:
+            db = _db()
+            db.execute(
+                "INSERT OR REPLACE INTO parsed (key, value, accessed_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now),
+            )
+            _evict_parsed(db)
+            db.commit()
+    return value
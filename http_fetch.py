@@ -0,0 +1,143 @@
+"""
+Pooled HTTP fetching shared by every scraper.
+
+One keep-alive requests.Session per host (each with its own sized connection
+pool), uniform timeouts and retries, and a single place for request headers.
+
+HTTP_ORIGIN_OVERRIDE (e.g. http://127.0.0.1:8765) sends every request to that
+server instead, as <override>/<host><path>; sessions, politeness, the cache and
+snapshots still see the original URL. scripts/load_harness.py uses it to run
+the pipeline against scripts/fake_news_server.py.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+import http_cache
+import politeness
+import snapshots
+
+load_dotenv()
+
+TIMEOUT = float(os.environ.get("HTTP_TIMEOUT") or 10)
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE") or 10)
+RETRIES = int(os.environ.get("HTTP_RETRIES") or 2)
+ORIGIN_OVERRIDE = (os.environ.get("HTTP_ORIGIN_OVERRIDE") or "").strip().rstrip("/")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
+)
+
+
+def _accept_encoding() -> str:
+    # urllib3 only decodes brotli when a brotli package is importable.
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return "gzip, deflate"
+    return "gzip, deflate, br"
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": _accept_encoding(),
+    "Accept-Language": "es-PR,es;q=0.9,en;q=0.8",
+}
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def target_url(url: str) -> str:
+    """Where url is actually requested (on ORIGIN_OVERRIDE when set)."""
+    if not ORIGIN_OVERRIDE:
+        return url
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{ORIGIN_OVERRIDE}/{parts.netloc}{parts.path or '/'}{query}"
+
+
+def session_for(url: str) -> requests.Session:
+    """Keep-alive session dedicated to url's host (created on first use)."""
+    host = _host(url)
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _new_session()
+    return session
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    """GET through the host's pooled session; raises requests exceptions."""
+    kwargs.setdefault("timeout", TIMEOUT)
+    politeness.acquire(url)
+    return session_for(url).get(target_url(url), **kwargs)
+
+
+def get_html(url: str) -> bytes | None:
+    """
+    Page body as bytes, or None (after logging) on any error. Bodies are kept
+    in http_cache and revalidated with If-None-Match / If-Modified-Since.
+    """
+    if snapshots.replaying():
+        return snapshots.load(url, "http")
+    html_content = _get_html(url)
+    snapshots.save(url, "http", html_content)
+    return html_content
+
+
+def _get_html(url: str) -> bytes | None:
+    try:
+        cached = http_cache.lookup(url)
+        if cached is not None and cached.fresh:
+            return cached.body
+
+        response = get(url, headers=http_cache.conditional_headers(cached))
+        if response.status_code == 304 and cached is not None:
+            http_cache.touch(url)
+            return cached.body
+        response.raise_for_status()  # Raise exception for bad status codes
+        http_cache.store(url, response)
+        return response.content
+
+    except Exception as e:
+        print(f"An error occurred while fetching HTML content: {e}")
+        return None
+
+
+def close_all() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,178 @@
+"""
+In-process runner behind run_all.py --in-process.
+
+Instead of one Python process per script, every scraper module is imported
+once and its scrape() entry point is called from pipeline tasks. The
+scrapers then share one browser (browser_pool), one set of keep-alive
+sessions (http_fetch) and one BigQuery client whose table snapshot is read
+once and kept current in memory (bigquery_sync.keep_row_snapshot). The
+reporters they return are upserted together by the sync stage; the Twitter
+scripts run end to end (scrape() plus their own sync, or main()).
+
+Output is split per script as with subprocesses: logs/<script>.log plus a
+[script]-prefixed console stream. Output from threads a scraper starts itself
+is not attributed and goes to the console unprefixed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import inspect
+import io
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Callable, TextIO
+
+import bigquery_sync
+import browser_pool
+import http_fetch
+import sync_reporters
+
+_sync_lock = threading.Lock()
+
+
+class _ScriptStreams(io.TextIOBase):
+    """sys.stdout replacement that routes each runner thread's output to its script."""
+
+    def __init__(self, console: TextIO) -> None:
+        self.console = console
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self, name: str, log: TextIO) -> None:
+        self._local.name = name
+        self._local.log = log
+        self._local.partial = ""
+
+    def stop(self) -> None:
+        if getattr(self._local, "partial", ""):
+            self.write("\n")
+        self._local.name = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        name = getattr(self._local, "name", None)
+        if name is None:
+            with self._lock:
+                self.console.write(text)
+            return len(text)
+
+        self._local.log.write(text)
+        *lines, self._local.partial = (self._local.partial + text).split("\n")
+        if lines:
+            with self._lock:
+                self.console.write("".join(f"[{name}] {line}\n" for line in lines))
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            self.console.flush()
+
+
+def _scrape(module: ModuleType) -> list[dict]:
+    result: Any = module.scrape()
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+class InProcessRunner:
+    """
+    Task actions for pipeline.run over imported script modules. Use as a
+    context manager: output is split per script while it is open, and the
+    shared browser and HTTP sessions are closed on exit.
+    """
+
+    def __init__(self, log_dir: str) -> None:
+        self.log_dir = log_dir
+        self.modules: dict[str, ModuleType] = {}
+        self.scraped: dict[str, list[dict]] = {}
+        self.streams = _ScriptStreams(sys.stdout)
+
+    def load(self, scripts: list[str]) -> list[str]:
+        """Import scripts; returns the ones that failed to import."""
+        failed = []
+        for script in scripts:
+            try:
+                self.modules[script] = importlib.import_module(script.replace(".py", ""))
+            except Exception:
+                traceback.print_exc()
+                print(f"[FAIL] {script} could not be imported")
+                failed.append(script)
+        return failed
+
+    def __enter__(self) -> InProcessRunner:
+        bigquery_sync.keep_row_snapshot()
+        sys.stdout = self.streams
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        sys.stdout = self.streams.console
+        browser_pool.shutdown()
+        http_fetch.close_all()
+
+    def _logged(self, script: str, action: Callable[[], object]) -> bool:
+        name = script.replace(".py", "")
+        log_file = f"{self.log_dir}/{name}.log"
+        print(f"\n[OK] Running {script}")
+
+        ok = True
+        with open(log_file, "w", encoding="utf-8") as log:
+            self.streams.start(name, log)
+            try:
+                action()
+            except Exception:
+                traceback.print_exc(file=sys.stdout)
+                ok = False
+            finally:
+                self.streams.stop()
+
+        if ok:
+            print(f"[OK] {script} completed")
+        else:
+            print(f"[FAIL] {script} (see {log_file})")
+        return ok
+
+    def scrape(self, script: str) -> bool:
+        """Run script's scrape() and keep its reporters for sync()."""
+
+        def action() -> None:
+            self.scraped[script] = _scrape(self.modules[script])
+
+        return script in self.modules and self._logged(script, action)
+
+    def sync(
+        self,
+        scripts: list[str],
+        sitemap_marks: list[str] | None = None,
+        reporter_states: list[str] | None = None,
+    ) -> bool:
+        """Consolidated upsert of what the scripts scraped (see sync_reporters)."""
+
+        def action() -> None:
+            staged = {s: self.scraped[s] for s in scripts if s in self.scraped}
+            if not staged:
+                raise RuntimeError("Nothing scraped to sync")
+            sync_reporters.sync(staged, sitemap_marks, reporter_states)
+
+        return self._logged("sync_reporters.py", action)
+
+    def run(self, script: str) -> bool:
+        """Run script end to end: scrape() and its own sync, or main()."""
+
+        def action() -> None:
+            module = self.modules[script]
+            if not hasattr(module, "scrape"):
+                module.main()
+                return
+            reporters = _scrape(module)
+            with _sync_lock:
+                bigquery_sync.upsert_reporters_merge(reporters, script, **module.SYNC_OPTIONS)
+
+        return script in self.modules and self._logged(script, action)
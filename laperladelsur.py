@@ -1,17 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import json
 import os
 from dotenv import load_dotenv
 import datetime
-import time
-import random
 
 load_dotenv()
 
+import browser_pool
+import checkpoint
+import extraction
+import html_parser
+import http_cache
+import http_fetch
+import reporter_state
+import site_profiles
+import snapshots
+import scraper_cli
+import sharding
+import wp_api
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 reporters = [
     {
@@ -49,45 +58,68 @@ reporters = [
 ]
 
 
-def initialize_playwright():
-    p = sync_playwright().start()
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-    return p, browser, page
+def collect_listing_pages(url: str):
+    ready = site_profiles.ready_selectors(url)
 
+    async def collect(page) -> list[str]:
+        try:
+            await page.goto(
+                http_fetch.target_url(url), timeout=15000, wait_until="domcontentloaded"
+            )
+            await browser_pool.wait_until_ready(page, ready)
+        except Exception as e:
+            print(f"Warning: Wait timeout, using partial content{e}")
+
+        pages_html = []
+        for i in range(5):
+            pages_html.append(await page.content())
+
+            # Pagination - follow the "next" link until the page limit
+            try:
+                next_button = page.locator("a.next")
+                if await next_button.is_visible():
+                    print("  Clicking next page...")
+                    async with page.expect_navigation(wait_until="domcontentloaded"):
+                        await next_button.click()
+                    await browser_pool.wait_until_ready(page, ready)
+                else:
+                    print("  No more pages found")
+                    break
+            except Exception as e:
+                break
 
-def get_html_requests(url: str):
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+        return pages_html
 
+    return collect
 
+
+@checkpoint.step("listing")
 def get_reporters_list_from_articles(url: str) -> list[dict]:
     """Fetch reporters list from articles on a given page URL"""
 
-    p, browser, page = initialize_playwright()
-    try:
-        page.goto(url, timeout=15000, wait_until="domcontentloaded")
-    except Exception as e:
-        print(f"Warning: Wait timeout, using partial content{e}")
-        page.wait_for_timeout(2000)
+    # One REST API request covers the listing pages clicked through below,
+    # limited to the section's category like the browser fallback
+    reporters = wp_api.fetch_post_records(url, category=wp_api.section_slug(url))
+    if reporters:
+        return reporters
 
-    reporters = []
-    for i in range(5):
-        html_content = page.content()
+    if snapshots.replaying():
+        pages_html = snapshots.load_many(url, "browser")
+    else:
+        try:
+            pages_html = browser_pool.with_page(collect_listing_pages(url))
+        except Exception as e:
+            print(f"An error occurred while fetching HTML content: {e}")
+            return []
+        snapshots.save_many(url, "browser", pages_html)
 
+    reporters = []
+    for i, html_content in enumerate(pages_html):
         if not html_content:
             print(f"  Warning: No content found for {url}")
             return []
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content)
 
         # Find all article elements
         news_article_divs = list(
@@ -153,137 +185,43 @@ def get_reporters_list_from_articles(url: str) -> list[dict]:
 
             reporters.extend(article_info)
 
-            time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
-
-        # Pagination - move next button click outside of article loop
-        try:
-            next_button = page.locator("a.next")
-            if next_button.is_visible():
-                print("  Clicking next page...")
-                next_button.click()
-                page.wait_for_timeout(2000)
-            else:
-                print("  No more pages found")
-                break
-        except Exception as e:
-            break
-
-    # Cleanup
-    browser.close()
-    p.stop()
-
     return reporters
 
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "div",
-            class_="jeg_postblock_content",
-        )
-    )
-
-    articles = []
-
-    # maximum 4
-    for article_div in articles_div_list[:4]:
-        article_date = article_div.find("div", class_="jeg_meta_date")
-        if article_date:
-            article_date = article_date.get_text(strip=True)
-        else:
-            article_date = ""
-
-        article_title = article_div.find("h3", class_="jeg_post_title")
-        if article_title:
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
-
-        article_link = article_div.find("a")
-        if article_link and article_link.get("href"):
-            article_link = article_link["href"].rstrip("/")
-        else:
-            article_link = ""
-
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
-
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
-
-    return articles
-
-
+@checkpoint.step("profile")
 def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html_requests(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
-
-        soup = BeautifulSoup(html_content, "html.parser")
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return {}
 
-        reporter_bio_section = soup.find("div", class_="jeg_author_content")
-        if not reporter_bio_section:
-            print(f"  Warning: No author bio found for {url}")
-            return {}
+    return http_cache.memoize(
+        parse_reporter_info, url, html_content, version=PROFILE.version
+    )
 
-        reporter_name = reporter_bio_section.find("h3", class_="jeg_author_name fn")
-        if reporter_name:
-            reporter_name = reporter_name.get_text(strip=True)
-        else:
-            reporter_name = ""
 
-        reporter_social_div = reporter_bio_section.find(
-            "div", class_="jeg_author_socials"
-        )
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container="div.jeg_author_content",
+        fields={
+            "name": extraction.Field("h3.jeg_author_name.fn"),
+        },
+        socials="div.jeg_author_socials a[href]",
+        articles=extraction.ArticleList(
+            items="div.jeg_postblock_content",
+            fields={
+                "title": extraction.Field("h3.jeg_post_title"),
+                "link": extraction.Field("a", "href", extraction.link()),
+                "date": extraction.Field("div.jeg_meta_date"),
+            },
+        ),
+        only=("div.jeg_author_content", "div.jeg_postblock_content"),
+    )
+)
 
-        reporter_socials = []
-        if reporter_social_div:
-            reporter_socials = [
-                social["href"]
-                for social in reporter_social_div.find_all("a")
-                if social.get("href")
-            ]
-
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link
-            elif "mailto:" in social_link:
-                reporter_email = social_link.replace("mailto:", "")
-
-        articles = get_articles(soup)
-
-        return {
-            "name": reporter_name,
-            "title": "",
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
-            "topics": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
-        return {}
+def parse_reporter_info(url: str, html_content: bytes) -> dict:
+    return PROFILE.parse(url, html_content)
 
 
 def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
@@ -333,6 +271,7 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 }
             )
 
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} reporters...")
 
     processed_reporters = []
@@ -347,7 +286,9 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
 
         # Get profile info if URL exists
-        reporter_info = extract_reporter_info(reporter_url)
+        reporter_info = reporter_state.profile(
+            reporter_url, extract_reporter_info, reporter.get("articles")
+        )
 
         processed_reporters.append(
             {
@@ -370,14 +311,12 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
             }
         )
 
-        time.sleep(random.uniform(1, 3))  # sleep for 1 to 3 seconds
-
     print(f"[OK] Completed {len(processed_reporters)} reporters")
     return processed_reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     # Step 1: Get all articles and reporters
     reporters_flat = get_reporters_list_from_articles(
         "https://www.periodicolaperla.com/ahora/"
@@ -385,10 +324,15 @@ def main():
 
     reporters = process_reporters_list(reporters_flat)
 
-    upsert_reporters_merge(reporters, "laperladelsur.py", match_emails=False)
+    return reporters
+
+
+def main():
+    upsert_reporters_merge(scrape(), "laperladelsur.py", **SYNC_OPTIONS)
 
     print("All done!")
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
@@ -1,17 +1,23 @@
 import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import json
 import os
 from dotenv import load_dotenv
-import time
-import random
 import datetime
 
 load_dotenv()
 
+import browser_pool
+import checkpoint
+import extraction
+import html_parser
+import pagination
+import reporter_state
+import scraper_cli
+import sharding
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 authors = [
     {
@@ -33,173 +39,140 @@ authors = [
 ]
 
 
-def initialize_playwright():
-    p = sync_playwright().start()
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-    return p, browser, page
+ARTICLE_ITEMS = "div.b-results-list"
+LOAD_MORE_BUTTON = ".c-button.c-button--medium.c-button--primary"
 
 
 def get_html_playwright(url: str):
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-
-            # Try to wait for content, but continue if it times out
-            try:
-                page.goto(url)
-                page.wait_for_load_state("networkidle", timeout=10000)
-                page.wait_for_timeout(5000)
-            except Exception as wait_error:
-                print(f"  Warning: Wait timeout, using partial content")
+    return browser_pool.fetch_html(url)
 
-            # Always try to get content even if wait failed
-            html_content = page.content()
-            browser.close()
-            return html_content
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+async def load_more_articles(page) -> None:
+    load_more_button = page.locator(LOAD_MORE_BUTTON)
+    count = await page.locator(ARTICLE_ITEMS).count()
 
+    i = 1
+    while await load_more_button.is_visible() and i <= 10:
+        print(f"Loading more articles... ({i})")
+        await load_more_button.click()
 
-def get_reporters_list_from_articles(url):
-    p, browser, page = initialize_playwright()
-    try:
-        page.goto(url)
-        load_more_button = page.locator(".c-button.c-button--medium.c-button--primary")
+        # wait for the new articles to be attached
+        new_count = await browser_pool.wait_for_more(page, ARTICLE_ITEMS, count)
+        if new_count == count:
+            print("  No more articles loaded")
+            break
+        count = new_count
+        i += 1
 
-        i = 1
-        while load_more_button.is_visible() and i <= 10:
-            print(f"Loading more articles... ({i})")
-            load_more_button.click()
 
-            # wait for content to load
-            page.wait_for_timeout(5000)
-            i += 1
+def arc_stories(body) -> list[dict] | None:
+    """Stories in an Arc content API response (None if body is not one)."""
+    payload = pagination.json_body(body)
+    if isinstance(payload, dict) and isinstance(payload.get("content_elements"), list):
+        return payload["content_elements"]
+    return None
 
-        html_content = page.content()
-        soup = BeautifulSoup(html_content, "html.parser")
 
-        news_article_divs = list(
-            soup.find_all("div", class_="b-results-list b-results-list--show-image")
-        )
-        reporters = []
-        for article_div in news_article_divs:
-
-            article_title = article_div.find("h2", class_="c-heading")
-            if article_title:
-                article_title = article_title.find("a")
-                if article_title and article_title.has_attr("href"):
-                    article_link = (
-                        "https://www.metro.pr" + article_title["href"]
-                    ).rstrip("/")
-                    article_title = article_title.get_text(strip=True)
-                else:
-                    article_link = ""
-                    article_title = ""
-            else:
-                article_link = ""
-                article_title = ""
+def get_reporters_from_arc_stories(stories: list[dict]) -> list[dict]:
+    reporters = []
+    for story in stories:
+        article_title = (story.get("headlines") or {}).get("basic") or ""
+        article_link = story.get("canonical_url") or story.get("website_url") or ""
+        if article_link:
+            article_link = ("https://www.metro.pr" + article_link).rstrip("/")
+
+        article_date = story.get("display_date") or ""
+        if article_date:
+            # 2025-11-04T16:29:04.458Z -> 04/11/2025
+            article_date = datetime.datetime.fromisoformat(article_date).strftime(
+                "%d/%m/%Y"
+            )
 
-            attribution_div = article_div.find("div", class_="c-attribution")
-            if not attribution_div:
+        for author in (story.get("credits") or {}).get("by") or []:
+            reporter_name = (author.get("name") or "").strip()
+            if not reporter_name:
                 continue
+            reporter_link = author.get("url") or ""
+            if reporter_link:
+                reporter_link = ("https://www.metro.pr" + reporter_link).rstrip("/")
 
-            article_date = attribution_div.find("time", class_="c-date")
-            if article_date and article_date.has_attr("datetime"):
-                # 2025-11-04T16:29:04.458Z -> 04/11/2025
-                article_date = article_date.get("datetime")
-                article_date = datetime.datetime.fromisoformat(article_date).strftime(
-                    "%d/%m/%Y"
-                )
-            else:
-                article_date = ""
-
-            reporter_link_tags = list(attribution_div.find_all("a"))
-
-            if reporter_link_tags == []:
-                texts = [
-                    t.strip()
-                    for t in attribution_div.find_all(string=True, recursive=False)
-                ]
-
-                if not texts or len(texts) == 0:
-                    continue
-
-                reporter_name = texts[0].replace("Por", "").replace("\xa0", "").strip()
-
-                reporters.append(
-                    {
-                        "name": reporter_name,
-                        "reporter_url": "",
-                        "article_title": article_title,
-                        "article_link": article_link,
-                        "article_date": article_date,
-                    }
-                )
-                continue
+            reporters.append(
+                {
+                    "name": reporter_name,
+                    "reporter_url": reporter_link,
+                    "article_title": article_title,
+                    "article_link": article_link,
+                    "article_date": article_date,
+                }
+            )
 
-            for reporter_link_tag in reporter_link_tags:
-                reporter_name = reporter_link_tag.get_text(strip=True)
-                reporter_link = (
-                    "https://www.metro.pr" + reporter_link_tag.get("href") or ""
-                ).rstrip("/")
-                if reporter_link == "https://www.metro.pr":
-                    reporter_link = ""
+    return reporters
 
-                reporters.append(
-                    {
-                        "name": reporter_name,
-                        "reporter_url": reporter_link,
-                        "article_title": article_title,
-                        "article_link": article_link,
-                        "article_date": article_date,
-                    }
-                )
 
-            time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
+def has_listing_items(body) -> bool:
+    stories = arc_stories(body)
+    if stories is not None:
+        return bool(stories)
+    return pagination.contains_items(body, ARTICLE_ITEMS)
 
-        return reporters
 
-    finally:
-        browser.close()
-        p.stop()
+@checkpoint.step("listing")
+def get_reporters_list_from_articles(url):
+    listing = pagination.fetch_listing(
+        url,
+        button=LOAD_MORE_BUTTON,
+        items=ARTICLE_ITEMS,
+        fallback=load_more_articles,
+        max_pages=10,
+        has_items=has_listing_items,
+    )
+    if not listing.html:
+        print(f"  Warning: No content found for {url}")
+        return []
 
+    reporters = get_reporters_from_listing_html(listing.html)
+    for body in listing.pages:
+        stories = arc_stories(body)
+        if stories is not None:
+            reporters.extend(get_reporters_from_arc_stories(stories))
+            continue
+        for fragment in pagination.html_fragments(body):
+            reporters.extend(get_reporters_from_listing_html(fragment))
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    article_div = soup.find("div", class_="c-stack b-results-list__wrapper")
-    if not article_div:
-        print("  Warning: No articles section found")
-        return []
+    return reporters
 
-    articles_div_list = list(
-        article_div.find_all(
-            "div",
-            class_="b-results-list b-results-list--show-image",
-        )
-    )
 
-    articles = []
+def get_reporters_from_listing_html(html_content) -> list[dict]:
+    soup = html_parser.make_soup(html_content)
 
-    # maximum 4
-    for article_div in articles_div_list[:4]:
-        article_link = article_div.find("a", class_="c-link")
-        if article_link and article_link.get("href"):
-            article_link = ("https://www.metro.pr" + article_link["href"]).rstrip("/")
-        else:
-            article_link = ""
+    news_article_divs = list(
+        soup.find_all("div", class_="b-results-list b-results-list--show-image")
+    )
+    reporters = []
+    for article_div in news_article_divs:
 
         article_title = article_div.find("h2", class_="c-heading")
         if article_title:
-            article_title = article_title.get_text(strip=True)
+            article_title = article_title.find("a")
+            if article_title and article_title.has_attr("href"):
+                article_link = (
+                    "https://www.metro.pr" + article_title["href"]
+                ).rstrip("/")
+                article_title = article_title.get_text(strip=True)
+            else:
+                article_link = ""
+                article_title = ""
         else:
+            article_link = ""
             article_title = ""
 
-        article_date = article_div.find("time", class_="c-date")
+        attribution_div = article_div.find("div", class_="c-attribution")
+        if not attribution_div:
+            continue
+
+        article_date = attribution_div.find("time", class_="c-date")
         if article_date and article_date.has_attr("datetime"):
-            # 2025-12-12T17:50:33-04:00 -> 12/12/2025
+            # 2025-11-04T16:29:04.458Z -> 04/11/2025
             article_date = article_date.get("datetime")
             article_date = datetime.datetime.fromisoformat(article_date).strftime(
                 "%d/%m/%Y"
@@ -207,96 +180,85 @@ def get_articles(soup: BeautifulSoup) -> list[dict]:
         else:
             article_date = ""
 
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
+        reporter_link_tags = list(attribution_div.find_all("a"))
 
-    return articles
+        if reporter_link_tags == []:
+            texts = [
+                t.strip()
+                for t in attribution_div.find_all(string=True, recursive=False)
+            ]
 
+            if not texts or len(texts) == 0:
+                continue
 
-def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html_playwright(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
+            reporter_name = texts[0].replace("Por", "").replace("\xa0", "").strip()
 
-        soup = BeautifulSoup(html_content, "html.parser")
+            reporters.append(
+                {
+                    "name": reporter_name,
+                    "reporter_url": "",
+                    "article_title": article_title,
+                    "article_link": article_link,
+                    "article_date": article_date,
+                }
+            )
+            continue
 
-        reporter_bio_section = soup.find(
-            "div", class_="c-stack b-full-author-bio__text"
-        )
-        if not reporter_bio_section:
-            print(f"  Warning: No author bio found for {url}")
-            return {}
+        for reporter_link_tag in reporter_link_tags:
+            reporter_name = reporter_link_tag.get_text(strip=True)
+            reporter_link = (
+                "https://www.metro.pr" + reporter_link_tag.get("href") or ""
+            ).rstrip("/")
+            if reporter_link == "https://www.metro.pr":
+                reporter_link = ""
 
-        reporter_name = reporter_bio_section.find(
-            "h2", class_="c-heading b-full-author-bio__name"
-        )
-        if reporter_name:
-            reporter_name = reporter_name.get_text(strip=True)
-        else:
-            reporter_name = ""
+            reporters.append(
+                {
+                    "name": reporter_name,
+                    "reporter_url": reporter_link,
+                    "article_title": article_title,
+                    "article_link": article_link,
+                    "article_date": article_date,
+                }
+            )
 
-        reporter_title = reporter_bio_section.find(
-            "h3", class_="c-heading b-full-author-bio__role"
-        )
-        if reporter_title:
-            reporter_title = reporter_title.get_text(strip=True)
-        else:
-            reporter_title = ""
+    return reporters
 
-        reporter_social_div = reporter_bio_section.find(
-            "div", class_="b-full-author-bio__social-icons"
-        )
 
-        reporter_socials = []
-        if reporter_social_div:
-            reporter_socials = [
-                social["href"]
-                for social in reporter_social_div.find_all("a")
-                if social.get("href")
-            ]
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container="div.c-stack.b-full-author-bio__text",
+        fields={
+            "name": extraction.Field("h2.c-heading.b-full-author-bio__name"),
+            "title": extraction.Field("h3.c-heading.b-full-author-bio__role"),
+        },
+        socials="div.b-full-author-bio__social-icons a[href]",
+        articles=extraction.ArticleList(
+            items="div.b-results-list__wrapper div.b-results-list--show-image",
+            fields={
+                "title": extraction.Field("h2.c-heading"),
+                "link": extraction.Field(
+                    "a.c-link", "href", extraction.link("https://www.metro.pr")
+                ),
+                "date": extraction.Field(
+                    "time.c-date", "datetime", extraction.iso_date
+                ),
+            },
+        ),
+        only=("div.b-full-author-bio__text", "div.b-results-list__wrapper"),
+    )
+)
 
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link
-            elif "mailto:" in social_link:
-                reporter_email = social_link.replace("mailto:", "")
-
-        articles = get_articles(soup)
-
-        return {
-            "name": reporter_name,
-            "title": reporter_title,
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
-            "topics": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
+@checkpoint.step("profile")
+def extract_reporter_info(url: str) -> dict:
+    html_content = get_html_playwright(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
         return {}
 
+    return PROFILE.parse(url, html_content)
+
 
 def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
 
@@ -334,6 +296,7 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
                 }
             )
 
+    reporters_refined = sharding.mine(__name__, reporters_refined)
     print(f"\nProcessing {len(reporters_refined)} reporters...")
     reporters = []
 
@@ -349,7 +312,9 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
         print(f"[{idx}/{len(reporters_refined)}] {reporter_name}")
 
         if reporter_url != "":
-            reporter_info = extract_reporter_info(reporter_url)
+            reporter_info = reporter_state.profile(
+                reporter_url, extract_reporter_info, reporter.get("articles")
+            )
         else:
             reporter_info = {}
 
@@ -374,14 +339,12 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
             }
         )
 
-        time.sleep(random.uniform(1, 3))  # sleep for 1 to 3 seconds
-
     print(f"[OK] Completed {len(reporters)} reporters")
     return reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     all_reporters = get_reporters_list_from_articles("https://www.metro.pr/noticias/")
 
     if not all_reporters:
@@ -389,10 +352,15 @@ def main():
 
     reporters = process_reporters_list(all_reporters)
 
-    upsert_reporters_merge(reporters, "metro.py", match_emails=False)
+    return reporters
+
+
+def main():
+    upsert_reporters_merge(scrape(), "metro.py", **SYNC_OPTIONS)
 
     print("All done!")
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
@@ -1,16 +1,25 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 import os
 from dotenv import load_dotenv
 import datetime
-import time
-import random
 
 load_dotenv()
 
+import article_metadata
+import checkpoint
+import extraction
+import fetch_engine
+import html_parser
+import http_cache
+import http_fetch
+import reporter_state
+import scraper_cli
+import sharding
+import wp_api
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 pages = [
     "https://newsismybusiness.com/",
@@ -61,29 +70,14 @@ authors = [
 ]
 
 
-def get_html_requests(url: str):
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
-
-
-def get_reporters_list_from_articles(url: str) -> list[dict]:
-    """Fetch reporters list from articles on a given page URL"""
-
-    html_content = get_html_requests(url)
+def get_reporters_list_from_articles(url: str, html_content: bytes | None) -> list[dict]:
+    """Extract reporters list from the articles on a fetched listing page"""
 
     if not html_content:
         print(f"  Warning: No content found for {url}")
         return []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parser.make_soup(html_content)
 
     news_article_divs = list(soup.find_all("div", class_="tt-post-info"))
 
@@ -131,26 +125,23 @@ def get_reporters_list_from_articles(url: str) -> list[dict]:
             )
 
         reporters.extend(article_info)
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
 
     return reporters
 
 
-def get_reporters_from_homepage(url: str) -> list[dict]:
-    html_content = get_html_requests(url)
-
+def get_reporters_from_homepage(url: str, html_content: bytes | None) -> list[dict]:
     if not html_content:
         print(f"  Warning: No content found for {url}")
         return []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parser.make_soup(html_content)
 
     news_article_divs = list(soup.find_all("article"))
 
     if not news_article_divs:
         return []
 
-    reporters = []
+    article_links = []
     for idx, article_div in enumerate(news_article_divs, 1):
         print(f" Processing article {idx}/{len(news_article_divs)}")
 
@@ -166,22 +157,29 @@ def get_reporters_from_homepage(url: str) -> list[dict]:
         else:
             article_link = ""
 
-        article_info = get_article_info(article_link)
+        article_links.append(article_link)
 
-        reporters.extend(article_info)
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
+    # fetch the article pages concurrently
+    article_pages = fetch_engine.fetch_many(article_links)
 
-    return reporters
+    reporters = []
+    for article_link, article_html in zip(article_links, article_pages):
+        reporters.extend(get_article_info(article_link, article_html))
 
+    return reporters
 
-def get_article_info(article_link: str) -> list[dict]:
-    html_content = get_html_requests(article_link)
 
+def get_article_info(article_link: str, html_content: bytes | None) -> list[dict]:
     if not html_content:
         print(f"  Warning: No content found for {article_link}")
         return []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    # author URLs are needed for the profile pages
+    metadata = article_metadata.extract(html_content)
+    if metadata.complete(author_urls=True):
+        return metadata.records(article_link)
+
+    soup = html_parser.make_soup(html_content)
 
     article_info_div = soup.find("article")
     if not article_info_div:
@@ -229,89 +227,59 @@ def get_article_info(article_link: str) -> list[dict]:
 
 
 def process_news_sources() -> list[dict]:
+    # One REST API request replaces the listing pages and homepage articles
+    reporters = wp_api.fetch_post_records("https://newsismybusiness.com")
+    if reporters:
+        return reporters
+
+    # fetch the listing pages concurrently
+    pages_html = fetch_engine.fetch_many(pages)
+
     all_reporters = []
-    for news_url in pages:
+    for news_url, html_content in zip(pages, pages_html):
         print(f"\nProcessing news source: {news_url}")
 
         if news_url == "https://newsismybusiness.com/":
-            reporters = get_reporters_from_homepage(news_url)
+            reporters = get_reporters_from_homepage(news_url, html_content)
             all_reporters.extend(reporters)
 
-        reporters = get_reporters_list_from_articles(news_url)
+        reporters = get_reporters_list_from_articles(news_url, html_content)
         all_reporters.extend(reporters)
 
     return all_reporters
 
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "div",
-            class_="tt-post-info",
-        )
-    )
-
-    articles = []
-
-    # maximum 4
-    for article_div in articles_div_list[:4]:
-        article_date = article_div.find("span", class_="tt-post-date")
-        if article_date:
-            article_date = article_date.get_text(strip=True)
-        else:
-            article_date = ""
-
-        article_title = article_div.find("a", class_="tt-post-title")
-        if article_title:
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
-
-        article_link = article_div.find("a", class_="tt-post-title")
-        if article_link and article_link.get("href"):
-            article_link = article_link["href"].rstrip("/")
-        else:
-            article_link = ""
-
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
+@checkpoint.step("profile")
+def extract_reporter_info(url: str) -> dict:
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return {}
 
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
+    return http_cache.memoize(
+        parse_reporter_info, url, html_content, version=PROFILE.version
+    )
 
-    return articles
 
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container=None,
+        fields={},
+        articles=extraction.ArticleList(
+            items="div.tt-post-info",
+            fields={
+                "title": extraction.Field("a.tt-post-title"),
+                "link": extraction.Field("a.tt-post-title", "href", extraction.link()),
+                "date": extraction.Field("span.tt-post-date"),
+            },
+        ),
+        only=("div.tt-post-info",),
+    )
+)
 
-def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html_requests(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        articles = get_articles(soup)
-
-        return {
-            "name": "",
-            "title": "",
-            "email": "",
-            "twitter": "",
-            "linkedin": "",
-            "instagram": "",
-            "facebook": "",
-            "topics": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
-        return {}
+def parse_reporter_info(url: str, html_content: bytes) -> dict:
+    return PROFILE.parse(url, html_content)
 
 
 def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
@@ -360,6 +328,7 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 }
             )
 
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} reporters...")
 
     processed_reporters = []
@@ -374,7 +343,9 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
 
         # Get profile info if URL exists
-        reporter_info = extract_reporter_info(reporter_url)
+        reporter_info = reporter_state.profile(
+            reporter_url, extract_reporter_info, reporter.get("articles")
+        )
 
         processed_reporters.append(
             {
@@ -397,25 +368,32 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
             }
         )
 
-        time.sleep(random.uniform(1, 3))  # sleep for 1 to 3 seconds
-
     print(f"[OK] Completed {len(processed_reporters)} reporters")
     return processed_reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     # Step 1: Get all articles and reporters
     reporters_flat = process_news_sources()
 
     if not reporters_flat:
         print("No reporters found.")
-        return
+        return []
 
     reporters = process_reporters_list(reporters_flat)
 
-    upsert_reporters_merge(reporters, "newsismybusiness.py", match_emails=False)
+    return reporters
+
+
+def main():
+    reporters = scrape()
+    if not reporters:
+        return
+
+    upsert_reporters_merge(reporters, "newsismybusiness.py", **SYNC_OPTIONS)
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
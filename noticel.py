@@ -1,14 +1,18 @@
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import os
 from dotenv import load_dotenv
-import time
-import random
 
 load_dotenv()
 
+import checkpoint
+import extraction
+import reporter_state
+import scraper_cli
+import sharding
+import tiered_fetch
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 
 reporters_profiles = [
@@ -131,145 +135,42 @@ reporters_profiles = [
 
 
 def get_html(url: str):
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url)
-
-            # Try to wait for content, but continue if it times out
-            try:
-                page.wait_for_load_state("networkidle", timeout=10000)
-                page.wait_for_timeout(2000)
-            except Exception as wait_error:
-                print(f"  Warning: Wait timeout, using partial content")
-
-            page.wait_for_load_state("domcontentloaded")
-            html_content = page.content()
-            browser.close()
-            return html_content
-
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
-
-
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "div",
-            class_="newsCard flex--row space--between",
-        )
+    return tiered_fetch.fetch_html(url)
+
+
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container="div.columnistSection__top",
+        fields={
+            "name": extraction.Field("h5"),
+            "title": extraction.Field("p"),
+        },
+        socials="div.socialsBlock a[href]",
+        articles=extraction.ArticleList(
+            items="div.newsCard.flex--row.space--between",
+            fields={
+                "title": extraction.Field("h3"),
+                "link": extraction.Field("a", "href", extraction.link()),
+                "date": extraction.Field("div.newsCard__date"),
+            },
+        ),
+        only=("div.columnistSection__top", "div.newsCard"),
     )
-
-    articles = []
-
-    # maximum 4
-    for article_div in articles_div_list[:4]:
-        article_date = article_div.find("div", class_="newsCard__date")
-        if article_date:
-            article_date = article_date.get_text(strip=True)
-        else:
-            article_date = ""
-
-        article_title = article_div.find("h3")
-        if article_title:
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
-
-        article_link = article_div.find("a")
-        if article_link and article_link.get("href"):
-            article_link = article_link["href"].rstrip("/")
-        else:
-            article_link = ""
-
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
-
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
-
-    return articles
+)
 
 
+@checkpoint.step("profile")
 def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        reporter_detail_div = soup.find("div", class_="columnistSection__top")
-        if not reporter_detail_div:
-            print(f"  Warning: No reporter details found for {url}")
-            return {}
-
-        reporter_name = reporter_detail_div.find("h5")
-        if reporter_name:
-            reporter_name = reporter_name.get_text(strip=True)
-        else:
-            reporter_name = ""
-
-        reporter_title = reporter_detail_div.find("p")
-        if reporter_title:
-            reporter_title = reporter_title.get_text(strip=True)
-        else:
-            reporter_title = ""
-
-        author_social_div = reporter_detail_div.find("div", class_="socialsBlock")
-
-        reporter_socials = []
-        if author_social_div:
-            reporter_socials = [
-                social["href"]
-                for social in author_social_div.find_all("a")
-                if social.get("href")
-            ]
-
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link
-            elif "mailto:" in social_link:
-                reporter_email = social_link
-
-        articles = get_articles(soup)
-
-        return {
-            "name": reporter_name,
-            "title": "",
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
-            "topics": "",
-            "articles": articles,
-        }
-
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
+    html_content = get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
         return {}
 
+    return PROFILE.parse(url, html_content)
+
 
 def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} reporters...")
     reporters = []
 
@@ -280,7 +181,7 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
         reporter_title = reporter.get("title") or ""
 
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
-        reporter_info = extract_reporter_info(reporter_url)
+        reporter_info = reporter_state.profile(reporter_url, extract_reporter_info)
 
         media_name = "Noticel"
         media_type = ""
@@ -305,20 +206,23 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
             }
         )
 
-        time.sleep(random.uniform(1, 3))  # sleep for 1 to 3 seconds
-
     print(f"[OK] Completed {len(reporters)} reporters")
     return reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     reporters = process_reporters_list(reporters_profiles)
 
-    upsert_reporters_merge(reporters, "noticel.py", match_emails=False)
+    return reporters
+
+
+def main():
+    upsert_reporters_merge(scrape(), "noticel.py", **SYNC_OPTIONS)
 
     print("All Done!")
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
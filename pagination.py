@@ -0,0 +1,327 @@
+"""
+Load-more pagination driven through the site's own endpoint.
+
+Instead of clicking a "load more" button over and over and re-parsing the
+grown DOM, fetch_listing clicks it once, captures the XHR/fetch request the
+click triggers and infers its page/offset parameter (also inside JSON-encoded
+query values such as Arc's ?query={"offset":..}). Later pages are then
+requested directly over HTTP, after the browser page has been handed back to
+the pool and off the browser's event loop, and returned as raw bodies for the
+scraper to parse incrementally: html_fragments() extracts markup from HTML or
+JSON-wrapped responses (BLOX), json_body() exposes pure JSON (Arc).
+
+When no usable request is captured, the scraper's click-based fallback runs in
+the same page. When the endpoint does not answer over plain HTTP, the listing
+is rendered again and clicked through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from playwright.async_api import Page, Response, TimeoutError as PlaywrightTimeoutError
+
+import browser_pool
+import html_parser
+import http_fetch
+import snapshots
+
+Content = bytes | str
+
+PAGE_PARAMS = {"page", "p", "pg", "paged", "pagina", "page_number"}
+OFFSET_PARAMS = {"offset", "o", "start", "from", "skip"}
+SIZE_PARAMS = {"limit", "l", "size", "count", "per_page", "n", "rows"}
+
+# Safety cap for max_pages=None ("until the endpoint runs dry").
+MAX_PAGES_CAP = 100
+
+
+class Endpoint(NamedTuple):
+    url: str
+    param: str
+    # Key inside a JSON-encoded param value (Arc), or None for a plain param.
+    json_key: str | None
+    value: int
+    step: int
+
+    def page_url(self, n: int) -> str:
+        """URL of the n-th page after the captured one."""
+        parts = urlsplit(self.url)
+        query = []
+        for key, value in parse_qsl(parts.query, keep_blank_values=True):
+            if key == self.param:
+                next_value = self.value + n * self.step
+                if self.json_key is None:
+                    value = str(next_value)
+                else:
+                    data = json.loads(value)
+                    data[self.json_key] = next_value
+                    value = json.dumps(data, separators=(",", ":"))
+            query.append((key, value))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _int(value: Any) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _find_counter(params: dict[str, Any]) -> tuple[str, int, int] | None:
+    """(name, value, step) of the page/offset counter among params."""
+    for name, raw in params.items():
+        value = _int(raw)
+        if value is None:
+            continue
+        if name.lower() in PAGE_PARAMS:
+            return name, value, 1
+        if name.lower() in OFFSET_PARAMS:
+            size = next(
+                (
+                    _int(v)
+                    for k, v in params.items()
+                    if k.lower() in SIZE_PARAMS and _int(v)
+                ),
+                None,
+            )
+            # Without a size param, the first load-more offset is the page size.
+            step = size or value
+            if step:
+                return name, value, step
+    return None
+
+
+def infer_endpoint(url: str) -> Endpoint | None:
+    """Pagination endpoint described by a captured request URL, if any."""
+    params = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+    found = _find_counter(params)
+    if found is not None:
+        name, value, step = found
+        return Endpoint(url, name, None, value, step)
+
+    for name, raw in params.items():
+        if not raw.startswith("{"):
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            found = _find_counter(data)
+            if found is not None:
+                key, value, step = found
+                return Endpoint(url, name, key, value, step)
+    return None
+
+
+def _is_pagination_response(response: Response) -> bool:
+    request = response.request
+    return (
+        request.method == "GET"
+        and request.resource_type in ("xhr", "fetch")
+        and infer_endpoint(response.url) is not None
+    )
+
+
+def _text(body: Content) -> str:
+    return body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+
+
+def json_body(body: Content) -> Any | None:
+    """Decoded JSON payload, or None for HTML responses."""
+    text = _text(body).lstrip()
+    if text[:1] not in ("{", "["):
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _strings(data: Any) -> list[str]:
+    if isinstance(data, str):
+        return [data]
+    if isinstance(data, dict):
+        data = list(data.values())
+    if isinstance(data, list):
+        return [s for item in data for s in _strings(item)]
+    return []
+
+
+def html_fragments(body: Content) -> list[str]:
+    """Markup in a page body: the body itself, or HTML strings inside JSON."""
+    data = json_body(body)
+    if data is None:
+        return [_text(body)]
+    return [s for s in _strings(data) if "<" in s and ">" in s]
+
+
+def contains_items(body: Content, item_selector: str) -> bool:
+    """True if any markup in body matches item_selector."""
+    return any(
+        html_parser.make_soup(fragment).select_one(item_selector)
+        for fragment in html_fragments(body)
+    )
+
+
+class Listing(NamedTuple):
+    # Listing DOM after the first load-more (or after fallback clicking).
+    html: str | None
+    # Later pages fetched directly from the captured endpoint.
+    pages: list[Content]
+
+
+async def _capture(
+    page: Page,
+    *,
+    button: str,
+    items: str,
+    max_pages: int | None,
+    fallback: Callable[[Page], Awaitable[None]],
+) -> tuple[Endpoint, Content] | None:
+    """Click load-more once; the endpoint it requested and that first response."""
+    load_more = page.locator(button)
+    if max_pages == 0 or not await load_more.is_visible():
+        return None
+
+    count = await page.locator(items).count()
+    endpoint = None
+    try:
+        async with page.expect_response(
+            _is_pagination_response, timeout=browser_pool.READY_TIMEOUT_MS
+        ) as captured:
+            # force=True: ad overlays sometimes cover the button
+            await load_more.click(force=True)
+        response = await captured.value
+        endpoint = infer_endpoint(response.url)
+        first: Content = await response.body()
+    except PlaywrightTimeoutError:
+        pass
+    except Exception as e:
+        print(f"  Could not capture pagination request: {str(e)[:100]}")
+        endpoint = None
+    await browser_pool.wait_for_more(page, items, count)
+
+    if endpoint is None:
+        print("  No pagination request captured, clicking through instead")
+        await fallback(page)
+        return None
+    return endpoint, first
+
+
+def _capture_action(
+    captured: list[tuple[Endpoint, Content]], **options: Any
+) -> browser_pool.PageAction[None]:
+    async def capture(page: Page) -> None:
+        found = await _capture(page, **options)
+        if found is not None:
+            captured.append(found)
+
+    return capture
+
+
+def _fetch_pages(
+    endpoint: Endpoint,
+    previous: Content,
+    max_pages: int | None,
+    has_items: Callable[[Content], bool],
+) -> list[Content]:
+    """Pages after the captured one over HTTP, until one is empty or repeats."""
+    print(f"  Paginating via {endpoint.param}={endpoint.value} (+{endpoint.step})")
+    pages: list[Content] = []
+    limit = min(max_pages or MAX_PAGES_CAP, MAX_PAGES_CAP)
+    for n in range(1, limit):
+        body = http_fetch.get_html(endpoint.page_url(n))
+        if not body or body == previous or not has_items(body):
+            break
+        pages.append(body)
+        previous = body
+    if not pages:
+        print("  Pagination endpoint returned nothing over HTTP, clicking instead")
+    return pages
+
+
+def fetch_listing(
+    url: str,
+    *,
+    button: str,
+    items: str,
+    fallback: Callable[[Page], Awaitable[None]],
+    max_pages: int | None = None,
+    has_items: Callable[[Content], bool] | None = None,
+) -> Listing:
+    """
+    Render listing url, click its load-more button once and fetch the following
+    pages from the captured endpoint, up to max_pages load-more pages including
+    the clicked one (None = until exhausted). The browser page is released
+    before those are fetched; if the endpoint yields nothing over HTTP, url is
+    rendered again and fallback clicks through it. has_items(body) decides when
+    a page is empty (default: item selector matches in its markup).
+    """
+    if snapshots.replaying():
+        return Listing(
+            snapshots.load(url, "browser"), snapshots.load_many(url, "pagination")
+        )
+
+    captured: list[tuple[Endpoint, Content]] = []
+    action = _capture_action(
+        captured, button=button, items=items, max_pages=max_pages, fallback=fallback
+    )
+    html_content = browser_pool.fetch_html(url, actions=action)
+    pages: list[Content] = []
+    if captured:
+        endpoint, first = captured[0]
+        pages = _fetch_pages(
+            endpoint,
+            first,
+            max_pages,
+            has_items or (lambda body: contains_items(body, items)),
+        )
+        if not pages:
+            html_content = browser_pool.fetch_html(url, actions=fallback) or html_content
+    snapshots.save_many(url, "pagination", pages)
+    return Listing(html_content, pages)
+
+
+async def afetch_listing(
+    url: str,
+    *,
+    button: str,
+    items: str,
+    fallback: Callable[[Page], Awaitable[None]],
+    max_pages: int | None = None,
+    has_items: Callable[[Content], bool] | None = None,
+) -> Listing:
+    """Async counterpart of fetch_listing."""
+    if snapshots.replaying():
+        return Listing(
+            snapshots.load(url, "browser"), snapshots.load_many(url, "pagination")
+        )
+
+    captured: list[tuple[Endpoint, Content]] = []
+    action = _capture_action(
+        captured, button=button, items=items, max_pages=max_pages, fallback=fallback
+    )
+    html_content = await browser_pool.afetch_html(url, actions=action)
+    pages: list[Content] = []
+    if captured:
+        endpoint, first = captured[0]
+        # HTTP fetches and has_items parsing stay off the event loop.
+        pages = await asyncio.to_thread(
+            _fetch_pages,
+            endpoint,
+            first,
+            max_pages,
+            has_items or (lambda body: contains_items(body, items)),
+        )
+        if not pages:
+            html_content = (
+                await browser_pool.afetch_html(url, actions=fallback) or html_content
+            )
+    snapshots.save_many(url, "pagination", pages)
+    return Listing(html_content, pages)
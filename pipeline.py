@@ -0,0 +1,115 @@
+"""
+Dependency-aware task scheduler used by run_all.py.
+
+A run is a set of Tasks, each in a stage and depending on other tasks by
+name. A task starts as soon as its dependencies have finished, so tasks
+without dependencies between them overlap, bounded by the worker count:
+
+  scrape   every site scraper, in parallel
+  sync     one consolidated BigQuery upsert of everything scraped
+  twitter  twitter.py discovery and update_twitter.py enrichment
+
+A task is skipped (and counts as failed) when one of its deps failed; tasks
+listed in after only have to finish, successfully or not.
+"""
+
+from __future__ import annotations
+
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple
+
+
+class Task(NamedTuple):
+    name: str
+    stage: str
+    # Returns True on success.
+    action: Callable[[], bool]
+    deps: tuple[str, ...] = ()
+    after: tuple[str, ...] = ()
+
+
+class Timing(NamedTuple):
+    start: float
+    end: float
+
+
+def _timed(task: Task, timings: dict[str, Timing]) -> bool:
+    start = time.monotonic()
+    try:
+        ok = task.action()
+    except Exception:
+        traceback.print_exc()
+        ok = False
+    timings[task.name] = Timing(start, time.monotonic())
+    return ok
+
+
+def run(tasks: list[Task], workers: int) -> tuple[dict[str, bool], dict[str, Timing]]:
+    """Run tasks in dependency order; returns success and timing per task."""
+    names = {task.name for task in tasks}
+    for task in tasks:
+        unknown = set(task.deps + task.after) - names
+        if unknown:
+            raise RuntimeError(f"Task {task.name} depends on unknown tasks: {sorted(unknown)}")
+
+    results: dict[str, bool] = {}
+    timings: dict[str, Timing] = {}
+    pending = list(tasks)
+    running: dict[Future[bool], str] = {}
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for task in list(pending):
+                    if not all(dep in results for dep in task.deps + task.after):
+                        continue
+                    pending.remove(task)
+                    progressed = True
+                    failed = [dep for dep in task.deps if not results[dep]]
+                    if failed:
+                        print(f"[SKIP] {task.name} (failed: {', '.join(failed)})")
+                        results[task.name] = False
+                        continue
+                    running[pool.submit(_timed, task, timings)] = task.name
+
+            if not running:
+                if pending:
+                    raise RuntimeError(
+                        f"Dependency cycle between tasks: {[t.name for t in pending]}"
+                    )
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return results, timings
+
+
+def print_stage_timings(tasks: list[Task], timings: dict[str, Timing]) -> None:
+    """Wall-clock per stage (first start to last end) and its slowest task."""
+    stages: dict[str, list[str]] = {}
+    for task in tasks:
+        if task.name in timings:
+            stages.setdefault(task.stage, []).append(task.name)
+    if not stages:
+        return
+
+    print("\n====================")
+    print("STAGE TIMINGS")
+    print("====================")
+    for stage, names in stages.items():
+        start = min(timings[name].start for name in names)
+        end = max(timings[name].end for name in names)
+        slowest = max(names, key=lambda name: timings[name].end - timings[name].start)
+        line = f"  {stage}: {end - start:.1f}s"
+        if len(names) > 1:
+            took = timings[slowest].end - timings[slowest].start
+            line += f" ({len(names)} tasks, slowest {slowest} {took:.1f}s)"
+        print(line)
+    first = min(timing.start for timing in timings.values())
+    last = max(timing.end for timing in timings.values())
+    print(f"  total: {last - first:.1f}s")
@@ -0,0 +1,177 @@
+"""
+Per-host politeness scheduler.
+
+Every outgoing request (HTTP or browser navigation) first takes a token from
+its host's bucket. Buckets refill at a configurable rate with random jitter, so
+a slow outlet only delays requests to that outlet while other hosts proceed in
+parallel. Time spent waiting is tallied per host and reported at exit.
+
+Config:
+  POLITENESS_RATE        requests/second per host (default 1.0)
+  POLITENESS_BURST       bucket size (default 2)
+  POLITENESS_JITTER      extra random delay as a fraction of 1/rate (default 0.25)
+  POLITENESS_HOST_RATES  per-host overrides, e.g. "elvocero.com=0.2,wapa.tv=0.25"
+  POLITENESS_STATS_FILE  append this process's report to a JSONL file at exit
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_RATE = float(os.environ.get("POLITENESS_RATE") or 1.0)
+BURST = float(os.environ.get("POLITENESS_BURST") or 2)
+JITTER = float(os.environ.get("POLITENESS_JITTER") or 0.25)
+STATS_FILE = (os.environ.get("POLITENESS_STATS_FILE") or "").strip()
+
+# Hosts that historically needed longer gaps between requests.
+DEFAULT_HOST_RATES: dict[str, float] = {
+    "elvocero.com": 0.2,
+    "wapa.tv": 0.25,
+    "api.twitterapi.io": 0.5,
+}
+
+
+def _parse_host_rates(raw: str) -> dict[str, float]:
+    rates: dict[str, float] = {}
+    for part in raw.split(","):
+        host, sep, rate = part.partition("=")
+        if sep and host.strip() and rate.strip():
+            rates[host.strip().lower()] = float(rate)
+    return rates
+
+
+HOST_RATES = {
+    **DEFAULT_HOST_RATES,
+    **_parse_host_rates(os.environ.get("POLITENESS_HOST_RATES") or ""),
+}
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def rate_for(host: str) -> float:
+    """Configured rate for host; "www.wapa.tv" matches a "wapa.tv" entry."""
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        rate = HOST_RATES.get(".".join(labels[i:]))
+        if rate is not None:
+            return rate
+    return DEFAULT_RATE
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        # negative balance = tokens already promised to earlier waiters
+        return -self.tokens / self.rate
+
+
+_buckets: dict[str, TokenBucket] = {}
+_throttled: dict[str, float] = {}
+_requests: dict[str, int] = {}
+_lock = threading.Lock()
+_started = time.monotonic()
+
+
+def _reserve(url: str) -> tuple[str, float]:
+    host = _host(url)
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(rate_for(host), BURST)
+        wait = bucket.reserve()
+        if wait > 0 and JITTER > 0:
+            wait += random.uniform(0, JITTER / bucket.rate)
+        _requests[host] = _requests.get(host, 0) + 1
+        _throttled[host] = _throttled.get(host, 0.0) + wait
+    return host, wait
+
+
+def acquire(url: str) -> None:
+    """Block until url's host may be hit again."""
+    _, wait = _reserve(url)
+    if wait > 0:
+        time.sleep(wait)
+
+
+async def aacquire(url: str) -> None:
+    """acquire() for coroutines; only the calling task waits."""
+    _, wait = _reserve(url)
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+
+def throttle_report() -> dict[str, dict[str, float]]:
+    """Per-host request counts and seconds spent throttled so far."""
+    with _lock:
+        return {
+            host: {
+                "requests": _requests[host],
+                "throttled_seconds": round(_throttled.get(host, 0.0), 2),
+                "rate": _buckets[host].rate,
+            }
+            for host in sorted(_requests)
+        }
+
+
+def print_throttle_report() -> None:
+    report = throttle_report()
+    if not report:
+        return
+    print(f"\n{'='*50}")
+    print("Politeness throttling per host")
+    print(f"{'='*50}")
+    for host, stats in report.items():
+        print(
+            f"  {host}: {stats['requests']} requests @ {stats['rate']}/s, "
+            f"{stats['throttled_seconds']}s throttled"
+        )
+
+
+def write_stats_file() -> None:
+    """One JSON line: script, seconds since start, seconds throttled, per-host report."""
+    if not STATS_FILE:
+        return
+    report = throttle_report()
+    line = {
+        "script": os.path.basename(sys.argv[0]),
+        "elapsed_seconds": round(time.monotonic() - _started, 2),
+        "throttled_seconds": round(sum(h["throttled_seconds"] for h in report.values()), 2),
+        "hosts": report,
+    }
+    try:
+        with open(STATS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line) + "\n")
+    except OSError as e:
+        print(f"  Warning: Could not write politeness stats to {STATS_FILE}: {e}")
+
+
+atexit.register(print_throttle_report)
+atexit.register(write_stats_file)
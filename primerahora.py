@@ -1,15 +1,21 @@
-from bs4 import BeautifulSoup
 import json
-import requests
 import os
 from dotenv import load_dotenv
-import time
-import random
 
 load_dotenv()
 
+import checkpoint
+import extraction
+import html_parser
+import http_cache
+import http_fetch
+import reporter_state
+import scraper_cli
+import sharding
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": True}
+
 
 
 reporters_profiles = [
@@ -120,30 +126,18 @@ reporters_profiles = [
 ]
 
 
-def get_html(url: str):
-    try:
-        # Send GET request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
+def extract_reporters(url: str) -> list[dict]:
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return []
 
-        return response.content
+    return http_cache.memoize(parse_reporters, url, html_content)
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
 
-
-def extract_reporters(url: str) -> list[dict]:
+def parse_reporters(url: str, html_content: bytes) -> list[dict]:
     try:
-        html_content = get_html(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return []
-
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content)
 
         reporters_div_list = list(soup.find_all("div", class_="StaticProfile__info"))
 
@@ -185,130 +179,45 @@ def extract_reporters(url: str) -> list[dict]:
         return []
 
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "li",
-            class_="ListItemTeaser",
-        )
-    )
-
-    articles = []
-
-    # maximum 3
-    for article_div in articles_div_list[:4]:
-        article_date = article_div.find("div", class_="ListItemTeaser__date")
-        if article_date:
-            article_date = article_date.get_text(strip=True)
-        else:
-            article_date = ""
-
-        article_title = article_div.find(
-            "h3", class_="ListItemTeaser__title TeaserTitle"
-        )
-        if article_title:
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
-
-        article_link = article_div.find("a", class_="TeaserImage ListItemTeaser__image")
-        if article_link and article_link.get("href"):
-            article_link = (
-                "https://www.primerahora.com" + article_link["href"]
-            ).rstrip("/")
-        else:
-            article_link = ""
-
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
-
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
-
-    return articles
-
-
+@checkpoint.step("profile")
 def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        author_bio_div = soup.find("div", class_="AuthorBio__info")
-        if not author_bio_div:
-            print(f"  Warning: No author bio found for {url}")
-            articles = get_articles(soup)
-            return {
-                "name": "",
-                "title": "",
-                "email": "",
-                "twitter": "",
-                "linkedin": "",
-                "instagram": "",
-                "facebook": "",
-                "topics": "",
-                "articles": articles,
-            }
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return {}
+
+    return http_cache.memoize(
+        parse_reporter_info, url, html_content, version=PROFILE.version
+    )
 
-        author_name = author_bio_div.find("h2", class_="AuthorBio__name")
-        if author_name:
-            author_name = author_name.get_text(strip=True)
-        else:
-            author_name = ""
 
-        author_social_div = author_bio_div.find(
-            "div", class_="AuthorBio__iconContainer"
-        )
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container="div.AuthorBio__info",
+        fields={
+            "name": extraction.Field("h2.AuthorBio__name"),
+        },
+        socials="div.AuthorBio__iconContainer a[href]",
+        articles=extraction.ArticleList(
+            items="li.ListItemTeaser",
+            fields={
+                "title": extraction.Field("h3.ListItemTeaser__title.TeaserTitle"),
+                "link": extraction.Field(
+                    "a.TeaserImage.ListItemTeaser__image",
+                    "href",
+                    extraction.link("https://www.primerahora.com"),
+                ),
+                "date": extraction.Field("div.ListItemTeaser__date"),
+            },
+        ),
+        only=("div.AuthorBio__info", "li.ListItemTeaser"),
+        container_optional=True,
+    )
+)
 
-        reporter_socials = []
-        if author_social_div:
-            reporter_socials = [
-                social["href"]
-                for social in author_social_div.find_all("a")
-                if social.get("href")
-            ]
-
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link.rstrip("/")
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link.rstrip("/")
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link.rstrip("/")
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link.rstrip("/")
-            elif "mailto:" in social_link:
-                reporter_email = social_link.replace("mailto:", "")
-
-        articles = get_articles(soup)
-
-        return {
-            "name": author_name,
-            "title": "",
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
-            "topics": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
-        return {}
+def parse_reporter_info(url: str, html_content: bytes) -> dict:
+    return PROFILE.parse(url, html_content)
 
 
 def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
@@ -330,6 +239,7 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
                 }
             )
 
+    reporters_list = sharding.mine(__name__, reporters_list, "profile_url")
     print(f"\nProcessing {len(reporters_list)} reporters...")
     reporters = []
 
@@ -340,7 +250,7 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
         reporter_title = reporter.get("title") or ""
 
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
-        reporter_info = extract_reporter_info(reporter_url)
+        reporter_info = reporter_state.profile(reporter_url, extract_reporter_info)
 
         media_name = "Primera Hora"
         media_type = ""
@@ -365,24 +275,27 @@ def process_reporters_list(reporters_list: list[dict]) -> list[dict]:
             }
         )
 
-        time.sleep(random.uniform(1, 3))  # sleep for 1 to 3 seconds
-
     print(f"[OK] Completed {len(reporters)} reporters")
     return reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     url = "https://www.primerahora.com/quienes-somos/"
 
     reporters_list = extract_reporters(url)
 
     reporters = process_reporters_list(reporters_list)
 
-    upsert_reporters_merge(reporters, "primerahora.py", match_emails=True)
+    return reporters
+
+
+def main():
+    upsert_reporters_merge(scrape(), "primerahora.py", **SYNC_OPTIONS)
 
     print("All done!")
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
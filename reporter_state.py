@@ -0,0 +1,270 @@
+"""
+Per-reporter scrape state for incremental runs.
+
+Every profile a scraper fetches is recorded in SQLite with the time it was
+scraped, a hash of its content and the article links known for it (from the
+profile and from the listings it appeared in). With a maximum age set
+(--max-age DAYS / REPORTER_MAX_AGE_DAYS), profile() reuses the stored profile
+instead of fetching it while it is younger than that and the listing shows
+no article it has not seen, so a run costs roughly what changed since the
+last one rather than the whole roster. Without a maximum age every profile
+is fetched, as before, and the state is only recorded.
+
+The SQLite file is written by every scraper process of a run, so it stays on
+local disk. Where that disk does not outlive the run (a Cloud Run execution),
+REPORTER_STATE_STORE names a durable copy, e.g. on a mounted bucket: the
+first process to open the state restores it from there, and the sync stage
+merges what the run recorded back into it with commit() once the reporters
+are written. Shards of a run each export() their state to their shard
+directory, and the merging shard commits all of them.
+
+Config:
+  REPORTER_STATE_PATH    SQLite file (default .cache/reporter_state.sqlite)
+  REPORTER_STATE_STORE   durable copy restored from and committed to (default none)
+  REPORTER_MAX_AGE_DAYS  reuse profiles scraped within this many days
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import fcntl
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Iterable
+
+from dotenv import load_dotenv
+
+import snapshots
+
+load_dotenv()
+
+STATE_PATH = (os.environ.get("REPORTER_STATE_PATH") or "").strip() or os.path.join(
+    ".cache", "reporter_state.sqlite"
+)
+STORE_PATH = (os.environ.get("REPORTER_STATE_STORE") or "").strip() or None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    url TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    article_links TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    changed_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = "url, info, content_hash, article_links, scraped_at, changed_at"
+
+# Rows of the attached "staged" database replace older scrapes of the same url.
+_MERGE = f"""
+INSERT OR REPLACE INTO profiles ({_COLUMNS})
+SELECT {", ".join(f"s.{c}" for c in _COLUMNS.split(", "))}
+FROM staged.profiles AS s LEFT JOIN profiles AS p ON p.url = s.url
+WHERE p.url IS NULL OR s.scraped_at > p.scraped_at
+"""
+
+_max_age_days = float(os.environ.get("REPORTER_MAX_AGE_DAYS") or 0) or None
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def configure(*, max_age_days: float | None = None) -> None:
+    """Reuse profiles younger than max_age_days in this process (see scraper_cli)."""
+    global _max_age_days
+    if max_age_days:
+        _max_age_days = max_age_days
+
+
+def _enabled() -> bool:
+    # Replays must parse every recorded profile.
+    return not snapshots.replaying()
+
+
+def _restore() -> None:
+    """Copy STORE_PATH down to STATE_PATH unless a process of this run already has."""
+    with open(f"{STATE_PATH}.lock", "w", encoding="utf-8") as lock:
+        # Scrapers started side by side must not replace each other's open file.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if os.path.exists(STATE_PATH) or not os.path.exists(STORE_PATH):
+            return
+        try:
+            tmp = f"{STATE_PATH}.{os.getpid()}.tmp"
+            shutil.copyfile(STORE_PATH, tmp)
+            os.replace(tmp, STATE_PATH)
+        except OSError as e:
+            print(f"  Warning: Could not restore reporter state from {STORE_PATH}: {e}")
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(STATE_PATH) or ".", exist_ok=True)
+        if STORE_PATH:
+            _restore()
+        conn = sqlite3.connect(STATE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def content_hash(info: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(info, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def _links(articles: Iterable[dict] | None) -> set[str]:
+    return {
+        (article.get("link") or "").rstrip("/")
+        for article in articles or []
+        if article and article.get("link")
+    }
+
+
+def fresh(url: str, listing_articles: Iterable[dict] | None = None) -> dict | None:
+    """
+    The stored profile for url if incremental mode is on, it was scraped
+    within the maximum age and listing_articles holds no unseen link.
+    """
+    if not (_max_age_days and url and _enabled()):
+        return None
+    with _lock:
+        row = _db().execute(
+            "SELECT info, article_links, scraped_at FROM profiles WHERE url = ?", (url,)
+        ).fetchone()
+    if row is None:
+        return None
+    info, known, scraped_at = row
+    if time.time() - scraped_at > _max_age_days * 86400:
+        return None
+    if not _links(listing_articles) <= set(json.loads(known)):
+        return None
+    return json.loads(info)
+
+
+def save(url: str, info: dict, listing_articles: Iterable[dict] | None = None) -> None:
+    """Record a freshly fetched profile and the article links known for it."""
+    if not (url and info and _enabled()):
+        return
+    digest = content_hash(info)
+    links = _links(info.get("articles")) | _links(listing_articles)
+    now = time.time()
+    with _lock:
+        db = _db()
+        row = db.execute(
+            "SELECT content_hash, article_links, changed_at FROM profiles WHERE url = ?",
+            (url,),
+        ).fetchone()
+        changed_at = now
+        if row is not None:
+            links |= set(json.loads(row[1]))
+            if row[0] == digest:
+                changed_at = row[2]
+        db.execute(
+            "INSERT OR REPLACE INTO profiles "
+            "(url, info, content_hash, article_links, scraped_at, changed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                json.dumps(info, ensure_ascii=False),
+                digest,
+                json.dumps(sorted(links)),
+                now,
+                changed_at,
+            ),
+        )
+        db.commit()
+
+
+def profile(
+    url: str,
+    fetch: Callable[[str], dict],
+    listing_articles: Iterable[dict] | None = None,
+) -> dict:
+    """fetch(url), unless fresh() has a profile that is still current."""
+    listing_articles = list(listing_articles or [])
+    info = fresh(url, listing_articles)
+    if info is not None:
+        print("  Profile unchanged within max age, not refetching")
+        return info
+    info = fetch(url)
+    save(url, info, listing_articles)
+    return info
+
+
+async def aprofile(
+    url: str,
+    fetch: Callable[[str], Awaitable[dict]],
+    listing_articles: Iterable[dict] | None = None,
+) -> dict:
+    """profile() for a coroutine fetch."""
+    listing_articles = list(listing_articles or [])
+    info = fresh(url, listing_articles)
+    if info is not None:
+        print("  Profile unchanged within max age, not refetching")
+        return info
+    info = await fetch(url)
+    save(url, info, listing_articles)
+    return info
+
+
+def export(path: str) -> None:
+    """Copy this run's state to path (a shard's directory) for commit()."""
+    if not (STORE_PATH and _enabled() and os.path.exists(STATE_PATH)):
+        return
+    tmp = f"{STATE_PATH}.{os.getpid()}.export"
+    try:
+        with _lock:
+            dest = sqlite3.connect(tmp)
+            _db().backup(dest)
+            dest.close()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        shutil.copyfile(tmp, path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"  Warning: Could not export reporter state: {e}")
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def commit(state_files: list[str] | None = None) -> None:
+    """
+    Merge the profiles recorded in state_files (default STATE_PATH) into
+    STORE_PATH, the latest scrape of each url winning. Called by the sync
+    stage once the reporters are written.
+    """
+    if not (STORE_PATH and _enabled()):
+        return
+    state_files = [path for path in state_files or [STATE_PATH] if os.path.exists(path)]
+    if not state_files:
+        return
+    tmp = f"{STATE_PATH}.{os.getpid()}.commit"
+    try:
+        os.makedirs(os.path.dirname(tmp) or ".", exist_ok=True)
+        if os.path.exists(STORE_PATH):
+            shutil.copyfile(STORE_PATH, tmp)
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript(_SCHEMA)
+            for path in state_files:
+                conn.execute("ATTACH DATABASE ? AS staged", (path,))
+                conn.execute(_MERGE)
+                conn.commit()
+                conn.execute("DETACH DATABASE staged")
+        finally:
+            conn.close()
+        os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+        shutil.copyfile(tmp, f"{STORE_PATH}.tmp")
+        os.replace(f"{STORE_PATH}.tmp", STORE_PATH)
+    except (OSError, sqlite3.Error) as e:
+        print(f"  Warning: Could not save reporter state to {STORE_PATH}: {e}")
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -1,6 +1,17 @@
+import argparse
+import json
 import subprocess
 import sys
 import os
+import tempfile
+import threading
+
+import checkpoint
+import pipeline
+import reporter_state
+import scraper_cli
+import sharding
+import snapshots
 
 SCRIPTS = [
     "elnuevodia.py",
@@ -18,45 +29,352 @@ SCRIPTS = [
     "update_twitter.py",
 ]
 
+# Scripts that talk to the Twitter API / BigQuery only; nothing to replay.
+NETWORK_ONLY_SCRIPTS = {"twitter.py", "update_twitter.py"}
+
+# Site scrapers hit independent hosts and run side by side, then one sync
+# stage writes everything they found; the Twitter scripts build on that table.
+TWITTER_SCRIPTS = ["twitter.py", "update_twitter.py"]
+SYNC_SCRIPT = "sync_reporters.py"
+
+MAX_WORKERS = int(os.environ.get("RUN_ALL_WORKERS") or 4)
+
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
-failed_scripts = []
+console_lock = threading.Lock()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = scraper_cli.build_parser("run_all.py")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"scripts run at once (default {MAX_WORKERS}, env RUN_ALL_WORKERS)",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="import the scrapers into this process and share browser, HTTP and BigQuery",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="merge and sync what the shards of a run staged, e.g. after one exhausted its retries",
+    )
+    return parser
 
-for script in SCRIPTS:
-    print(f"\n[OK] Running {script}")
-    log_file = f"{LOG_DIR}/{script.replace('.py', '')}.log"
+
+def run_script(script: str, *script_args: str, env: dict, log_dir: str = LOG_DIR) -> bool:
+    """Run one script, teeing its output to its log and a prefixed console stream."""
+    name = script.replace(".py", "")
+    log_file = f"{log_dir}/{name}.log"
+    with console_lock:
+        print(f"\n[OK] Running {script}")
 
     with open(log_file, "w", encoding="utf-8") as f:
         process = subprocess.Popen(
-            [sys.executable, script],
+            [sys.executable, script, *script_args],
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
+            env=env,
         )
 
         # Read line by line
         for line in process.stdout:
-            print(line, end="")  # live output to console
+            with console_lock:
+                print(f"[{name}] {line}", end="")  # live output to console
             f.write(line)  # write to log file
 
         process.wait()
 
+    with console_lock:
         if process.returncode != 0:
-            failed_scripts.append(script)
             print(f"[FAIL] {script} (see {log_file})")
         else:
             print(f"[OK] {script} completed")
+    return process.returncode == 0
+
+
+def build_tasks(
+    site_scripts,
+    scrape=None,
+    sync=None,
+    run_twitter=None,
+    twitter_scripts=TWITTER_SCRIPTS,
+) -> list[pipeline.Task]:
+    """scrape stage -> one sync -> Twitter discovery and enrichment (stages given)."""
+    tasks = []
+    if scrape:
+        tasks += [pipeline.Task(s, "scrape", lambda s=s: scrape(s)) for s in site_scripts]
+    if sync:
+        tasks.append(
+            pipeline.Task(
+                SYNC_SCRIPT,
+                "sync",
+                lambda: sync(site_scripts),
+                after=tuple(task.name for task in tasks),
+            )
+        )
+    if not run_twitter:
+        return tasks
+    for script in twitter_scripts:
+        # Both write the reporters table (twitter.py upserts, update_twitter.py
+        # updates rows one by one), so enrichment always waits for discovery.
+        after = ()
+        if script == "update_twitter.py" and "twitter.py" in twitter_scripts:
+            after = ("twitter.py",)
+        tasks.append(
+            pipeline.Task(
+                script,
+                "twitter",
+                lambda s=script: run_twitter(s),
+                deps=(SYNC_SCRIPT,) if sync else (),
+                after=after,
+            )
+        )
+    return tasks
+
+
+class Stages:
+    """The tasks run so far, with their results and timings."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.tasks: list[pipeline.Task] = []
+        self.results: dict[str, bool] = {}
+        self.timings: dict[str, pipeline.Timing] = {}
+
+    def run(self, stage_tasks: list[pipeline.Task]) -> bool:
+        """Run stage_tasks; True if every one of them succeeded."""
+        self.tasks.extend(stage_tasks)
+        stage_results, stage_timings = pipeline.run(stage_tasks, self.workers)
+        self.results.update(stage_results)
+        self.timings.update(stage_timings)
+        return all(stage_results.get(task.name) for task in stage_tasks)
+
+    def failed(self) -> list[str]:
+        return [task.name for task in self.tasks if not self.results[task.name]]
+
+
+def run_shard(
+    stages: Stages,
+    outlets: list[str],
+    site_scripts: list[str],
+    scrape,
+    merged_stages,
+    twitter_scripts=TWITTER_SCRIPTS,
+    merge_only: bool = False,
+) -> None:
+    """
+    Scrape this shard's outlets; the last shard to finish then merges every
+    shard's reporters, runs the sync and Twitter stages on them and removes
+    the run's shard outputs. With merge_only (--merge-shards) nothing is
+    scraped and what the shards staged is merged right away.
+    merged_stages(merged_dir, merged_scripts) returns the (sync, run_twitter)
+    actions.
+    """
+    if merge_only:
+        pending = sharding.pending()
+        print(
+            f"\n[OK] Merging and syncing run {sharding.RUN_ID}"
+            + (f"; shards {pending} never finished" if pending else "")
+        )
+    else:
+        if not sharding.start():
+            print(f"\n[OK] Run {sharding.RUN_ID} was already merged and synced; nothing to do")
+            return
+        stages.run(build_tasks(outlets, scrape=scrape))
+        reporter_state.export(sharding.state_file())
+        sharding.mark_done()
+        if not sharding.claim_merge():
+            print(f"\n[OK] Shard {sharding.INDEX} done; the last shard to finish syncs the run")
+            return
+        print(f"\n[OK] All {sharding.COUNT} shards done; merging and syncing run {sharding.RUN_ID}")
+    with tempfile.TemporaryDirectory(prefix="run_all-merge-") as merged_dir:
+        merged = sharding.merge(site_scripts, merged_dir)
+        sync, run_twitter = merged_stages(merged_dir, merged)
+        synced = stages.run(
+            build_tasks(merged, sync=sync, run_twitter=run_twitter, twitter_scripts=twitter_scripts)
+        )
+    if synced:
+        sharding.cleanup()
+    else:
+        # A retry of this shard (or --merge-shards) merges the run again.
+        print(f"  Warning: keeping {sharding.run_dir()} since the run did not sync cleanly")
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.merge_shards:
+        if not sharding.sharded():
+            parser.error("--merge-shards needs SHARD_COUNT and SHARD_RUN_ID of the sharded run")
+        if sharding.synced():
+            parser.error(f"run {sharding.RUN_ID} was already merged and synced")
+        if not os.path.isdir(sharding.run_dir()):
+            parser.error(f"no shard outputs of run {sharding.RUN_ID} in {sharding.SHARD_DIR}")
+
+    log_dir = LOG_DIR
+    if sharding.sharded():
+        # Local shards run side by side in one checkout; keep their logs apart.
+        log_dir = os.path.join(LOG_DIR, f"shard-{sharding.INDEX}")
+    os.makedirs(log_dir, exist_ok=True)
+
+    scripts = SCRIPTS
+    child_env = dict(os.environ)
+    # Children write to a pipe; flush per line so the console stream stays live.
+    child_env["PYTHONUNBUFFERED"] = "1"
+    if args.record:
+        # One manifest for the whole run, shared by every child process.
+        child_env["SNAPSHOT_RECORD"] = "1"
+        child_env["SNAPSHOT_RUN_ID"] = snapshots.new_run_id()
+        print(f"[OK] Recording snapshots as run {child_env['SNAPSHOT_RUN_ID']}")
+    elif args.replay:
+        child_env["SNAPSHOT_REPLAY"] = args.replay
+        scripts = [s for s in scripts if s not in NETWORK_ONLY_SCRIPTS]
+        print(f"[OK] Replaying snapshot run {args.replay}")
+
+    if args.resume:
+        child_env["CHECKPOINT_RESUME"] = "1"
+        print("[OK] Resuming from the scrapers' checkpoint journals")
+
+    if args.max_age:
+        child_env["REPORTER_MAX_AGE_DAYS"] = str(args.max_age)
+        print(f"[OK] Reusing reporter profiles scraped within {args.max_age:g} days")
+
+    def run(script: str, *script_args: str, env: dict = child_env) -> bool:
+        return run_script(script, *script_args, env=env, log_dir=log_dir)
+
+    site_scripts = [s for s in scripts if s not in TWITTER_SCRIPTS]
+    twitter_scripts = [s for s in scripts if s in TWITTER_SCRIPTS]
+    stages = Stages(args.workers)
+
+    shard_assignment: dict[str, tuple[int, list[int]]] = {}
+    if sharding.sharded():
+        shard_assignment = sharding.assignment(site_scripts)
+        outlets = [
+            script if parts == 1 else f"{script} (parts {owned} of {parts})"
+            for script, (parts, owned) in shard_assignment.items()
+        ]
+        print(
+            f"[OK] Shard {sharding.INDEX} of {sharding.COUNT} in run {sharding.RUN_ID}: "
+            + (", ".join(outlets) or "no outlets")
+        )
+        child_env["SHARD_ASSIGNMENT"] = json.dumps(shard_assignment)
+        # Shards scraping parts of one outlet must not share its journal.
+        checkpoint.CHECKPOINT_DIR = os.path.join(
+            checkpoint.CHECKPOINT_DIR, f"shard-{sharding.INDEX}"
+        )
+        child_env["CHECKPOINT_DIR"] = checkpoint.CHECKPOINT_DIR
+
+    if args.in_process:
+        import inprocess_runner
+        import sitemaps
+        import sync_reporters
+
+        snapshots.configure(
+            record=args.record, replay=args.replay, run=child_env.get("SNAPSHOT_RUN_ID")
+        )
+        checkpoint.configure(resume=args.resume)
+        reporter_state.configure(max_age_days=args.max_age)
+        runner = inprocess_runner.InProcessRunner(log_dir)
+        runner.load(scripts)
+
+        def scrape_to_shard(script: str) -> bool:
+            ok = runner.scrape(script)
+            if runner.scraped.get(script):
+                path = os.path.join(sharding.shard_dir(), script.replace(".py", ".json"))
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(runner.scraped[script], f, ensure_ascii=False, indent=2)
+            return ok
+
+        def merged_in_process(merged_dir: str, merged: list[str]):
+            runner.scraped = sync_reporters.load_staged(merged_dir, merged)
+
+            def sync(merged: list[str]) -> bool:
+                return runner.sync(merged, sharding.sitemap_dirs(), sharding.state_files())
+
+            return sync, runner.run
+
+        with runner:
+            if sharding.sharded():
+                sharding.configure(shard_assignment)
+                sitemaps.PENDING_DIR = sharding.sitemap_dir()
+                run_shard(
+                    stages,
+                    list(shard_assignment),
+                    site_scripts,
+                    scrape_to_shard,
+                    merged_in_process,
+                    twitter_scripts,
+                    merge_only=args.merge_shards,
+                )
+            else:
+                stages.run(
+                    build_tasks(
+                        site_scripts, runner.scrape, runner.sync, runner.run, twitter_scripts
+                    )
+                )
+    elif sharding.sharded():
+        # Scrapers stage into this shard's directory; the merging shard syncs.
+        shard_env = {
+            **child_env,
+            "REPORTERS_SINK_DIR": sharding.shard_dir(),
+            "SITEMAP_PENDING_DIR": sharding.sitemap_dir(),
+            "SITEMAP_DEFER_COMMIT": "1",
+        }
+        committed = [f"--sitemap-marks={d}" for d in sharding.sitemap_dirs()]
+        committed += [f"--reporter-state={f}" for f in sharding.state_files()]
+
+        def merged_subprocess(merged_dir: str, merged: list[str]):
+            return lambda merged: run(SYNC_SCRIPT, *committed, merged_dir, *merged), run
+
+        run_shard(
+            stages,
+            list(shard_assignment),
+            site_scripts,
+            lambda script: run(script, env=shard_env),
+            merged_subprocess,
+            twitter_scripts,
+            merge_only=args.merge_shards,
+        )
+    else:
+        with tempfile.TemporaryDirectory(prefix="run_all-") as staging_dir:
+            # Scrapers only stage their reporters; the sync stage writes them.
+            scrape_env = {
+                **child_env,
+                "REPORTERS_SINK_DIR": staging_dir,
+                "SITEMAP_DEFER_COMMIT": "1",
+            }
+            stages.run(
+                build_tasks(
+                    site_scripts,
+                    lambda script: run(script, env=scrape_env),
+                    lambda scripts: run(SYNC_SCRIPT, staging_dir, *scripts),
+                    run,
+                    twitter_scripts,
+                )
+            )
+
+    failed_scripts = stages.failed()
+
+    pipeline.print_stage_timings(stages.tasks, stages.timings)
+
+    # ===== Summary =====
+    print("\n====================")
+    print("SCRAPE SUMMARY")
+    print("====================")
+
+    if failed_scripts:
+        print("[FAIL] Failed scripts:")
+        for s in failed_scripts:
+            print(f"  - {s}")
+        sys.exit(1)
+    else:
+        print("[OK] All scripts ran successfully")
+
 
-# ===== Summary =====
-print("\n====================")
-print("SCRAPE SUMMARY")
-print("====================")
-
-if failed_scripts:
-    print("[FAIL] Failed scripts:")
-    for s in failed_scripts:
-        print(f"  - {s}")
-    sys.exit(1)
-else:
-    print("[OK] All scripts ran successfully")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Command-line options shared by every scraper's __main__.
+
+  python metro.py --record            record fetched pages to the snapshot store
+  python metro.py --replay RUN_ID     parse a recorded run offline
+  python metro.py --resume            skip steps an interrupted run completed
+  python metro.py --max-age 7         refetch only profiles older than 7 days
+                                      or with new articles in the listing
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import checkpoint
+import reporter_state
+import snapshots
+
+
+def build_parser(prog: str | None = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--record",
+        action="store_true",
+        help="write every fetched page to the snapshot store",
+    )
+    mode.add_argument(
+        "--replay",
+        metavar="RUN_ID",
+        help="read pages from a recorded run instead of the network",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="reuse the steps journaled by an interrupted run (see checkpoint)",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        metavar="DAYS",
+        help="reuse reporter profiles scraped within DAYS unless the listing "
+        "shows new articles (see reporter_state)",
+    )
+    return parser
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse scraper options and apply them to the shared modules."""
+    args = build_parser().parse_args(argv)
+    snapshots.configure(record=args.record, replay=args.replay)
+    checkpoint.configure(resume=args.resume)
+    reporter_state.configure(max_age_days=args.max_age)
+    return args
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the scrapers' extraction functions on fixture pages.
+
+By default the pages in scripts/bench_fixtures/ (listed in its manifest.json
+with the extractors each one exercises) are benchmarked, and row_for_bigquery
+runs over the reporters in bench_fixtures/reporters.json, so results are
+comparable across machines and against the committed baseline. Given RUN_ID,
+the pages of that recorded snapshot run (scraper_cli --record) are run
+through the extractors registered for their site in
+check_parser_parity.EXTRACTORS instead, and row_for_bigquery over the run's
+replay output. Extractors that fetch further pages through fetch_engine are
+skipped either way, so the timings measure parsing only. Each case reports
+pages/sec and time per page (median of --repeat rounds) and the peak memory
+allocated by a warmed-up call (tracemalloc).
+
+--save-baseline writes the results to the baseline file. Later runs compare
+against it and exit 1 when a case is slower than the baseline by more than
+--tolerance or allocates more by more than --memory-tolerance. Speed is
+compared relative to a fixed pure-Python calibration workload timed in
+alternate rounds with each case, so the committed baseline holds on a faster
+or slower machine. Refresh bench_fixtures/baseline.json
+alongside a change that is meant to move the numbers.
+
+usage: python scripts/bench_parsers.py [RUN_ID] [--baseline PATH] [--save-baseline]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parser  # noqa: E402
+import snapshots  # noqa: E402
+from check_parser_parity import (  # noqa: E402
+    FIXTURES_DIR,
+    fixture_pages,
+    recorded_pages,
+    resolve,
+    run,
+)
+
+DEFAULT_BASELINE = os.path.join(FIXTURES_DIR, "baseline.json")
+
+# These fetch further pages through fetch_engine while they parse.
+FETCHING_EXTRACTORS = {"newsismybusiness.get_reporters_from_homepage"}
+
+# Peaks of a few KiB move with allocator and interpreter details, not the code.
+MEMORY_SLACK_KIB = 8
+
+Case = Callable[[], Any]
+
+
+def _quiet(case: Case) -> Case:
+    # Extractors log per page; keep that out of the timings and the report.
+    def quiet() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            case()
+
+    return quiet
+
+
+def _extractor_cases(run_id: str | None) -> dict[str, tuple[int, Case]]:
+    """Extractor name -> (page count, callable running it over every page)."""
+    pages_by_name: dict[str, list[tuple[str, Any]]] = defaultdict(list)
+    for url, html_content, names in recorded_pages() if run_id else fixture_pages():
+        for name in names:
+            if name not in FETCHING_EXTRACTORS:
+                pages_by_name[name].append((url, html_content))
+
+    cases = {}
+    for name, pages in sorted(pages_by_name.items()):
+        extract = resolve(name)
+
+        def case(extract: Callable[..., Any] = extract, pages: list = pages) -> None:
+            for url, html_content in pages:
+                run(extract, url, html_content, html_parser.PARSER)
+
+        cases[name] = (len(pages), _quiet(case))
+    return cases
+
+
+def _row_cases(run_id: str | None) -> dict[str, tuple[int, Case]]:
+    from bigquery_sync import row_for_bigquery
+
+    reporters = []
+    if run_id:
+        paths = glob.glob(os.path.join(snapshots.SNAPSHOT_DIR, "replays", run_id, "*.json"))
+    else:
+        paths = [os.path.join(FIXTURES_DIR, "reporters.json")]
+    for path in sorted(paths):
+        with open(path, encoding="utf-8") as f:
+            reporters.extend(json.load(f))
+    if not reporters:
+        return {}
+
+    def case() -> None:
+        for reporter in reporters:
+            row_for_bigquery(reporter)
+
+    return {"bigquery_sync.row_for_bigquery": (len(reporters), case)}
+
+
+def _calibration() -> None:
+    # Pure-Python work that no change in this repo affects; cases are timed
+    # relative to it so the baseline holds on a faster or slower machine.
+    words: dict[str, int] = {}
+    for i in range(20000):
+        word = f"w{i % 997}"
+        words[word] = words.get(word, 0) + len(word)
+    sorted(words.items(), key=lambda item: item[1])
+
+
+def measure(case: Case, items: int, repeat: int) -> dict[str, float]:
+    # Warm up first: imports, compiled selectors and regexes, parser caches.
+    case()
+
+    # Alternate case and calibration rounds, so load on the machine hits both,
+    # and keep the median of each round's ratio.
+    case_timer = timeit.Timer(case, timer=time.perf_counter)
+    calibration_timer = timeit.Timer(_calibration, timer=time.perf_counter)
+    case_number, _ = case_timer.autorange()
+    calibration_number, _ = calibration_timer.autorange()
+    times, ratios = [], []
+    for _ in range(repeat):
+        calibration = calibration_timer.timeit(calibration_number) / calibration_number
+        elapsed = case_timer.timeit(case_number) / case_number
+        times.append(elapsed)
+        ratios.append(calibration / elapsed if elapsed else 0.0)
+    median = statistics.median(times)
+
+    peaks = []
+    for _ in range(3):
+        tracemalloc.start()
+        case()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "items": items,
+        "ops_per_sec": items / median if median else 0.0,
+        "ms_per_item": median * 1000 / items if items else 0.0,
+        "relative": statistics.median(ratios),
+        "peak_kib": min(peaks) / 1024,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slowdown = base["relative"] / result["relative"] if result["relative"] else float("inf")
+        if slowdown > 1 + tolerance:
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:.1f} ops/s, {slowdown:.2f}x slower "
+                "than baseline relative to calibration"
+            )
+        allowed = base["peak_kib"] * (1 + memory_tolerance) + MEMORY_SLACK_KIB
+        if result["peak_kib"] > allowed:
+            regressions.append(
+                f"{name}: peak {result['peak_kib']:.0f} KiB vs baseline {base['peak_kib']:.0f}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "run_id", nargs="?", help="snapshot run recorded with --record (default: fixtures)"
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.5, help="allowed slowdown (default 0.5, 1.5x)"
+    )
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=0.25, help="allowed peak growth (default 0.25)"
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="timing rounds (median is kept)")
+    parser.add_argument("--filter", default="", help="only cases containing this text")
+    args = parser.parse_args()
+
+    if args.run_id:
+        snapshots.configure(replay=args.run_id)
+    cases = {**_extractor_cases(args.run_id), **_row_cases(args.run_id)}
+    cases = {name: case for name, case in cases.items() if args.filter in name}
+    if not cases:
+        print(f"No benchmark cases for {args.run_id or 'the fixtures'}")
+        sys.exit(2)
+
+    print(f"HTML parser: {html_parser.backend()}")
+    print(f"{'case':<55} {'items':>6} {'ops/s':>10} {'ms/item':>9} {'peak KiB':>9}")
+    results = {}
+    for name, (items, case) in cases.items():
+        result = results[name] = measure(case, items, args.repeat)
+        print(
+            f"{name:<55} {items:>6} {result['ops_per_sec']:>10.1f} "
+            f"{result['ms_per_item']:>9.3f} {result['peak_kib']:>9.0f}"
+        )
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"\n{len(regressions)} regressions against {args.baseline}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Check that an HTML parser backend gives the same scraper output as html.parser.
+
+Runs page-level extraction functions once per backend and reports any page
+whose output differs. By default the committed pages in scripts/bench_fixtures/
+are checked with the extractors its manifest.json lists for each; given RUN_ID,
+every page of that recorded snapshot run (scraper_cli --record) is checked
+with the extractors registered for its site. Exits 1 on a mismatch, so a
+backend can be vetted before setting HTML_PARSER in production.
+
+usage: python scripts/check_parser_parity.py [RUN_ID] [--parser lxml]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import sys
+from typing import Any, Callable, Iterator
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parser  # noqa: E402
+import snapshots  # noqa: E402
+
+REFERENCE_PARSER = "html.parser"
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+
+# Host -> extraction functions taking (url, html_content) or (html_content).
+EXTRACTORS: dict[str, list[str]] = {
+    "claridadpuertorico.com": [
+        "claridad.get_reporters_list_from_articles",
+        "claridad.get_reporters_from_article",
+        "claridad.PROFILE.parse",
+    ],
+    "elnuevodia.com": [
+        "elnuevodia.parse_reporters",
+        "elnuevodia.get_article_info",
+        "elnuevodia.parse_reporter_info",
+    ],
+    "elvocero.com": [
+        "elvocero.get_reporter_info_from_article",
+        "elvocero.get_article_urls",
+        "elvocero.get_article_info",
+    ],
+    "periodicolaperla.com": ["laperladelsur.parse_reporter_info"],
+    "metro.pr": ["metro.get_reporters_from_listing_html", "metro.PROFILE.parse"],
+    "noticel.com": ["noticel.PROFILE.parse"],
+    "newsismybusiness.com": [
+        "newsismybusiness.get_reporters_list_from_articles",
+        "newsismybusiness.get_reporters_from_homepage",
+        "newsismybusiness.get_article_info",
+        "newsismybusiness.parse_reporter_info",
+    ],
+    "primerahora.com": ["primerahora.parse_reporters", "primerahora.parse_reporter_info"],
+    "sincomillas.com": [
+        "sincimillas.get_reporters_list_from_articles",
+        "sincimillas.get_reporters_from_article",
+        "sincimillas.parse_reporter_info",
+    ],
+    "telemundopr.com": ["telemundopr.get_article_info", "telemundopr.parse_reporter_info"],
+    "wapa.tv": ["wapatv.get_article_info", "wapatv.get_article_links"],
+}
+
+
+def resolve(name: str) -> Callable[..., Any]:
+    module, *path = name.split(".")
+    target: Any = importlib.import_module(module)
+    for attr in path:
+        target = getattr(target, attr)
+    return target
+
+
+def extractor_names(url: str) -> list[str]:
+    host = urlsplit(url).netloc.lower()
+    return [
+        name
+        for site, names in EXTRACTORS.items()
+        if host == site or host.endswith("." + site)
+        for name in names
+    ]
+
+
+def fixture_pages() -> Iterator[tuple[str, str, list[str]]]:
+    """(url, html, extractor names) for every page in the fixture manifest."""
+    with open(os.path.join(FIXTURES_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for entry in manifest:
+        with open(os.path.join(FIXTURES_DIR, entry["page"]), encoding="utf-8") as f:
+            yield entry["url"], f.read(), entry["extractors"]
+
+
+def recorded_pages() -> Iterator[tuple[str, Any, list[str]]]:
+    """(url, html, extractor names) for every page of the replayed run."""
+    for url, html_content in snapshots.recorded_pages():
+        yield url, html_content, extractor_names(url)
+
+
+def run(extract: Callable[..., Any], url: str, html_content: Any, parser: str) -> Any:
+    html_parser.PARSER = parser
+    if len(inspect.signature(extract).parameters) == 1:
+        return extract(html_content)
+    return extract(url, html_content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "run_id", nargs="?", help="snapshot run recorded with --record (default: fixtures)"
+    )
+    parser.add_argument("--parser", default="lxml", help="backend to compare (default lxml)")
+    args = parser.parse_args()
+
+    if args.run_id:
+        snapshots.configure(replay=args.run_id)
+        pages = list(recorded_pages())
+    else:
+        pages = list(fixture_pages())
+
+    checked = 0
+    mismatches = []
+    for url, html_content, names in pages:
+        for extract in map(resolve, names):
+            expected = run(extract, url, html_content, REFERENCE_PARSER)
+            actual = run(extract, url, html_content, args.parser)
+            checked += 1
+            if actual != expected:
+                mismatches.append((url, extract, expected, actual))
+
+    if html_parser.backend() != args.parser:
+        print(f"{args.parser} is not installed")
+        sys.exit(2)
+
+    for url, extract, expected, actual in mismatches:
+        print(f"MISMATCH {extract.__module__}.{extract.__qualname__} {url}")
+        print(f"  {REFERENCE_PARSER}: {str(expected)[:300]}")
+        print(f"  {args.parser}: {str(actual)[:300]}")
+
+    print(
+        f"{checked} extractions on {len(pages)} pages, "
+        f"{len(mismatches)} differ between {REFERENCE_PARSER} and {args.parser}"
+    )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
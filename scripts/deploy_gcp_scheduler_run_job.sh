@@ -15,6 +15,19 @@
 #   SCHEDULER_NAME (reporter-scraper-weekly-trigger)
 #   BIGQUERY_DATASET (reporter_scraper), SCHEDULE_CRON (default 0 0 * * 1 = Monday 00:00 UTC)
 #   RUNTIME_SA (reporter-scraper-runtime), SCHEDULER_SA (reporter-scraper-scheduler)
+#   STATE_BUCKET (default ${PROJECT_ID}-reporter-scraper-state): Cloud Storage bucket
+#     mounted at /mnt/state for state kept between weekly runs (the container
+#     disk starts empty on every execution): the sitemap watermarks and the
+#     reporter state that --max-age / REPORTER_MAX_AGE_DAYS reuses profiles from.
+#   TASKS (default 1): Cloud Run tasks to shard run_all.py across (see sharding.py).
+#     With TASKS > 1, shard outputs go to the Cloud Storage bucket SHARD_BUCKET
+#     (default ${PROJECT_ID}-reporter-scraper-shards), mounted in every task.
+#     If a task fails all its attempts (--max-retries below), the execution
+#     syncs nothing; its shard outputs stay in the bucket under the execution
+#     name, and run_all.py --merge-shards (SHARD_DIR on the mounted bucket,
+#     SHARD_COUNT=TASKS, SHARD_RUN_ID=<execution>) merges and syncs them.
+#   SHARD_SPLIT_OUTLETS: large outlets to split across tasks, e.g. "elnuevodia.py=2"
+#     (only scrapers listed in sharding.SPLITTABLE; wapatv.py cannot be split)
 #
 set -euo pipefail
 
@@ -31,6 +44,10 @@ SCHEDULER_SA_ID="${SCHEDULER_SA:-reporter-scraper-scheduler}"
 REGISTRY_REPO="${ARTIFACT_REGISTRY_REPO:-reporter-scraper}"
 IMAGE_NAME="${IMAGE_NAME:-reporter-scraper}"
 TWITTER_SECRET_ID="${TWITTER_SECRET_ID:-twitter-api-key}"
+TASKS="${TASKS:-1}"
+SHARD_BUCKET="${SHARD_BUCKET:-${PROJECT_ID}-reporter-scraper-shards}"
+STATE_BUCKET="${STATE_BUCKET:-${PROJECT_ID}-reporter-scraper-state}"
+SHARD_SPLIT_OUTLETS="${SHARD_SPLIT_OUTLETS:-}"
 
 RUNTIME_SA_EMAIL="${RUNTIME_SA_ID}@${PROJECT_ID}.iam.gserviceaccount.com"
 SCHEDULER_SA_EMAIL="${SCHEDULER_SA_ID}@${PROJECT_ID}.iam.gserviceaccount.com"
@@ -53,6 +70,7 @@ echo "Project:     ${PROJECT_ID} (${PROJECT_NUMBER})"
 echo "Region:      ${REGION}"
 echo "Job:         ${JOB_NAME}"
 echo "Schedule:    ${SCHEDULE_CRON} (${TIMEZONE})"
+echo "Tasks:       ${TASKS}"
 echo "Image:       ${IMAGE_TAG}"
 echo "=========================================="
 
@@ -151,35 +169,64 @@ fi
 
 echo ""
 echo "[6/8] Cloud Run Job..."
-# Long timeout for many sequential Playwright scrapers; tune CPU/RAM if needed.
-if [[ ${#SECRETS_ARGS[@]} -gt 0 ]]; then
-  gcloud run jobs deploy "${JOB_NAME}" \
-    --project="${PROJECT_ID}" \
-    --region="${REGION}" \
-    --image="${IMAGE_TAG}" \
-    --tasks=1 \
-    --parallelism=1 \
-    --max-retries=1 \
-    --task-timeout=4h \
-    --cpu=4 \
-    --memory=8Gi \
-    --service-account="${RUNTIME_SA_EMAIL}" \
-    --set-env-vars="GCP_PROJECT=${PROJECT_ID},GOOGLE_CLOUD_PROJECT=${PROJECT_ID},BIGQUERY_DATASET=${DATASET_ID}" \
-    "${SECRETS_ARGS[@]}"
-else
-  gcloud run jobs deploy "${JOB_NAME}" \
-    --project="${PROJECT_ID}" \
-    --region="${REGION}" \
-    --image="${IMAGE_TAG}" \
-    --tasks=1 \
-    --parallelism=1 \
-    --max-retries=1 \
-    --task-timeout=4h \
-    --cpu=4 \
-    --memory=8Gi \
-    --service-account="${RUNTIME_SA_EMAIL}" \
-    --set-env-vars="GCP_PROJECT=${PROJECT_ID},GOOGLE_CLOUD_PROJECT=${PROJECT_ID},BIGQUERY_DATASET=${DATASET_ID}"
+# A bucket the job's service account can read and write.
+ensure_bucket() {
+  local bucket="$1"
+  local label="$2"
+  if gcloud storage buckets describe "gs://${bucket}" --project="${PROJECT_ID}" &>/dev/null; then
+    echo "${label} bucket exists: gs://${bucket}"
+  else
+    gcloud storage buckets create "gs://${bucket}" \
+      --project="${PROJECT_ID}" \
+      --location="${REGION}" \
+      --uniform-bucket-level-access
+  fi
+  gcloud storage buckets add-iam-policy-binding "gs://${bucket}" \
+    --member="serviceAccount:${RUNTIME_SA_EMAIL}" \
+    --role="roles/storage.objectAdmin" \
+    --quiet
+}
+
+ENV_VARS="GCP_PROJECT=${PROJECT_ID},GOOGLE_CLOUD_PROJECT=${PROJECT_ID},BIGQUERY_DATASET=${DATASET_ID}"
+# Sitemap watermarks and reporter state must survive the execution, or every
+# run starts over from the same oldest SITEMAP_MAX_URLS articles and refetches
+# every profile. The reporter state SQLite stays on local disk and is copied
+# from and back to the bucket (see reporter_state.py).
+ensure_bucket "${STATE_BUCKET}" "State"
+ENV_VARS="${ENV_VARS},SITEMAP_WATERMARKS_PATH=/mnt/state/sitemap_watermarks.json"
+ENV_VARS="${ENV_VARS},REPORTER_STATE_STORE=/mnt/state/reporter_state.sqlite"
+VOLUME_ARGS=(
+  --add-volume="name=state,type=cloud-storage,bucket=${STATE_BUCKET}"
+  --add-volume-mount="volume=state,mount-path=/mnt/state"
+)
+if ((TASKS > 1)); then
+  # Every task writes its shard under SHARD_DIR; the last one to finish merges and syncs.
+  ensure_bucket "${SHARD_BUCKET}" "Shard"
+  ENV_VARS="${ENV_VARS},SHARD_DIR=/mnt/shards"
+  if [[ -n "${SHARD_SPLIT_OUTLETS}" ]]; then
+    # Commas separate --set-env-vars entries; use gcloud's ^@^ delimiter syntax.
+    ENV_VARS="^@^${ENV_VARS//,/@}@SHARD_SPLIT_OUTLETS=${SHARD_SPLIT_OUTLETS}"
+  fi
+  VOLUME_ARGS+=(
+    --add-volume="name=shards,type=cloud-storage,bucket=${SHARD_BUCKET}"
+    --add-volume-mount="volume=shards,mount-path=/mnt/shards"
+  )
 fi
+# Long timeout for many sequential Playwright scrapers; tune CPU/RAM if needed.
+gcloud run jobs deploy "${JOB_NAME}" \
+  --project="${PROJECT_ID}" \
+  --region="${REGION}" \
+  --image="${IMAGE_TAG}" \
+  --tasks="${TASKS}" \
+  --parallelism="${TASKS}" \
+  --max-retries=1 \
+  --task-timeout=4h \
+  --cpu=4 \
+  --memory=8Gi \
+  --service-account="${RUNTIME_SA_EMAIL}" \
+  --set-env-vars="${ENV_VARS}" \
+  "${VOLUME_ARGS[@]}" \
+  ${SECRETS_ARGS[@]+"${SECRETS_ARGS[@]}"}
 
 echo ""
 echo "[7/8] Scheduler invoker service account..."
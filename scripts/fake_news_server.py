@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Serve a recorded snapshot run as a stand-in for every outlet and twitterapi.io.
+
+Pages recorded with scraper_cli --record are served at /<host><path>?<query>,
+the layout http_fetch.target_url() produces when HTTP_ORIGIN_OVERRIDE points
+here. Paths without a host prefix (relative XHRs from rendered pages) are
+matched on path and query alone. /api.twitterapi.io/twitter/user/search
+answers with generated users, paged --twitter-pages times per query.
+
+Every response can be delayed (--latency/--jitter, milliseconds) and a
+fraction of them replaced by a 503 (--error-rate) or a 429 with Retry-After
+(--rate-429). GET /__stats returns request counts by status and host.
+
+usage: python scripts/fake_news_server.py RUN_ID [--port 8765] [--latency 50]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshots  # noqa: E402
+
+TWITTER_SEARCH = "/api.twitterapi.io/twitter/user/search"
+USERS_PER_PAGE = 20
+
+
+def _key(url: str) -> str:
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{parts.netloc.lower()}{parts.path or '/'}{query}"
+
+
+def _content_type(body: bytes) -> str:
+    head = body.lstrip()[:5]
+    if head[:1] in (b"{", b"["):
+        return "application/json; charset=utf-8"
+    if head == b"<?xml":
+        return "application/xml; charset=utf-8"
+    return "text/html; charset=utf-8"
+
+
+class PageIndex:
+    """Recorded pages by host + path + query, and by path + query alone."""
+
+    def __init__(self, run_id: str) -> None:
+        snapshots.configure(replay=run_id)
+        self.by_key: dict[str, bytes] = {}
+        self.by_path: dict[str, bytes] = {}
+        for url, content in snapshots.recorded_pages():
+            body = content.encode("utf-8") if isinstance(content, str) else content
+            key = _key(url)
+            self.by_key[key] = body
+            self.by_path[key[key.index("/") :]] = body
+
+    def find(self, path: str) -> bytes | None:
+        body = self.by_key.get(path.lstrip("/"))
+        if body is None:
+            body = self.by_path.get(path)
+        return body
+
+
+def _twitter_search(query: str, cursor: str, pages: int) -> dict:
+    page = int(cursor) if cursor.isdigit() else 0
+    name = query.replace('"', "").strip()
+    users = []
+    for i in range(USERS_PER_PAGE):
+        seed = hashlib.sha1(f"{query}|{page}|{i}".encode("utf-8")).hexdigest()[:10]
+        users.append(
+            {
+                "id": seed,
+                "name": f"{name} {seed[:4]}",
+                "screen_name": f"pr_{seed}",
+            }
+        )
+    has_next = page + 1 < pages
+    return {
+        "users": users,
+        "has_next_page": has_next,
+        "next_cursor": str(page + 1) if has_next else "",
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: "FakeNewsServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str, **headers: str) -> None:
+        if self.path != "/__stats":
+            self.server.count(self.path, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/__stats":
+            body = json.dumps(self.server.stats()).encode("utf-8")
+            self._send(200, body, "application/json")
+            return
+
+        config = self.server.config
+        delay = config.latency + random.uniform(0, config.jitter)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        roll = random.random()
+        if roll < config.rate_429:
+            self._send(429, b"Too Many Requests", "text/plain", Retry_After="1")
+            return
+        if roll < config.rate_429 + config.error_rate:
+            self._send(503, b"Service Unavailable", "text/plain")
+            return
+
+        parts = urlsplit(self.path)
+        if parts.path == TWITTER_SEARCH:
+            params = parse_qs(parts.query)
+            data = _twitter_search(
+                (params.get("query") or [""])[0],
+                (params.get("cursor") or [""])[0],
+                config.twitter_pages,
+            )
+            self._send(200, json.dumps(data).encode("utf-8"), "application/json")
+            return
+
+        body = self.server.pages.find(self.path)
+        if body is None:
+            self._send(404, b"Not Found", "text/plain")
+            return
+        self._send(200, body, _content_type(body))
+
+
+class FakeNewsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, pages: PageIndex, config: argparse.Namespace) -> None:
+        super().__init__(("127.0.0.1", port), Handler)
+        self.pages = pages
+        self.config = config
+        self.verbose = config.verbose
+        self._lock = threading.Lock()
+        self._statuses: Counter[int] = Counter()
+        self._hosts: Counter[str] = Counter()
+        self._started = time.monotonic()
+
+    def count(self, path: str, status: int) -> None:
+        host = path.lstrip("/").split("/", 1)[0]
+        with self._lock:
+            self._statuses[status] += 1
+            self._hosts[host] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": sum(self._statuses.values()),
+                "statuses": {str(k): v for k, v in sorted(self._statuses.items())},
+                "hosts": dict(self._hosts.most_common()),
+                "uptime_seconds": round(time.monotonic() - self._started, 2),
+            }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("run_id", help="snapshot run recorded with --record")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="ms added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random ms (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction answered 503")
+    parser.add_argument("--rate-429", type=float, default=0, help="fraction answered 429")
+    parser.add_argument(
+        "--twitter-pages", type=int, default=2, help="result pages per twitter search query"
+    )
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    pages = PageIndex(args.run_id)
+    server = FakeNewsServer(args.port, pages, args)
+    print(
+        f"Serving {len(pages.by_key)} pages of run {args.run_id} "
+        f"on http://127.0.0.1:{args.port}",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
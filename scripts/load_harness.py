@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Run the whole run_all.py pipeline against scripts/fake_news_server.py.
+
+Starts the fake server on a recorded snapshot run, points every scraper at it
+(HTTP_ORIGIN_OVERRIDE), sends BigQuery writes to a temporary JSON sink
+(REPORTERS_SINK_DIR) and keeps every piece of run state (HTTP cache,
+checkpoints, reporter state, learned fetch tiers, sitemap watermarks,
+snapshots, shard outputs) in a temporary directory. The scrapers see the real
+site URLs, so state in .cache would otherwise be overwritten by the run. It
+then reports:
+
+  - total wall-clock and pages served per second,
+  - responses by status (including the injected 429s and 503s),
+  - per script: run time, time spent in politeness waits (summed over its
+    requests) and the remainder spent working.
+
+Latency and failure injection are passed to the server; --politeness-rate
+overrides POLITENESS_RATE for the run.
+
+usage: python scripts/load_harness.py RUN_ID [--latency 50] [--error-rate 0.02]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(ROOT, "scripts", "fake_news_server.py")
+
+# Set by the harness; a recording or replaying environment would bypass the server.
+CLEARED_ENV = ("SNAPSHOT_RECORD", "SNAPSHOT_REPLAY", "SNAPSHOT_RUN_ID")
+
+
+def _server_stats(base: str) -> dict:
+    with urllib.request.urlopen(f"{base}/__stats", timeout=5) as response:
+        return json.load(response)
+
+
+def _wait_for_server(base: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"fake_news_server exited with code {process.returncode}")
+        try:
+            _server_stats(base)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"fake_news_server did not start on {base}")
+
+
+def _throttle_stats(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def report(wall: float, stats: dict, scripts: list[dict], returncode: int) -> None:
+    pages = stats["statuses"].get("200", 0)
+    print(f"\n{'='*50}")
+    print("LOAD HARNESS SUMMARY")
+    print(f"{'='*50}")
+    print(f"run_all.py exit code: {returncode}")
+    print(f"Wall clock: {wall:.1f}s")
+    print(f"Requests: {stats['requests']} ({pages} pages served)")
+    print(f"Pages/sec: {pages / wall if wall else 0.0:.2f}")
+    print("Responses by status: " + ", ".join(f"{k}={v}" for k, v in stats["statuses"].items()))
+
+    if not scripts:
+        return
+    print(f"\n{'script':<24} {'run s':>8} {'waits s':>8} {'work s':>8} {'requests':>9}")
+    total_run = total_wait = 0.0
+    for entry in scripts:
+        run = entry["elapsed_seconds"]
+        wait = entry["throttled_seconds"]
+        requests = sum(h["requests"] for h in entry["hosts"].values())
+        total_run += run
+        total_wait += wait
+        print(
+            f"{entry['script']:<24} {run:>8.1f} {wait:>8.1f} "
+            f"{max(run - wait, 0.0):>8.1f} {requests:>9}"
+        )
+    share = total_wait / total_run * 100 if total_run else 0.0
+    print(
+        f"{'total':<24} {total_run:>8.1f} {total_wait:>8.1f} "
+        f"{max(total_run - total_wait, 0.0):>8.1f}"
+    )
+    print(f"\nPoliteness waits: {share:.0f}% of script run time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("run_id", help="snapshot run recorded with --record")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="ms added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random ms (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction answered 503")
+    parser.add_argument("--rate-429", type=float, default=0, help="fraction answered 429")
+    parser.add_argument("--twitter-pages", type=int, default=2)
+    parser.add_argument("--politeness-rate", type=float, help="POLITENESS_RATE for the run")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary directory")
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    workdir = tempfile.mkdtemp(prefix="load-harness-")
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            SERVER,
+            args.run_id,
+            "--port", str(args.port),
+            "--latency", str(args.latency),
+            "--jitter", str(args.jitter),
+            "--error-rate", str(args.error_rate),
+            "--rate-429", str(args.rate_429),
+            "--twitter-pages", str(args.twitter_pages),
+        ],
+        cwd=ROOT,
+    )
+    try:
+        _wait_for_server(base, server)
+
+        env = {k: v for k, v in os.environ.items() if k not in CLEARED_ENV}
+        env.update(
+            {
+                "HTTP_ORIGIN_OVERRIDE": base,
+                "REPORTERS_SINK_DIR": os.path.join(workdir, "sink"),
+                "POLITENESS_STATS_FILE": os.path.join(workdir, "politeness.jsonl"),
+                "HTTP_CACHE_DIR": os.path.join(workdir, "cache"),
+                "CHECKPOINT_DIR": os.path.join(workdir, "checkpoints"),
+                "REPORTER_STATE_PATH": os.path.join(workdir, "reporter_state.sqlite"),
+                "FETCH_TIERS_PATH": os.path.join(workdir, "fetch_tiers.json"),
+                "SITEMAP_WATERMARKS_PATH": os.path.join(workdir, "sitemap_watermarks.json"),
+                "SNAPSHOT_DIR": os.path.join(workdir, "snapshots"),
+                "SHARD_DIR": os.path.join(workdir, "shards"),
+                "TWITTER_API_KEY": env.get("TWITTER_API_KEY") or "load-harness",
+            }
+        )
+        if args.politeness_rate is not None:
+            env["POLITENESS_RATE"] = str(args.politeness_rate)
+
+        started = time.perf_counter()
+        returncode = subprocess.call([sys.executable, "run_all.py"], cwd=ROOT, env=env)
+        wall = time.perf_counter() - started
+
+        report(
+            wall,
+            _server_stats(base),
+            _throttle_stats(env["POLITENESS_STATS_FILE"]),
+            returncode,
+        )
+    finally:
+        server.terminate()
+        server.wait()
+        if args.keep:
+            print(f"\nSink, run state and politeness stats kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(returncode)
+
+
+if __name__ == "__main__":
+    main()
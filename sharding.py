@@ -0,0 +1,291 @@
+"""
+Split one run_all.py run across the tasks of a Cloud Run job.
+
+Each task (shard) scrapes its share of the outlets. Outlets listed in
+SHARD_SPLIT_OUTLETS are further split into parts by a hash of the reporter's
+profile URL; every scraper discovers the whole listing but only fetches and
+returns the reporters of the parts its shard owns (mine()). Only the outlets
+in SPLITTABLE have that step; a split asked for any other outlet (wapatv.py)
+is ignored with a warning. Parts are dealt round robin over the shards:
+
+  SHARD_COUNT=3 SHARD_SPLIT_OUTLETS=elnuevodia.py=2
+  shard 0: elnuevodia.py (part 0), laperladelsur.py, newsismybusiness.py, ...
+  shard 1: elnuevodia.py (part 1), claridad.py, noticel.py, ...
+  shard 2: elvocero.py, metro.py, primerahora.py, ...
+
+Shards stage their reporters, their sitemap marks (in sitemaps/) and their
+reporter state under SHARD_DIR/<run>/shard-<index>/ and then mark themselves
+done. The shard that finishes last merges every shard's reporters per outlet
+and runs the BigQuery sync (which commits every shard's sitemap marks and
+reporter state) and the Twitter stage for the whole run. Once those succeed it removes SHARD_DIR/<run> and leaves
+SHARD_DIR/<run>.synced behind, so a late retry of another shard of that run
+exits without scraping instead of staging into a run nobody merges.
+SHARD_DIR must therefore be shared by all tasks (a Cloud Storage volume on
+Cloud Run, see scripts/deploy_gcp_scheduler_run_job.sh).
+
+A shard that fails all of its attempts (Cloud Run --max-retries) never marks
+itself done, so no shard merges and nothing of the run is synced. Its staged
+reporters stay under SHARD_DIR/<run>; run_all.py --merge-shards, run with the
+same SHARD_DIR, SHARD_COUNT and SHARD_RUN_ID (the execution name), merges and
+syncs whatever the shards staged.
+
+Config:
+  CLOUD_RUN_TASK_INDEX / CLOUD_RUN_TASK_COUNT  set by Cloud Run; SHARD_INDEX /
+                       SHARD_COUNT stand in for them locally (default 0 / 1)
+  CLOUD_RUN_EXECUTION  names the run the shards belong to; SHARD_RUN_ID locally
+  SHARD_DIR            shared shard outputs (default .cache/shards)
+  SHARD_SPLIT_OUTLETS  outlets split by reporter hash, "script=parts,..."
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Iterable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(*names: str, default: int) -> int:
+    for name in names:
+        value = (os.environ.get(name) or "").strip()
+        if value:
+            return int(value)
+    return default
+
+
+# Scrapers that pass their reporters through mine() and can therefore be split.
+SPLITTABLE = {
+    "claridad.py",
+    "elnuevodia.py",
+    "elvocero.py",
+    "laperladelsur.py",
+    "metro.py",
+    "newsismybusiness.py",
+    "noticel.py",
+    "primerahora.py",
+    "sincimillas.py",
+    "telemundopr.py",
+}
+
+
+def _parse_split(value: str) -> dict[str, int]:
+    split = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        script, _, parts = entry.partition("=")
+        script = script.strip()
+        if not script.endswith(".py"):
+            script += ".py"
+        split[script] = max(int(parts or 1), 1)
+    return split
+
+
+INDEX = _env_int("CLOUD_RUN_TASK_INDEX", "SHARD_INDEX", default=0)
+COUNT = _env_int("CLOUD_RUN_TASK_COUNT", "SHARD_COUNT", default=1)
+RUN_ID = (
+    os.environ.get("CLOUD_RUN_EXECUTION") or os.environ.get("SHARD_RUN_ID") or ""
+).strip() or "local"
+SHARD_DIR = (os.environ.get("SHARD_DIR") or "").strip() or os.path.join(".cache", "shards")
+SPLIT_OUTLETS = _parse_split(os.environ.get("SHARD_SPLIT_OUTLETS") or "")
+
+# How long the <run>.synced markers are kept for late retries.
+SYNCED_TTL_SECONDS = 7 * 24 * 3600
+
+# script -> (parts, parts owned here); set for scraper processes by run_all.py.
+_assignment: dict[str, tuple[int, list[int]]] = {
+    script: (parts, owned)
+    for script, (parts, owned) in json.loads(
+        os.environ.get("SHARD_ASSIGNMENT") or "{}"
+    ).items()
+}
+
+
+def sharded() -> bool:
+    return COUNT > 1
+
+
+def assignment(scripts: list[str], index: int = INDEX) -> dict[str, tuple[int, list[int]]]:
+    """Outlets (and their owned parts) that shard index scrapes."""
+    split = {}
+    for script, parts in SPLIT_OUTLETS.items():
+        if script in SPLITTABLE:
+            split[script] = parts
+        else:
+            # Every part would scrape (and merge() repeat) the whole outlet.
+            print(f"  Warning: SHARD_SPLIT_OUTLETS: {script} cannot be split; ignoring")
+    units = [(script, part) for script in scripts for part in range(split.get(script, 1))]
+    owned: dict[str, tuple[int, list[int]]] = {}
+    for i, (script, part) in enumerate(units):
+        if i % COUNT == index:
+            parts = split.get(script, 1)
+            owned.setdefault(script, (parts, []))[1].append(part)
+    return owned
+
+
+def configure(owned: dict[str, tuple[int, list[int]]]) -> None:
+    """Restrict mine() to owned parts in this process (in-process runs)."""
+    _assignment.clear()
+    _assignment.update(owned)
+
+
+def _script_name(module: str) -> str:
+    if module == "__main__":
+        return os.path.basename(sys.argv[0])
+    return f"{module.rsplit('.', 1)[-1]}.py"
+
+
+def part_of(key: str, parts: int) -> int:
+    digest = hashlib.sha1(key.rstrip("/").encode("utf-8")).hexdigest()
+    return int(digest, 16) % parts
+
+
+def mine(module: str, reporters: Iterable[dict], field: str = "url") -> list[dict]:
+    """
+    The reporters this shard handles for module's outlet: all of them unless
+    the outlet is split, else those whose reporter[field] (or name) hashes
+    into a part this shard owns.
+    """
+    reporters = list(reporters)
+    parts, owned = _assignment.get(_script_name(module), (1, [0]))
+    if parts == 1:
+        return reporters
+    kept = [
+        reporter
+        for reporter in reporters
+        if part_of(reporter.get(field) or reporter.get("name") or "", parts) in owned
+    ]
+    print(
+        f"  Shard {INDEX}: {len(kept)} of {len(reporters)} reporters "
+        f"(parts {owned} of {parts})"
+    )
+    return kept
+
+
+def run_dir() -> str:
+    return os.path.join(SHARD_DIR, RUN_ID)
+
+
+def shard_dir(index: int = INDEX) -> str:
+    """Where shard index stages its reporters (a REPORTERS_SINK_DIR)."""
+    return os.path.join(run_dir(), f"shard-{index}")
+
+
+def _synced_path() -> str:
+    return os.path.join(SHARD_DIR, f"{RUN_ID}.synced")
+
+
+def synced() -> bool:
+    """Whether the run has already been merged and synced."""
+    return os.path.exists(_synced_path())
+
+
+def sitemap_dir(index: int = INDEX) -> str:
+    """Where shard index stages its sitemap marks (a SITEMAP_PENDING_DIR)."""
+    return os.path.join(shard_dir(index), "sitemaps")
+
+
+def sitemap_dirs() -> list[str]:
+    """Every shard's staged sitemap marks, for the merging shard to commit."""
+    return [sitemap_dir(index) for index in range(COUNT)]
+
+
+def state_file(index: int = INDEX) -> str:
+    """Where shard index exports its reporter state (see reporter_state.export)."""
+    return os.path.join(shard_dir(index), "reporter_state.sqlite")
+
+
+def state_files() -> list[str]:
+    """Every shard's exported reporter state, for the merging shard to commit."""
+    return [state_file(index) for index in range(COUNT)]
+
+
+def cleanup() -> None:
+    """Mark the run synced and remove its shard outputs."""
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    open(_synced_path(), "w", encoding="utf-8").close()
+    shutil.rmtree(run_dir(), ignore_errors=True)
+
+    # A retry comes within the same execution; older markers are done with.
+    expired = time.time() - SYNCED_TTL_SECONDS
+    for name in os.listdir(SHARD_DIR):
+        path = os.path.join(SHARD_DIR, name)
+        if name.endswith(".synced") and os.path.getmtime(path) < expired:
+            os.remove(path)
+
+
+def start() -> bool:
+    """
+    Empty this shard's staging directory (a retry starts over); False if the
+    run was already merged and synced, in which case nothing is staged.
+    """
+    if synced():
+        return False
+    shutil.rmtree(shard_dir(), ignore_errors=True)
+    if os.path.exists(_done_path(INDEX)):
+        os.remove(_done_path(INDEX))
+    os.makedirs(shard_dir(), exist_ok=True)
+    return True
+
+
+def _done_path(index: int) -> str:
+    return os.path.join(run_dir(), "done", f"shard-{index}")
+
+
+def mark_done() -> None:
+    os.makedirs(os.path.dirname(_done_path(INDEX)), exist_ok=True)
+    open(_done_path(INDEX), "w", encoding="utf-8").close()
+
+
+def pending() -> list[int]:
+    """Shards that have not marked themselves done yet."""
+    return [index for index in range(COUNT) if not os.path.exists(_done_path(index))]
+
+
+def claim_merge() -> bool:
+    """
+    True for exactly one shard once every shard is done: the first to get
+    here. A retried attempt of that shard claims it again.
+    """
+    if pending():
+        return False
+    path = os.path.join(run_dir(), "merge")
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip() == str(INDEX)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(str(INDEX))
+    return True
+
+
+def merge(scripts: list[str], out_dir: str) -> list[str]:
+    """
+    Concatenate every shard's staged reporters per script into
+    out_dir/<script>.json; returns the scripts that staged any.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    merged = []
+    for script in scripts:
+        name = script.replace(".py", ".json")
+        paths = [os.path.join(shard_dir(index), name) for index in range(COUNT)]
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            continue
+        reporters = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                reporters.extend(json.load(f))
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            json.dump(reporters, f, ensure_ascii=False, indent=2)
+        print(f"  Merged {len(reporters)} reporters of {script} from {len(paths)} shards")
+        merged.append(script)
+    return merged
@@ -1,17 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 import json
 import os
 from dotenv import load_dotenv
 import datetime
-import time
-import random
 
 load_dotenv()
 
+import checkpoint
+import extraction
+import fetch_engine
+import html_parser
+import http_cache
+import http_fetch
+import reporter_state
+import scraper_cli
+import sharding
+import sitemaps
+import wp_api
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 sincimillas_pages = [
     "https://sincomillas.com/",
@@ -27,32 +36,14 @@ sincimillas_pages = [
 ]
 
 
-def get_html_requests(url: str):
-    try:
-        # Send GET request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
-
-        return response.content
-
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
-
-
-def get_reporters_list_from_articles(url: str) -> list[dict]:
-    """Fetch reporters list from articles on a given page URL"""
-
-    html_content = get_html_requests(url)
+def get_reporters_list_from_articles(url: str, html_content: bytes | None) -> list[dict]:
+    """Extract reporters list from the articles on a fetched listing page"""
 
     if not html_content:
         print(f"  Warning: No content found for {url}")
         return []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parser.make_soup(html_content)
 
     # Find all article elements
     news_article_divs = list(soup.find_all("div", class_="item-bot-content"))
@@ -109,97 +100,98 @@ def get_reporters_list_from_articles(url: str) -> list[dict]:
             )
 
         reporters.extend(article_info)
-        time.sleep(random.uniform(1, 2))
 
     return reporters
 
 
-def process_news_sources() -> list[dict]:
-    all_reporters = []
-    for news_url in sincimillas_pages:
-        print(f"\nProcessing news source: {news_url}")
-        reporters = get_reporters_list_from_articles(news_url)
-        all_reporters.extend(reporters)
-
-    return all_reporters
-
+def get_reporters_from_article(url: str, html_content: bytes | None) -> list[dict]:
+    """Extract reporters from a single article page (sitemap discovery)"""
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "div",
-            class_="item-bot-content",
-        )
-    )
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return []
 
-    articles = []
+    soup = html_parser.make_soup(html_content)
 
-    # maximum 3
-    for article_div in articles_div_list[:4]:
-        article_date = article_div.find("a", class_="item-date-time")
-        if article_date:
-            article_date = article_date.get_text(strip=True)
-        else:
-            article_date = ""
+    article_title = soup.find("h1")
+    article_date = soup.find("a", class_="item-date-time") or soup.find("time")
 
-        article_title = article_div.find("h3", class_="item-title")
-        if article_title:
-            article_link = article_title.find("a")
-            if article_link and article_link.get("href"):
-                article_link = article_link["href"].rstrip("/")
-            else:
-                article_link = ""
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
-            article_link = ""
-
-        articles.append(
+    reporters = []
+    for author_link in soup.select("a.item-author, a[rel~=author]"):
+        author_url = (author_link.get("href") or "").rstrip("/")
+        if any(r["author_url"] == author_url for r in reporters):
+            continue
+        reporters.append(
             {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
+                "author_name": author_link.get_text(strip=True),
+                "author_url": author_url,
+                "title": article_title.get_text(strip=True) if article_title else "",
+                "date": article_date.get_text(strip=True) if article_date else "",
+                "link": url,
             }
         )
+    return reporters
 
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
 
-    return articles
+def process_news_sources() -> list[dict]:
+    # One REST API request covers all the listing pages below
+    reporters = wp_api.fetch_post_records("https://sincomillas.com")
+    if reporters:
+        return reporters
+
+    # Only the articles published since the last run
+    reporters = sitemaps.fetch_article_records(
+        "https://sincomillas.com", get_reporters_from_article
+    )
+    if reporters is not None:
+        return reporters
 
+    # fetch the listing pages concurrently
+    pages_html = fetch_engine.fetch_many(sincimillas_pages)
 
-def extract_reporter_info(url: str) -> dict:
-    try:
-        html_content = get_html_requests(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
+    all_reporters = []
+    for news_url, html_content in zip(sincimillas_pages, pages_html):
+        print(f"\nProcessing news source: {news_url}")
+        reporters = get_reporters_list_from_articles(news_url, html_content)
+        all_reporters.extend(reporters)
 
-        soup = BeautifulSoup(html_content, "html.parser")
+    return all_reporters
 
-        author_name_div = soup.find("h1", class_="fn-archive-title")
-        if author_name_div:
-            author_name = author_name_div.find("strong").get_text(strip=True)
-        else:
-            author_name = ""
-
-        articles = get_articles(soup)
-
-        return {
-            "name": author_name,
-            "title": "",
-            "email": "",
-            "twitter": "",
-            "linkedin": "",
-            "instagram": "",
-            "facebook": "",
-            "topics": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
+@checkpoint.step("profile")
+def extract_reporter_info(url: str) -> dict:
+    html_content = http_fetch.get_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
         return {}
 
+    return http_cache.memoize(
+        parse_reporter_info, url, html_content, version=PROFILE.version
+    )
+
+
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container=None,
+        fields={
+            "name": extraction.Field("h1.fn-archive-title strong"),
+        },
+        articles=extraction.ArticleList(
+            items="div.item-bot-content",
+            fields={
+                "title": extraction.Field("h3.item-title"),
+                "link": extraction.Field("h3.item-title a", "href", extraction.link()),
+                "date": extraction.Field("a.item-date-time"),
+            },
+        ),
+        only=("h1.fn-archive-title", "div.item-bot-content"),
+    )
+)
+
+
+def parse_reporter_info(url: str, html_content: bytes) -> dict:
+    return PROFILE.parse(url, html_content)
+
 
 def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
     """Transform flat list to grouped structure and fetch profile info"""
@@ -237,6 +229,7 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
     for reporter in reporters_list:
         reporter["articles"] = reporter["articles"][:4]
 
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} unique reporters...")
 
     processed_reporters = []
@@ -251,7 +244,9 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
         print(f"[{idx}/{len(reporters_list)}] {reporter_name}")
 
         # Get profile info if URL exists
-        reporter_info = extract_reporter_info(reporter_url)
+        reporter_info = reporter_state.profile(
+            reporter_url, extract_reporter_info, reporter.get("articles")
+        )
 
         processed_reporters.append(
             {
@@ -271,25 +266,34 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 "articles": reporter.get("articles") or [],
             }
         )
-        time.sleep(random.uniform(1, 3))
 
     print(f"[OK] Completed {len(processed_reporters)} reporters")
     return processed_reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     # Step 1: Get all articles and reporters
     reporters_flat = process_news_sources()
 
     if not reporters_flat:
         print("No reporters found.")
-        return
+        return []
 
     reporters = process_reporters_list(reporters_flat)
 
-    upsert_reporters_merge(reporters, "sincimillas.py", match_emails=False)
+    return reporters
+
+
+def main():
+    reporters = scrape()
+    if not reporters:
+        return
+
+    upsert_reporters_merge(reporters, "sincimillas.py", **SYNC_OPTIONS)
+    sitemaps.commit_watermarks()
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
@@ -0,0 +1,68 @@
+"""
+Per-site page readiness definitions.
+
+Each profile maps a URL pattern to the CSS selectors the scraper's parser
+needs. Browser fetches return as soon as those elements are attached to the
+DOM (bounded by BROWSER_READY_TIMEOUT_MS) instead of waiting for networkidle
+and fixed sleeps, and tiered_fetch accepts a plain HTTP response only when the
+same selectors are present. URLs without a profile keep the caller's
+load/networkidle waits.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+
+class SiteProfile(NamedTuple):
+    url_pattern: re.Pattern[str]
+    # Every selector must be attached before the page is considered ready.
+    ready: tuple[str, ...]
+
+
+def _profile(pattern: str, *ready: str) -> SiteProfile:
+    return SiteProfile(re.compile(pattern), ready)
+
+
+PROFILES: list[SiteProfile] = [
+    # claridad.py
+    _profile(r"claridadpuertorico\.com/author/", "div.td-ss-main-content"),
+    _profile(r"claridadpuertorico\.com/category/", "div.td_module_1"),
+    # noticel.py
+    _profile(r"noticel\.com/author/", "div.columnistSection__top"),
+    # metro.py
+    _profile(
+        r"metro\.pr/autor/",
+        "div.b-full-author-bio__text",
+        "div.b-results-list__wrapper",
+    ),
+    _profile(r"metro\.pr/noticias/?$", "div.b-results-list"),
+    # telemundopr.py
+    _profile(r"telemundopr\.com/noticias/?$", "div.story-card__text"),
+    _profile(r"telemundopr\.com/noticias/.+/.+", "div.article-header--wrap"),
+    _profile(r"telemundopr\.com/author/", "div.profile-meta"),
+    # wapatv.py
+    _profile(r"wapa\.tv/noticias/[^/]+/?$", "div.card-body"),
+    _profile(r"wapa\.tv/.+/article_", "header.asset-header"),
+    # elvocero.py
+    _profile(r"elvocero\.com/conocenos", "div.conocenos-block"),
+    _profile(r"elvocero\.com/users/profile/", "section#profile-main"),
+    _profile(r"elvocero\.com/.+/collection_", "div.asset"),
+    _profile(r"elvocero\.com/.+/article_", "span.tnt-byline"),
+    # laperladelsur.py
+    _profile(r"periodicolaperla\.com/ahora/", "article.jeg_post"),
+]
+
+
+def profile_for(url: str) -> SiteProfile | None:
+    for profile in PROFILES:
+        if profile.url_pattern.search(url):
+            return profile
+    return None
+
+
+def ready_selectors(url: str) -> tuple[str, ...]:
+    """Selectors that mark url as ready to parse (empty if unprofiled)."""
+    profile = profile_for(url)
+    return profile.ready if profile else ()
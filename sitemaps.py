@@ -0,0 +1,378 @@
+"""
+Sitemap-driven incremental article discovery.
+
+new_entries reads an outlet's sitemaps (the Sitemap: lines in robots.txt,
+else the usual WordPress/Yoast/news locations), follows sitemap indexes and
+returns the article URLs whose lastmod (or news:publication_date) is newer
+than the site's high-water mark from the previous run. Sitemaps in an index
+whose own lastmod is older than the mark are not fetched at all. Sites
+without a mark look back SITEMAP_LOOKBACK_DAYS. fetch_article_records fetches
+only those articles, so a weekly run is a delta crawl proportional to new
+content instead of a fixed number of listing pages.
+
+The mark only moves past articles that were fetched, and only once their
+reporters are written: fetch_article_records stages the new mark and
+commit_watermarks() (after the BigQuery upsert) makes it current. A failed
+fetch or sync leaves those articles to the next run. When more than
+SITEMAP_MAX_URLS articles are new, the oldest are taken and the rest follow
+on later runs. That only holds if the watermarks file outlives the run, so
+on Cloud Run it lives on a mounted bucket (see
+scripts/deploy_gcp_scheduler_run_job.sh). Sharded runs stage each shard's
+marks in its shard directory; the merging shard commits all of them.
+
+Config:
+  SITEMAP_WATERMARKS_PATH  per-site marks (default .cache/sitemap_watermarks.json)
+  SITEMAP_LOOKBACK_DAYS    window for sites without a mark (default 7)
+  SITEMAP_MAX_URLS         articles taken per run (default 200)
+  SITEMAP_PENDING_DIR      where staged marks wait for commit_watermarks()
+                           (default <SITEMAP_WATERMARKS_PATH>.pending)
+  SITEMAP_DEFER_COMMIT     "1" leaves commit_watermarks() to a later sync
+                           process (set by run_all.py for its scrapers)
+"""
+
+from __future__ import annotations
+
+import datetime
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from typing import Callable, NamedTuple
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+import fetch_engine
+import http_fetch
+import snapshots
+
+load_dotenv()
+
+WATERMARKS_PATH = (os.environ.get("SITEMAP_WATERMARKS_PATH") or "").strip() or os.path.join(
+    ".cache", "sitemap_watermarks.json"
+)
+LOOKBACK_DAYS = float(os.environ.get("SITEMAP_LOOKBACK_DAYS") or 7)
+MAX_URLS = int(os.environ.get("SITEMAP_MAX_URLS") or 200)
+DEFER_COMMIT = (os.environ.get("SITEMAP_DEFER_COMMIT") or "").strip() == "1"
+# One file per site, so scrapers running in parallel never rewrite each other's.
+PENDING_DIR = (
+    os.environ.get("SITEMAP_PENDING_DIR") or ""
+).strip() or f"{WATERMARKS_PATH}.pending"
+
+# Tried in order when robots.txt lists no sitemaps.
+SITEMAP_PATHS = ["/sitemap_index.xml", "/wp-sitemap.xml", "/sitemap.xml", "/news-sitemap.xml"]
+
+# Child sitemaps listing taxonomies, authors or static pages rather than articles.
+NON_ARTICLE_SITEMAP = re.compile(r"categor|tag|author|user|page|taxonom|attachment", re.I)
+
+# Sitemap indexes nest at most a couple of levels in practice.
+MAX_DEPTH = 3
+
+Content = bytes | str | None
+
+_watermarks: dict[str, str] | None = None
+_lock = threading.Lock()
+
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: datetime.datetime
+    # news:title when the sitemap is a news sitemap, else ""
+    title: str
+
+
+def _site(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_date(value: str) -> datetime.datetime | None:
+    # W3C datetime: 2025-12-12, 2025-12-12T17:50:33Z, 2025-12-12T17:50:33-04:00
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def parse_sitemap(
+    body: bytes,
+) -> tuple[list[SitemapEntry], list[tuple[str, datetime.datetime | None]]]:
+    """(url entries, child sitemaps with their lastmod) of a urlset or index."""
+    entries = []
+    children = []
+    loc = title = ""
+    lastmod = None
+    for event, elem in ET.iterparse(io.BytesIO(body), events=("start", "end")):
+        name = _local(elem.tag)
+        if event == "start":
+            if name in ("url", "sitemap"):
+                loc, title, lastmod = "", "", None
+            continue
+
+        text = (elem.text or "").strip()
+        if name == "loc" and not loc:
+            # The entry's own <loc> precedes any image:loc inside it.
+            loc = text
+        elif name in ("lastmod", "publication_date"):
+            parsed = _parse_date(text)
+            if parsed is not None and (lastmod is None or parsed > lastmod):
+                lastmod = parsed
+        elif name == "title" and not title:
+            title = text
+        elif name == "url":
+            # Entries without a date cannot be placed against the watermark.
+            if loc and lastmod is not None and urlsplit(loc).path.strip("/"):
+                entries.append(SitemapEntry(loc.rstrip("/"), lastmod, title))
+            elem.clear()
+        elif name == "sitemap":
+            if loc:
+                children.append((loc, lastmod))
+            elem.clear()
+    return entries, children
+
+
+def _fetch_sitemap(url: str) -> bytes | None:
+    body = http_fetch.get_html(url)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if body and body[:2] == b"\x1f\x8b":
+        # .xml.gz is served as a gzip file, not with Content-Encoding.
+        try:
+            body = gzip.decompress(body)
+        except OSError:
+            return None
+    return body
+
+
+def _robots_sitemaps(site: str) -> list[str]:
+    robots = http_fetch.get_html(f"{site}/robots.txt")
+    if not robots:
+        return []
+    if isinstance(robots, bytes):
+        robots = robots.decode("utf-8", "replace")
+    sitemaps = []
+    for line in robots.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(value.strip())
+    return list(dict.fromkeys(sitemaps))
+
+
+def _collect(
+    url: str,
+    cutoff: datetime.datetime,
+    entries: list[SitemapEntry],
+    seen: set[str],
+    depth: int = 0,
+) -> bool:
+    """Add url's entries newer than cutoff; False if url is not a sitemap."""
+    if url in seen or depth > MAX_DEPTH:
+        return False
+    seen.add(url)
+
+    body = _fetch_sitemap(url)
+    if not body:
+        return False
+    try:
+        found, children = parse_sitemap(body)
+    except ET.ParseError:
+        return False
+
+    entries.extend(entry for entry in found if entry.lastmod > cutoff)
+    for child, lastmod in children:
+        if NON_ARTICLE_SITEMAP.search(urlsplit(child).path.rsplit("/", 1)[-1]):
+            continue
+        if lastmod is not None and lastmod <= cutoff:
+            continue
+        _collect(child, cutoff, entries, seen, depth + 1)
+    return True
+
+
+def _load() -> dict[str, str]:
+    global _watermarks
+    if _watermarks is None:
+        try:
+            with open(WATERMARKS_PATH, encoding="utf-8") as f:
+                _watermarks = json.load(f)
+        except (OSError, ValueError):
+            _watermarks = {}
+    return _watermarks
+
+
+def watermark(site_url: str) -> datetime.datetime | None:
+    """Newest lastmod processed for site_url's site on a previous run."""
+    with _lock:
+        value = _load().get(_site(site_url))
+    return _parse_date(value) if value else None
+
+
+def _cutoff(site_url: str) -> datetime.datetime:
+    # A replay must select the same articles the recorded run did.
+    site = _site(site_url)
+    if snapshots.replaying():
+        recorded = snapshots.load(site, "sitemap-cutoff")
+        if recorded:
+            if isinstance(recorded, bytes):
+                recorded = recorded.decode("utf-8")
+            return _parse_date(recorded) or datetime.datetime.min.replace(
+                tzinfo=datetime.timezone.utc
+            )
+
+    cutoff = watermark(site) or datetime.datetime.now(
+        datetime.timezone.utc
+    ) - datetime.timedelta(days=LOOKBACK_DAYS)
+    snapshots.save(site, "sitemap-cutoff", cutoff.isoformat())
+    return cutoff
+
+
+def new_entries(site_url: str) -> list[SitemapEntry] | None:
+    """
+    Articles updated since the site's watermark, newest first (the oldest
+    SITEMAP_MAX_URLS of them). None if the site has no readable sitemap.
+    """
+    site = _site(site_url)
+    cutoff = _cutoff(site)
+
+    entries: list[SitemapEntry] = []
+    seen: set[str] = set()
+    listed = _robots_sitemaps(site)
+    if listed:
+        # Every listed sitemap is read (e.g. a news sitemap next to the index).
+        found = any([_collect(url, cutoff, entries, seen) for url in listed])
+    else:
+        found = any(_collect(site + path, cutoff, entries, seen) for path in SITEMAP_PATHS)
+    if not found:
+        print(f"  No sitemap found on {site}")
+        return None
+
+    newest: dict[str, SitemapEntry] = {}
+    for entry in entries:
+        if entry.loc not in newest or entry.lastmod > newest[entry.loc].lastmod:
+            newest[entry.loc] = entry
+    # The oldest first, so the mark never passes articles left for later.
+    entries = sorted(newest.values(), key=lambda entry: entry.lastmod)
+    print(
+        f"  Sitemaps: {len(entries)} articles updated since {cutoff:%d/%m/%Y %H:%M}"
+        + (f" (taking the oldest {MAX_URLS})" if len(entries) > MAX_URLS else "")
+    )
+    return entries[:MAX_URLS][::-1]
+
+
+def _pending_path(site: str) -> str:
+    return os.path.join(PENDING_DIR, urlsplit(site).netloc)
+
+
+def save_watermark(site_url: str, newest: datetime.datetime) -> None:
+    """Stage newest as site_url's watermark until commit_watermarks()."""
+    if snapshots.replaying():
+        return
+    try:
+        os.makedirs(PENDING_DIR, exist_ok=True)
+        with open(_pending_path(_site(site_url)), "w", encoding="utf-8") as f:
+            json.dump({"site": _site(site_url), "mark": newest.isoformat()}, f)
+    except OSError as e:
+        print(f"  Warning: Could not stage sitemap watermark: {e}")
+
+
+def commit_watermarks(pending_dirs: list[str] | None = None) -> None:
+    """
+    Advance every site's watermark to its staged mark (after a successful
+    sync). pending_dirs (default PENDING_DIR) are e.g. the shards' staging
+    directories; a site staged by several takes the lowest of their marks.
+    """
+    if DEFER_COMMIT or snapshots.replaying():
+        return
+    pending_dirs = [d for d in pending_dirs or [PENDING_DIR] if os.path.isdir(d)]
+    if not pending_dirs:
+        return
+    with _lock:
+        marks = _load()
+        staged = []
+        lowest: dict[str, datetime.datetime] = {}
+        for pending_dir in pending_dirs:
+            for name in sorted(os.listdir(pending_dir)):
+                path = os.path.join(pending_dir, name)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        pending = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                staged.append(path)
+                site, newest = pending["site"], _parse_date(pending["mark"])
+                if newest and (site not in lowest or newest < lowest[site]):
+                    lowest[site] = newest
+        if not staged:
+            return
+        for site, newest in lowest.items():
+            current = marks.get(site)
+            if not (current and (_parse_date(current) or newest) >= newest):
+                marks[site] = newest.isoformat()
+        try:
+            os.makedirs(os.path.dirname(WATERMARKS_PATH) or ".", exist_ok=True)
+            tmp = f"{WATERMARKS_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(marks, f, indent=2, sort_keys=True)
+            os.replace(tmp, WATERMARKS_PATH)
+        except OSError as e:
+            print(f"  Warning: Could not save sitemap watermarks: {e}")
+            return
+        for path in staged:
+            os.remove(path)
+
+
+def _fetched_mark(
+    entries: list[SitemapEntry], pages_html: list[Content]
+) -> datetime.datetime | None:
+    """Newest lastmod the mark can reach without passing an article that failed to fetch."""
+    failed = [entry.lastmod for entry, html in zip(entries, pages_html) if not html]
+    fetched = [entry.lastmod for entry, html in zip(entries, pages_html) if html]
+    if failed:
+        fetched = [lastmod for lastmod in fetched if lastmod < min(failed)]
+    return max(fetched, default=None)
+
+
+def fetch_article_records(
+    site_url: str, parse_article: Callable[[str, Content], list[dict]]
+) -> list[dict] | None:
+    """
+    Flat records from the articles new since the last run, parsed by
+    parse_article(url, html_content). [] when nothing is new; None when the
+    site has no sitemap or no authors were found (use the listing pages).
+    """
+    entries = new_entries(site_url)
+    if entries is None:
+        return None
+    if not entries:
+        return []
+
+    pages_html = fetch_engine.fetch_many([entry.loc for entry in entries])
+
+    records = []
+    for entry, html_content in zip(entries, pages_html):
+        defaults = {
+            "title": entry.title,
+            "date": entry.lastmod.strftime("%d/%m/%Y"),
+            "link": entry.loc,
+        }
+        for record in parse_article(entry.loc, html_content):
+            records.append({**defaults, **{k: v for k, v in record.items() if v}})
+
+    if not records:
+        print("  No authors found in sitemap articles, using listing pages")
+        return None
+
+    mark = _fetched_mark(entries, pages_html)
+    if mark is not None:
+        save_watermark(site_url, mark)
+    print(f"  Extracted {len(records)} author records from {len(entries)} new articles")
+    return records
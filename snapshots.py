@@ -0,0 +1,237 @@
+"""
+Compressed HTML snapshot store and offline replay.
+
+When recording, every page the scrapers fetch (http_fetch.get_html and the
+browser pool's rendered HTML) is written once to a content-addressed,
+zstd-compressed object store, and a per-run manifest maps URLs to objects:
+
+  SNAPSHOT_DIR/objects/ab/abcdef....zst
+  SNAPSHOT_DIR/runs/<run-id>.jsonl
+
+In replay mode fetchers read from a recorded run instead of the network and
+BigQuery syncs are written to SNAPSHOT_DIR/replays/<run-id>/<script>.json, so
+parser and performance work can be reproduced offline.
+
+Config (or scraper_cli's --record / --replay RUN_ID):
+  SNAPSHOT_RECORD   "1" records this run
+  SNAPSHOT_REPLAY   run id to replay
+  SNAPSHOT_RUN_ID   run id to record under (default: UTC timestamp)
+  SNAPSHOT_DIR      store location (default .cache/snapshots)
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import os
+import threading
+from typing import Any
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SNAPSHOT_DIR = (os.environ.get("SNAPSHOT_DIR") or "").strip() or os.path.join(
+    ".cache", "snapshots"
+)
+
+Content = bytes | str
+
+_lock = threading.Lock()
+_record = (os.environ.get("SNAPSHOT_RECORD") or "").strip() == "1"
+_replay_run = (os.environ.get("SNAPSHOT_REPLAY") or "").strip() or None
+_run_id = (os.environ.get("SNAPSHOT_RUN_ID") or "").strip() or None
+_manifest: dict[tuple[str, str], list[dict[str, Any]]] | None = None
+
+
+def new_run_id() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def configure(
+    *, record: bool = False, replay: str | None = None, run: str | None = None
+) -> None:
+    """Switch recording (under run, if given) / replay on for this process (see scraper_cli)."""
+    global _record, _replay_run, _run_id, _manifest
+    if record and replay:
+        raise RuntimeError("Cannot record and replay snapshots in the same run")
+    with _lock:
+        if record:
+            _record = True
+            _run_id = run or _run_id
+        if replay:
+            _replay_run = replay
+            _manifest = None
+
+
+def recording() -> bool:
+    return _record and not _replay_run
+
+
+def replaying() -> bool:
+    return _replay_run is not None
+
+
+def run_id() -> str | None:
+    """Run being recorded or replayed (None when neither)."""
+    global _run_id
+    if _replay_run:
+        return _replay_run
+    if not _record:
+        return None
+    with _lock:
+        if _run_id is None:
+            _run_id = new_run_id()
+        return _run_id
+
+
+# --- zstd (only needed when recording or replaying) ---
+
+_local = threading.local()
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(
+            "Snapshot recording/replay needs the zstandard package (pip install zstandard)"
+        ) from e
+    return zstandard
+
+
+def _compress(data: bytes) -> bytes:
+    if not hasattr(_local, "compressor"):
+        _local.compressor = _zstd().ZstdCompressor(level=10)
+    return _local.compressor.compress(data)
+
+
+def _decompress(data: bytes) -> bytes:
+    if not hasattr(_local, "decompressor"):
+        _local.decompressor = _zstd().ZstdDecompressor()
+    return _local.decompressor.decompress(data)
+
+
+# --- Store ---
+
+
+def _object_path(digest: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, "objects", digest[:2], digest[2:] + ".zst")
+
+
+def _manifest_path(run: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, "runs", f"{run}.jsonl")
+
+
+def _write_object(data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_compress(data))
+        os.replace(tmp, path)
+    return digest
+
+
+def save(url: str, kind: str, content: Content | None, *, part: int | None = None) -> None:
+    """Record content fetched for url ("http" or "browser") if recording."""
+    if not content or not recording():
+        return
+    try:
+        text = isinstance(content, str)
+        digest = _write_object(content.encode("utf-8") if text else content)
+        entry: dict[str, Any] = {
+            "url": url,
+            "kind": kind,
+            "sha256": digest,
+            "text": text,
+            "fetched_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        if part is not None:
+            entry["part"] = part
+        path = _manifest_path(run_id() or new_run_id())
+        with _lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+    except Exception as e:
+        print(f"  Warning: Could not record snapshot for {url}: {e}")
+
+
+def save_many(url: str, kind: str, contents: list[Content]) -> None:
+    """Record a sequence of pages produced from one URL (e.g. paginated listings)."""
+    for i, content in enumerate(contents):
+        save(url, kind, content, part=i)
+
+
+def _load_manifest() -> dict[tuple[str, str], list[dict[str, Any]]]:
+    global _manifest
+    with _lock:
+        if _manifest is None:
+            path = _manifest_path(_replay_run or "")
+            if not os.path.exists(path):
+                raise RuntimeError(f"No snapshot manifest for run {_replay_run} ({path})")
+            manifest: dict[tuple[str, str], list[dict[str, Any]]] = {}
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        manifest.setdefault((entry["url"], entry["kind"]), []).append(entry)
+            _manifest = manifest
+        return _manifest
+
+
+def _entries(url: str, kind: str) -> list[dict[str, Any]]:
+    manifest = _load_manifest()
+    entries = manifest.get((url, kind))
+    if entries is None:
+        # Fetch tiers can change between runs; any recorded copy will do.
+        entries = next(
+            (found for (u, _), found in manifest.items() if u == url), []
+        )
+    return entries
+
+
+def _read(entry: dict[str, Any]) -> Content:
+    with open(_object_path(entry["sha256"]), "rb") as f:
+        data = _decompress(f.read())
+    return data.decode("utf-8") if entry.get("text") else data
+
+
+def load(url: str, kind: str) -> Content | None:
+    """Latest recorded content for url in the replayed run, or None."""
+    entries = [e for e in _entries(url, kind) if "part" not in e]
+    if not entries:
+        print(f"  Warning: No snapshot for {url} in run {_replay_run}")
+        return None
+    return _read(entries[-1])
+
+
+def load_many(url: str, kind: str) -> list[Content]:
+    """Pages recorded with save_many for url, in order."""
+    parts: dict[int, dict[str, Any]] = {}
+    for entry in _entries(url, kind):
+        if "part" in entry:
+            parts[entry["part"]] = entry
+    if not parts:
+        print(f"  Warning: No snapshot for {url} in run {_replay_run}")
+    return [_read(parts[i]) for i in sorted(parts)]
+
+
+def recorded_pages(kinds: tuple[str, ...] = ("http", "browser")) -> list[tuple[str, Content]]:
+    """(url, content) of every single page of the given kinds in the replayed run."""
+    pages = []
+    for (url, kind), entries in _load_manifest().items():
+        entries = [e for e in entries if "part" not in e]
+        if kind in kinds and entries:
+            pages.append((url, _read(entries[-1])))
+    return pages
+
+
+def replay_output_path(source_script: str) -> str:
+    """Where a replayed run writes what it would have synced to BigQuery."""
+    name = os.path.splitext(os.path.basename(source_script))[0]
+    return os.path.join(SNAPSHOT_DIR, "replays", _replay_run or "", f"{name}.json")
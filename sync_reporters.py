@@ -0,0 +1,95 @@
+"""
+Consolidated BigQuery sync stage of run_all.py.
+
+Site scrapers started by run_all.py stage their reporters as JSON
+(REPORTERS_SINK_DIR) instead of writing to BigQuery. This step then upserts
+each scraper's reporters with that scraper's SYNC_OPTIONS, one after the
+other in a single process, so the reporters table is read once and the
+Twitter stage only starts on a fully written table.
+
+usage: python sync_reporters.py [--sitemap-marks DIR ...] [--reporter-state FILE ...]
+                               STAGING_DIR SCRIPT [SCRIPT ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import sys
+
+import bigquery_sync
+import reporter_state
+import sitemaps
+
+
+def sync_options(script: str) -> dict:
+    """upsert_reporters_merge keyword arguments declared by script."""
+    return importlib.import_module(script.replace(".py", "")).SYNC_OPTIONS
+
+
+def load_staged(staging_dir: str, scripts: list[str]) -> dict[str, list[dict]]:
+    """Reporters staged by each script (scripts that staged nothing are left out)."""
+    staged = {}
+    for script in scripts:
+        path = os.path.join(staging_dir, script.replace(".py", ".json"))
+        if not os.path.exists(path):
+            print(f"  Warning: {script} staged no reporters, not syncing it")
+            continue
+        with open(path, encoding="utf-8") as f:
+            staged[script] = json.load(f)
+    return staged
+
+
+def sync(
+    reporters_by_script: dict[str, list[dict]],
+    sitemap_marks: list[str] | None = None,
+    reporter_states: list[str] | None = None,
+) -> None:
+    """
+    Upsert every script's reporters in order, reading the table only once,
+    then commit the sitemap marks staged in sitemap_marks (default the
+    scrapers' SITEMAP_PENDING_DIR) and the profiles recorded in
+    reporter_states (default REPORTER_STATE_PATH).
+    """
+    bigquery_sync.keep_row_snapshot()
+    for script, reporters in reporters_by_script.items():
+        if not reporters:
+            print(f"\n{script} found no reporters, nothing to sync")
+            continue
+        print(f"\n[OK] Syncing {len(reporters)} reporters from {script}")
+        bigquery_sync.upsert_reporters_merge(reporters, script, **sync_options(script))
+    # Everything is written; sitemap articles staged by the scrapers are done.
+    sitemaps.commit_watermarks(sitemap_marks)
+    reporter_state.commit(reporter_states)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("staging_dir", help="REPORTERS_SINK_DIR the scrapers wrote to")
+    parser.add_argument("scripts", nargs="+", help="scrapers to sync, in order")
+    parser.add_argument(
+        "--sitemap-marks",
+        action="append",
+        metavar="DIR",
+        help="staged sitemap marks to commit (repeatable; default SITEMAP_PENDING_DIR)",
+    )
+    parser.add_argument(
+        "--reporter-state",
+        action="append",
+        metavar="FILE",
+        help="reporter state to commit (repeatable; default REPORTER_STATE_PATH)",
+    )
+    args = parser.parse_args()
+
+    staged = load_staged(args.staging_dir, args.scripts)
+    if not staged:
+        print("Nothing staged to sync")
+        sys.exit(1)
+    sync(staged, args.sitemap_marks, args.reporter_state)
+    print("All done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,25 @@
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import json
 import os
 from dotenv import load_dotenv
 import datetime
-import time
-import random
 
 load_dotenv()
 
+import article_metadata
+import browser_pool
+import checkpoint
+import extraction
+import fetch_engine
+import html_parser
+import http_cache
+import reporter_state
+import scraper_cli
+import sharding
+import tiered_fetch
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 
 authors = [
@@ -42,62 +50,48 @@ authors = [
 ]
 
 
-def initialize_playwright():
-    p = sync_playwright().start()
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-    return p, browser, page
-
-
-def get_html_requests(url: str):
-    try:
-        # Send GET request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
+ARTICLE_ITEMS = "div.story-card__text"
 
-        return response.content
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
-
-
-def get_html_playwright(url: str):
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url)
-
-            # Try to wait for content, but continue if it times out
-            try:
-                page.wait_for_load_state("networkidle", timeout=10000)
-                page.wait_for_timeout(2000)
-            except Exception as wait_error:
-                print(f"  Warning: Wait timeout, using partial content")
-
-            # Always try to get content even if wait failed
-            html_content = page.content()
-            browser.close()
-            return html_content
+async def load_more_articles(page) -> None:
+    # Click "Ver más" button 5 times to load more articles
+    count = await page.locator(ARTICLE_ITEMS).count()
+    i = 1
+    while i <= 5:
+        try:
+            # Look for the "Ver más" (See more) button
+            load_more_button = page.locator(".content-list-button.button")
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+            if await load_more_button.is_visible():
+                print(f"  Clicking 'Mostrar más' button {i}/5")
+                await load_more_button.click()
+                new_count = await browser_pool.wait_for_more(page, ARTICLE_ITEMS, count)
+                if new_count == count:
+                    print(f"  No new articles after {i} clicks")
+                    break
+                count = new_count
+                i += 1
+            else:
+                print(f"  No more 'Mostrar más' button found after {i-1} clicks")
+                break
+        except Exception as e:
+            print(f"  Could not click more: {e}")
+            break
 
 
-def get_article_info(url: str) -> list[dict]:
-    """Fetch article information from a given URL"""
+def get_article_info(url: str, html_content: bytes | None) -> list[dict]:
+    """Extract article information from a fetched article page"""
     try:
-        html_content = get_html_requests(url)
         if not html_content:
             print(f"  Warning: No content found for {url}")
             return {}
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        # author URLs are needed for the profile pages
+        metadata = article_metadata.extract(html_content)
+        if metadata.complete(author_urls=True):
+            return metadata.records(url)
+
+        soup = html_parser.make_soup(html_content)
 
         article_info_div = soup.find("div", class_="article-header--wrap")
         if not article_info_div:
@@ -166,36 +160,15 @@ def get_article_info(url: str) -> list[dict]:
         return []
 
 
+@checkpoint.step("listing")
 def get_reporters_list_from_articles(url: str) -> list[dict]:
-    p, browser, page = initialize_playwright()
     try:
-        page.goto(url)
-
-        # Click "Ver más" button 10 times to load more articles
-        i = 1
-        while i <= 5:
-            try:
-                # Look for the "Ver más" (See more) button
-                load_more_button = page.locator(".content-list-button.button")
-
-                if load_more_button.is_visible():
-                    print(f"  Clicking 'Mostrar más' button {i}/10")
-                    load_more_button.click()
-                    page.wait_for_timeout(5000)
-                    i += 1
-                else:
-                    print(f"  No more 'Mostrar más' button found after {i-1} clicks")
-                    break
-            except Exception as e:
-                print(f"  Could not click more: {e}")
-                break
-
-        html_content = page.content()
-
-        browser.close()
-        p.stop()
+        html_content = browser_pool.fetch_html(url, actions=load_more_articles)
+        if not html_content:
+            print(f"  Warning: No content found for {url}")
+            return []
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = html_parser.make_soup(html_content)
 
         # Find all article elements
         news_article_divs = list(soup.find_all("div", class_="story-card__text"))
@@ -203,7 +176,7 @@ def get_reporters_list_from_articles(url: str) -> list[dict]:
         if not news_article_divs:
             return []
 
-        reporters = []
+        article_links = []
         for idx, article_div in enumerate(news_article_divs, 1):
             article_link_tag = article_div.find("a", class_="story-card__title-link")
 
@@ -215,135 +188,74 @@ def get_reporters_list_from_articles(url: str) -> list[dict]:
             if "https://www.telemundopr.com/video/noticias/" in article_link:
                 continue
 
-            article_info = get_article_info(article_link)
+            article_links.append(article_link)
 
-            reporters.extend(article_info)
-            time.sleep(random.uniform(1, 2))
-
-        return reporters
+        # fetch the article pages concurrently, skipping the ones a resumed
+        # run already parsed
+        infos = checkpoint.map_pages(
+            __name__,
+            "article",
+            article_links,
+            lambda urls: fetch_engine.fetch_many(urls, browser="auto"),
+            get_article_info,
+        )
+        return [record for info in infos for record in info]
 
     except Exception as e:
         print(f"Error: An error occurred while extracting reporters from articles: {e}")
         return []
 
 
-def get_articles(soup: BeautifulSoup) -> list[dict]:
-    articles_div_list = list(
-        soup.find_all(
-            "div",
-            class_="story-card__text",
-        )
-    )
-
-    articles = []
-
-    # maximum 3
-    for article_div in articles_div_list[:4]:
-        article_title = article_div.find(
-            "h3", class_="story-card__title more-news__story-card-title"
-        )
-        if article_title:
-            article_link = article_title.find("a")
-            if article_link and article_link.get("href"):
-                article_link = article_link["href"].rstrip("/")
-            else:
-                article_link = ""
-            article_title = article_title.get_text(strip=True)
-        else:
-            article_title = ""
-            article_link = ""
+def add_article_dates(articles: list[dict]) -> None:
+    """Fill in the teasers' dates from their article pages"""
+    # fetch the article pages concurrently
+    pages = fetch_engine.fetch_many((a["link"] for a in articles), browser="auto")
 
-        article_info = get_article_info(article_link)
+    for article, html_content in zip(articles, pages):
+        article_info = get_article_info(article["link"], html_content)
         if article_info and len(article_info) > 0:
-            article_date = article_info[0].get("date") or ""
-        else:
-            article_date = ""
-
-        articles.append(
-            {
-                "title": article_title,
-                "link": article_link,
-                "date": article_date,
-            }
-        )
-
-        time.sleep(random.uniform(1, 2))  # sleep for 1 to 2 seconds
-
-    return articles
+            article["date"] = article_info[0].get("date") or ""
 
 
+@checkpoint.step("profile")
 def extract_reporter_info(url: str) -> dict:
     """Extract reporter profile information"""
-    try:
-        html_content = get_html_requests(url)
-        if not html_content:
-            print(f"  Warning: No content found for {url}")
-            return {}
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        # Look for reporter bio section
-        reporter_bio_section = soup.find("div", class_="profile-meta")
-        if not reporter_bio_section:
-            print(f"  Warning: No author bio found for {url}")
-            return {}
+    html_content = tiered_fetch.fetch_html(url)
+    if not html_content:
+        print(f"  Warning: No content found for {url}")
+        return {}
 
-        reporter_name = reporter_bio_section.find("div", class_="profile-name")
-        if reporter_name:
-            reporter_name = reporter_name.get_text(strip=True)
-        else:
-            reporter_name = ""
+    # Only the profile page is memoized; the article dates are fetched every time.
+    reporter_info = http_cache.memoize(
+        parse_reporter_info, url, html_content, version=PROFILE.version
+    )
+    if reporter_info:
+        add_article_dates(reporter_info["articles"])
+    return reporter_info
+
+
+PROFILE = extraction.compile_profile(
+    extraction.ProfileSpec(
+        container="div.profile-meta",
+        fields={
+            "name": extraction.Field("div.profile-name"),
+            "title": extraction.Field("div.profile-title"),
+        },
+        socials="a[href]",
+        articles=extraction.ArticleList(
+            items="div.story-card__text",
+            fields={
+                "title": extraction.Field("h3.story-card__title"),
+                "link": extraction.Field("h3.story-card__title a", "href", extraction.link()),
+            },
+        ),
+        only=("div.profile-meta", "div.story-card__text"),
+    )
+)
 
-        reporter_title = reporter_bio_section.find("div", class_="profile-title")
-        if reporter_title:
-            reporter_title = reporter_title.get_text(strip=True)
-        else:
-            reporter_title = ""
-
-        # Find social links
-        reporter_socials = []
-        social_links = reporter_bio_section.find_all("a", href=True)
-        for social in social_links:
-            href = social.get("href") or ""
-            reporter_socials.append(href)
-
-        reporter_email = ""
-        reporter_x = ""
-        reporter_facebook = ""
-        reporter_linkedin = ""
-        reporter_instagram = ""
-
-        for social_link in reporter_socials:
-            if "twitter.com" in social_link or "x.com" in social_link:
-                reporter_x = social_link.rstrip("/")
-            elif "facebook.com" in social_link:
-                reporter_facebook = social_link.rstrip("/")
-            elif "linkedin.com" in social_link:
-                reporter_linkedin = social_link.rstrip("/")
-            elif "instagram.com" in social_link:
-                reporter_instagram = social_link.rstrip("/")
-            elif "mailto:" in social_link:
-                reporter_email = social_link.replace("mailto:", "")
-            elif "@" in social_link and "." in social_link:
-                reporter_email = social_link
-
-        articles = get_articles(soup)
-
-        return {
-            "name": reporter_name,
-            "title": reporter_title,
-            "email": reporter_email,
-            "twitter": reporter_x,
-            "linkedin": reporter_linkedin,
-            "instagram": reporter_instagram,
-            "facebook": reporter_facebook,
-            "topics_covered": "",
-            "articles": articles,
-        }
 
-    except Exception as e:
-        print(f"Error: An error occurred while extracting reporter info: {e}")
-        return {}
+def parse_reporter_info(url: str, html_content: bytes) -> dict:
+    return PROFILE.parse(url, html_content)
 
 
 def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
@@ -396,6 +308,7 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 }
             )
 
+    reporters_list = sharding.mine(__name__, reporters_list)
     print(f"\nProcessing {len(reporters_list)} unique reporters...")
 
     processed_reporters = []
@@ -412,7 +325,9 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
         # Get profile info if URL exists
         reporter_info = {}
         if reporter_url:
-            reporter_info = extract_reporter_info(reporter_url)
+            reporter_info = reporter_state.profile(
+                reporter_url, extract_reporter_info, reporter.get("articles")
+            )
 
         processed_reporters.append(
             {
@@ -434,14 +349,13 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 or [],
             }
         )
-        time.sleep(random.uniform(1, 3))
 
     print(f"[OK] Completed {len(processed_reporters)} reporters")
     return processed_reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     # Step 1: Get all articles and reporters
     reporters_flat = get_reporters_list_from_articles(
         "https://www.telemundopr.com/noticias/"
@@ -449,14 +363,22 @@ def main():
 
     if not reporters_flat:
         print("No reporters found.")
-        return
+        return []
 
     # Step 2: Process reporters list
     reporters = process_reporters_list(reporters_flat)
 
-    # Step 3: Update Airtable
-    upsert_reporters_merge(reporters, "telemundopr.py", match_emails=False)
+    return reporters
+
+
+def main():
+    reporters = scrape()
+    if not reporters:
+        return
+
+    upsert_reporters_merge(reporters, "telemundopr.py", **SYNC_OPTIONS)
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()
@@ -0,0 +1,107 @@
+"""Incremental runs: profiles scraped by one run are reused by the next."""
+
+from __future__ import annotations
+
+import os
+import shutil
+
+import pytest
+
+import reporter_state
+
+URL = "https://www.example.com/author/jane-doe"
+INFO = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "articles": [{"title": "One", "link": "https://www.example.com/one"}],
+}
+
+
+class Fetch:
+    """A profile fetch that counts its calls."""
+
+    def __init__(self, info: dict = INFO) -> None:
+        self.info = info
+        self.calls = 0
+
+    def __call__(self, url: str) -> dict:
+        self.calls += 1
+        return dict(self.info)
+
+
+def new_container(local_dir: str) -> None:
+    """Drop the local state, as a new Cloud Run execution starts without it."""
+    if reporter_state._conn is not None:
+        reporter_state._conn.close()
+        reporter_state._conn = None
+    shutil.rmtree(local_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    local_dir = tmp_path / "local"
+    monkeypatch.setattr(reporter_state, "STATE_PATH", str(local_dir / "reporter_state.sqlite"))
+    monkeypatch.setattr(reporter_state, "STORE_PATH", str(tmp_path / "bucket" / "state.sqlite"))
+    monkeypatch.setattr(reporter_state, "_conn", None)
+    monkeypatch.setattr(reporter_state, "_max_age_days", 7.0)
+    yield str(local_dir)
+    new_container(str(local_dir))
+
+
+def test_second_run_skips_fresh_profiles(state):
+    first = Fetch()
+    assert reporter_state.profile(URL, first) == INFO
+    reporter_state.commit()
+    new_container(state)
+
+    second = Fetch()
+    assert reporter_state.profile(URL, second) == INFO
+    assert (first.calls, second.calls) == (1, 0)
+
+
+def test_uncommitted_run_is_not_reused(state):
+    reporter_state.profile(URL, Fetch())
+    new_container(state)
+
+    second = Fetch()
+    reporter_state.profile(URL, second)
+    assert second.calls == 1
+
+
+def test_unseen_listing_article_refetches(state):
+    reporter_state.profile(URL, Fetch())
+    reporter_state.commit()
+    new_container(state)
+
+    second = Fetch()
+    listing = [{"title": "Two", "link": "https://www.example.com/two"}]
+    reporter_state.profile(URL, second, listing)
+    assert second.calls == 1
+
+
+def test_profiles_older_than_max_age_are_refetched(state, monkeypatch):
+    reporter_state.profile(URL, Fetch())
+    reporter_state.commit()
+    new_container(state)
+
+    later = reporter_state.time.time() + 8 * 86400
+    monkeypatch.setattr(reporter_state.time, "time", lambda: later)
+    second = Fetch()
+    reporter_state.profile(URL, second)
+    assert second.calls == 1
+
+
+def test_commit_merges_every_shard(state, tmp_path):
+    other = "https://www.example.com/author/john-roe"
+    shards = [str(tmp_path / f"shard-{index}" / "reporter_state.sqlite") for index in range(2)]
+    for url, path in zip([URL, other], shards):
+        reporter_state.profile(url, Fetch())
+        reporter_state.export(path)
+        new_container(state)
+
+    reporter_state.commit(shards)
+    fetch = Fetch()
+    reporter_state.profile(URL, fetch)
+    reporter_state.profile(other, fetch)
+    assert fetch.calls == 0
+    assert os.path.exists(reporter_state.STORE_PATH)
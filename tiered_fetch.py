@@ -0,0 +1,132 @@
+"""
+Requests-first page fetching with automatic Playwright escalation.
+
+fetch_html tries a plain HTTP GET first and accepts it when the page's
+required selectors (site_profiles) are present in the raw HTML. Otherwise the
+page is rendered on a pooled Playwright page. The tier that worked is
+remembered per URL pattern, so patterns that need JavaScript go straight to
+the browser on later fetches (and are re-probed over HTTP every
+FETCH_TIER_REPROBE_DAYS).
+
+Config:
+  FETCH_TIERS_PATH         learned tiers (default .cache/fetch_tiers.json)
+  FETCH_TIER_REPROBE_DAYS  retry HTTP for browser-tier patterns (default 7)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+import browser_pool
+import html_parser
+import http_fetch
+import site_profiles
+
+load_dotenv()
+
+TIERS_PATH = (os.environ.get("FETCH_TIERS_PATH") or "").strip() or os.path.join(
+    ".cache", "fetch_tiers.json"
+)
+REPROBE_SECONDS = float(os.environ.get("FETCH_TIER_REPROBE_DAYS") or 7) * 86400
+
+HTTP = "http"
+BROWSER = "browser"
+
+Content = bytes | str | None
+
+_tiers: dict[str, dict[str, Any]] | None = None
+_lock = threading.Lock()
+
+
+def pattern_key(url: str) -> str:
+    """Site profile pattern for url, else host + first path segment."""
+    profile = site_profiles.profile_for(url)
+    if profile is not None:
+        return profile.url_pattern.pattern
+    parts = urlsplit(url)
+    first = parts.path.strip("/").split("/", 1)[0]
+    return f"{parts.netloc.lower()}/{first}"
+
+
+def _load() -> dict[str, dict[str, Any]]:
+    global _tiers
+    if _tiers is None:
+        try:
+            with open(TIERS_PATH, encoding="utf-8") as f:
+                _tiers = json.load(f)
+        except (OSError, ValueError):
+            _tiers = {}
+    return _tiers
+
+
+def tier_for(url: str) -> str | None:
+    """Tier to start with for url (None = unknown, probe HTTP first)."""
+    with _lock:
+        entry = _load().get(pattern_key(url))
+    if entry is None:
+        return None
+    if entry["tier"] == BROWSER and time.time() - entry["since"] > REPROBE_SECONDS:
+        return None
+    return entry["tier"]
+
+
+def _remember(url: str, tier: str) -> None:
+    key = pattern_key(url)
+    with _lock:
+        tiers = _load()
+        entry = tiers.get(key)
+        if entry is not None and entry["tier"] == tier:
+            # A browser tier confirmed by a re-probe starts a new reprobe period.
+            if tier == HTTP or time.time() - entry["since"] <= REPROBE_SECONDS:
+                return
+        tiers[key] = {"tier": tier, "since": time.time()}
+        try:
+            os.makedirs(os.path.dirname(TIERS_PATH) or ".", exist_ok=True)
+            tmp = f"{TIERS_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(tiers, f, indent=2, sort_keys=True)
+            os.replace(tmp, TIERS_PATH)
+        except OSError as e:
+            print(f"  Warning: Could not save fetch tiers: {e}")
+
+
+def has_required_content(url: str, html_content: Content) -> bool:
+    """True if html_content contains every selector url's profile requires."""
+    if not html_content:
+        return False
+    selectors = site_profiles.ready_selectors(url)
+    if not selectors:
+        return True
+    soup = html_parser.make_soup(html_content)
+    return all(soup.select_one(selector) is not None for selector in selectors)
+
+
+async def afetch_html(url: str, **browser_opts: Any) -> Content:
+    """HTTP first, Playwright if the required content is missing (None on error)."""
+    if not url:
+        return None
+    if tier_for(url) != BROWSER:
+        html_content = await asyncio.to_thread(http_fetch.get_html, url)
+        # Parsing is CPU-bound; keep it off the shared browser event loop.
+        if await asyncio.to_thread(has_required_content, url, html_content):
+            _remember(url, HTTP)
+            return html_content
+        print(f"  Required content missing over HTTP, rendering {url} in the browser")
+
+    html_content = await browser_pool.afetch_html(url, **browser_opts)
+    if await asyncio.to_thread(has_required_content, url, html_content):
+        _remember(url, BROWSER)
+    return html_content
+
+
+def fetch_html(url: str, **browser_opts: Any) -> Content:
+    """Sync counterpart of afetch_html."""
+    return browser_pool.submit(afetch_html(url, **browser_opts)).result()
@@ -1,12 +1,14 @@
 import requests
 import os
 from dotenv import load_dotenv
-import time
 
+import http_fetch
 from bigquery_sync import upsert_reporters_merge
 
 load_dotenv()
 
+SYNC_OPTIONS = {"create_only": True}
+
 URL = "https://api.twitterapi.io/twitter/user/search"
 TWITTER_API_KEY = os.environ.get("TWITTER_API_KEY")
 
@@ -28,18 +30,16 @@ def get_response(query: str, cursor: str = None):
     headers = {"X-API-Key": TWITTER_API_KEY}
 
     try:
-        response = requests.get(URL, headers=headers, params=params)
+        response = http_fetch.get(URL, headers=headers, params=params)
         response.raise_for_status()
         print(f"Fetched data for query: '{query}' (cursor: {cursor})")
         return response.json()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data for query '{query}': {e}")
         raise
-    finally:
-        time.sleep(2)  # Add a delay to avoid hitting rate limits
 
 
-def main():
+def scrape() -> list[dict]:
     print("Starting Twitter scraper...")
     reporters = []
 
@@ -86,8 +86,13 @@ def main():
             }
         )
 
+    return reporter_list
+
+
+def main():
+    reporter_list = scrape()
     print(f"Pushing {len(reporter_list)} reporters to BigQuery (create-only)...")
-    upsert_reporters_merge(reporter_list, "twitter.py", create_only=True)
+    upsert_reporters_merge(reporter_list, "twitter.py", **SYNC_OPTIONS)
 
 
 if __name__ == "__main__":
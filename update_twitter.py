@@ -1,8 +1,8 @@
 import requests
 import os
 from dotenv import load_dotenv
-import time
 
+import http_fetch
 from bigquery_sync import (
     fetch_all_reporter_rows,
     update_reporter_twitter_only,
@@ -32,7 +32,7 @@ def fetch_twitter_profile(name: str) -> dict:
     params = {"query": name}
 
     try:
-        response = requests.get(search_url, headers=headers, params=params)
+        response = http_fetch.get(search_url, headers=headers, params=params)
         if response.status_code == 402:
             print(f"  ! Twitter API quota exhausted (402)")
             raise requests.exceptions.HTTPError(response=response)
@@ -65,8 +65,6 @@ def fetch_twitter_profile(name: str) -> dict:
     except requests.exceptions.RequestException as e:
         print(f"  Error fetching Twitter profile: {e}")
         return None
-    finally:
-        time.sleep(2)
 
 
 def get_reporters_from_bigquery() -> list:
@@ -1,17 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import json
 import os
 from dotenv import load_dotenv
 import datetime
-import time
-import random
 
 load_dotenv()
 
+import article_metadata
+import browser_pool
+import checkpoint
+import feeds
+import fetch_engine
+import html_parser
+import pagination
+import scraper_cli
 from bigquery_sync import upsert_reporters_merge
 
+SYNC_OPTIONS = {"match_emails": False}
+
 
 news_urls = [
     "https://wapa.tv/noticias/locales/",
@@ -22,61 +27,76 @@ news_urls = [
 ]
 
 
-def initialize_playwright():
-    p = sync_playwright().start()
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-    return p, browser, page
-
+ARTICLE_ITEMS = "div.card-body"
+LOAD_MORE_BUTTON = "#trigger-next-1444330"
 
-def get_html_requests(url: str):
-    try:
-        # Send GET request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
 
-        return response.content
+async def load_more_articles(page) -> None:
+    # Click "Ver más" button 2 times to load more articles
+    count = await page.locator(ARTICLE_ITEMS).count()
+    i = 1
+    while i <= 2:
+        try:
+            # Look for the "Ver más" (See more) button
+            load_more_button = page.locator(LOAD_MORE_BUTTON)
+
+            if await load_more_button.is_visible(timeout=5000):
+                print(f"  Clicking 'See More' button {i}/2")
+                # Use force=True to bypass ad overlay interceptions
+                await load_more_button.click(force=True, timeout=10000)
+                new_count = await browser_pool.wait_for_more(page, ARTICLE_ITEMS, count)
+                if new_count == count:
+                    print(f"  No new articles after {i} clicks")
+                    break
+                count = new_count
+                i += 1
+            else:
+                print(f"  No more 'See More' button found after {i-1} clicks")
+                break
+        except Exception as e:
+            print(
+                f"  Could not click more (continuing with current content): {str(e)[:100]}"
+            )
+            break
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
 
+def split_author_names(byline: str) -> list[str]:
+    # split by / and , then strip whitespace
+    return [
+        author.strip() for part in byline.split("/") for author in part.split(",")
+    ]
 
-def get_html_playwright(url: str):
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-
-            # Try to wait for content, but continue if it times out
-            try:
-                page.goto(url)
-                page.wait_for_load_state("networkidle", timeout=20000)
-            except Exception as wait_error:
-                print(f"  Warning: Wait timeout, using partial content")
-
-            # Always try to get content even if wait failed
-            html_content = page.content()
-            browser.close()
-            return html_content
 
-    except Exception as e:
-        print(f"An error occurred while fetching HTML content: {e}")
-        return None
+def get_reporters_from_feed(url: str) -> list[dict]:
+    """Flat records from the section's RSS feed (no article fetches needed)"""
+    reporters = []
+    for record in feeds.fetch_records(url):
+        for name in split_author_names(record["author_name"]):
+            reporters.append({**record, "author_name": name})
+    return reporters
 
 
-def get_article_info(url: str) -> list[dict]:
-    """Fetch article information from a given URL"""
+def get_article_info(url: str, html_content: str | None) -> list[dict]:
+    """Extract article information from a fetched article page"""
     try:
-        html_content = get_html_playwright(url)
         if not html_content:
             print(f"  Warning: No content found for {url}")
             return {}
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        metadata = article_metadata.extract(html_content)
+        if metadata.complete():
+            return [
+                {
+                    "author_name": name,
+                    "title": metadata.title,
+                    "date": metadata.date,
+                    "link": url,
+                }
+                for author in metadata.authors
+                for name in split_author_names(author["name"])
+            ]
+
+        soup = html_parser.make_soup(html_content)
 
         article_info_div = soup.find("header", class_="asset-header")
         if not article_info_div:
@@ -94,13 +114,9 @@ def get_article_info(url: str) -> list[dict]:
             print(f"  Warning: No article author div found for {url}")
             return {}
 
-        article_authors = article_author_div.get_text(strip=True)
-
-        # split by / and , then strip whitespace
         article_authors = [
-            {"name": author.strip(), "url": ""}  # No author URL available
-            for part in article_authors.split("/")
-            for author in part.split(",")
+            {"name": name, "url": ""}  # No author URL available
+            for name in split_author_names(article_author_div.get_text(strip=True))
         ]
 
         article_date = article_info_div.find("time", class_="tnt-date")
@@ -132,77 +148,70 @@ def get_article_info(url: str) -> list[dict]:
         return []
 
 
-def get_reporters_list_from_articles(url: str) -> list[dict]:
-    p, browser, page = initialize_playwright()
-    try:
-        page.goto(url)
-
-        try:
-            page.wait_for_load_state("networkidle", timeout=15000)
-        except Exception as goto_error:
-            print(f"  Warning: Wait timeout, using partial content")
-
-        # Click "Ver más" button 2 times to load more articles
-        i = 1
-        while i <= 2:
-            try:
-                # Look for the "Ver más" (See more) button
-                load_more_button = page.locator("#trigger-next-1444330")
-
-                if load_more_button.is_visible(timeout=5000):
-                    print(f"  Clicking 'See More' button {i}/2")
-                    # Use force=True to bypass ad overlay interceptions
-                    load_more_button.click(force=True, timeout=10000)
-                    page.wait_for_timeout(20000)
-                    i += 1
-                else:
-                    print(f"  No more 'See More' button found after {i-1} clicks")
-                    break
-            except Exception as e:
-                print(
-                    f"  Could not click more (continuing with current content): {str(e)[:100]}"
-                )
-                break
+def get_article_links(html_content) -> list[str]:
+    soup = html_parser.make_soup(html_content)
 
-        html_content = page.content()
+    # Find all article elements
+    news_article_divs = list(soup.find_all("div", class_="card-body"))
 
-        browser.close()
-        p.stop()
+    article_links = []
+    for idx, article_div in enumerate(news_article_divs, 1):
+        article_link_tag = article_div.find("a", class_="tnt-asset-link")
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        if article_link_tag and article_link_tag.has_attr("href"):
+            href = article_link_tag.get("href")
 
-        # Find all article elements
-        news_article_divs = list(soup.find_all("div", class_="card-body"))
+            # Skip template placeholders or empty hrefs
+            if not href or "{{" in href or "}}" in href:
+                continue
 
-        if not news_article_divs:
-            return []
+            # Only prepend domain if href is relative
+            if href.startswith("http"):
+                article_link = href.rstrip("/")
+            else:
+                article_link = ("https://wapa.tv" + href).rstrip("/")
+        else:
+            # Skip articles without valid links
+            continue
 
-        reporters = []
-        for idx, article_div in enumerate(news_article_divs, 1):
-            article_link_tag = article_div.find("a", class_="tnt-asset-link")
+        article_links.append(article_link)
 
-            if article_link_tag and article_link_tag.has_attr("href"):
-                href = article_link_tag.get("href")
+    return article_links
 
-                # Skip template placeholders or empty hrefs
-                if not href or "{{" in href or "}}" in href:
-                    continue
 
-                # Only prepend domain if href is relative
-                if href.startswith("http"):
-                    article_link = href.rstrip("/")
-                else:
-                    article_link = ("https://wapa.tv" + href).rstrip("/")
-            else:
-                # Skip articles without valid links
-                continue
+@checkpoint.step("listing")
+def get_reporters_list_from_articles(url: str) -> list[dict]:
+    try:
+        listing = pagination.fetch_listing(
+            url,
+            button=LOAD_MORE_BUTTON,
+            items=ARTICLE_ITEMS,
+            fallback=load_more_articles,
+            max_pages=2,
+        )
+        if not listing.html:
+            print(f"  Warning: No content found for {url}")
+            return []
 
-            article_info = get_article_info(article_link)
+        article_links = get_article_links(listing.html)
+        for body in listing.pages:
+            for fragment in pagination.html_fragments(body):
+                article_links.extend(get_article_links(fragment))
+        article_links = list(dict.fromkeys(article_links))
 
-            reporters.extend(article_info)
-            time.sleep(random.uniform(3, 5))  # Increased delay to avoid rate limiting
+        if not article_links:
+            return []
 
-        return reporters
+        # render the article pages concurrently (bounded per host),
+        # skipping the ones a resumed run already parsed
+        infos = checkpoint.map_pages(
+            __name__,
+            "article",
+            article_links,
+            lambda urls: fetch_engine.fetch_many(urls, browser="auto"),
+            get_article_info,
+        )
+        return [record for info in infos for record in info]
 
     except Exception as e:
         print(f"Error: An error occurred while extracting reporters from articles: {e}")
@@ -213,20 +222,21 @@ def process_news_sources() -> list[dict]:
     all_reporters = []
     for news_url in news_urls:
         print(f"\nProcessing news source: {news_url}")
-        reporters = get_reporters_list_from_articles(news_url)
+        reporters = get_reporters_from_feed(news_url)
+        if not reporters:
+            reporters = get_reporters_list_from_articles(news_url)
         all_reporters.extend(reporters)
 
-        # Add delay between processing different news sources
-        time.sleep(random.uniform(5, 10))
-
     return all_reporters
 
 
 def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
     """Transform flat list to grouped structure and fetch profile info"""
 
-    # Group articles by reporter
+    # Group articles by reporter; sections sharing a site-wide feed repeat
+    # the same records.
     reporters_dict = {}
+    seen = set()
     for item in reporters_flat:
         reporter_name = item.get("author_name") or ""
         reporter_url = (item.get("author_url") or "").rstrip("/")
@@ -253,6 +263,9 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
             "date": item.get("date") or "",
             "link": (item.get("link") or "").rstrip("/"),
         }
+        if article["link"] and (key, article["link"]) in seen:
+            continue
+        seen.add((key, article["link"]))
         reporters_dict[key]["articles"].append(article)
 
     reporters_list = list(reporters_dict.values())
@@ -303,25 +316,33 @@ def process_reporters_list(reporters_flat: list[dict]) -> list[dict]:
                 "articles": reporter.get("articles") or [],
             }
         )
-        time.sleep(random.uniform(3, 5))
 
     print(f"[OK] Completed {len(processed_reporters)} reporters")
     return processed_reporters
 
 
 
-def main():
+def scrape() -> list[dict]:
     # Step 1-3: Get all articles and reporters
     reporters_flat = process_news_sources()
 
     if not reporters_flat:
         print("No reporters found.")
-        return
+        return []
 
     reporters = process_reporters_list(reporters_flat)
 
-    upsert_reporters_merge(reporters, "wapatv.py", match_emails=False)
+    return reporters
+
+
+def main():
+    reporters = scrape()
+    if not reporters:
+        return
+
+    upsert_reporters_merge(reporters, "wapatv.py", **SYNC_OPTIONS)
 
 
 if __name__ == "__main__":
+    scraper_cli.parse_args()
     main()